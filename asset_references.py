@@ -0,0 +1,217 @@
+"""
+Reference-graph asset discovery for the asset cache generator
+- Parses HTML pages (src/href/srcset/poster attributes, inline styles and scripts),
+  CSS files (url() and @import) and JS/JSON files (quoted asset paths)
+- Resolves every reference against the file that makes it and keeps the ones that
+  point at files of this site
+- Each file is read and parsed once, however many entry pages reach it
+- The result maps every entry page to the exact set of assets reachable from it
+"""
+
+import re
+from pathlib import Path
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse, unquote
+
+# URL prefix the site is served under
+URL_PREFIX = '/KidsGames/'
+
+# Stand-in origin used to resolve relative references
+SITE_ORIGIN = 'https://kidsgames.invalid'
+
+# Elements whose href loads a resource (an <a> href is a link to another page, not an asset)
+RESOURCE_HREF_TAGS = {'link', 'use', 'image'}
+
+# <link rel> values that load nothing a page needs to work (the browser fetches the web app
+# manifest and icons itself), so site-wide icons do not end up in every game's bundle
+IGNORED_LINK_RELS = {
+    'canonical', 'alternate', 'preconnect', 'dns-prefetch', 'next', 'prev', 'author', 'license',
+    'manifest', 'icon', 'shortcut', 'apple-touch-icon', 'apple-touch-icon-precomposed',
+    'apple-touch-startup-image', 'mask-icon'
+}
+
+# References that are not files
+IGNORED_SCHEMES = ('#', 'data:', 'blob:', 'javascript:', 'mailto:', 'tel:', 'about:')
+
+# Extensions of paths picked up from string literals in JS and JSON files
+LITERAL_EXTENSIONS = (
+    'css', 'js', 'mjs', 'json', 'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'ico',
+    'woff', 'woff2', 'ttf', 'otf', 'eot', 'mp3', 'wav', 'mp4', 'webm', 'ogg'
+)
+
+# Files whose references are followed
+PARSED_EXTENSIONS = ('.html', '.htm', '.css', '.js', '.mjs', '.json')
+
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)', re.IGNORECASE)
+CSS_IMPORT_PATTERN = re.compile(r'@import\s+([\'"])([^\'"]+)\1', re.IGNORECASE)
+LITERAL_PATTERN = re.compile(
+    r'[\'"`]([^\'"`\s<>(){}]+\.(?:' + '|'.join(LITERAL_EXTENSIONS) + r'))(?:[?#][^\'"`\s]*)?[\'"`]'
+)
+
+
+def asset_file(url):
+    """Return the project file served at an asset URL (a directory URL serves its index.html)"""
+    path = url[len(URL_PREFIX):]
+    if not path or path.endswith('/'):
+        path += 'index.html'
+    return Path(path)
+
+
+def page_url(path):
+    """Return the URL of a project file"""
+    return f"{URL_PREFIX}{Path(path).as_posix()}"
+
+
+def resolve_reference(reference, base_url):
+    """Return the URL of a same-site reference made from base_url, or None for anything else"""
+    reference = reference.strip()
+    if not reference or reference.lower().startswith(IGNORED_SCHEMES) or '${' in reference:
+        return None
+
+    parsed = urlparse(urljoin(SITE_ORIGIN + base_url, reference))
+    if f"{parsed.scheme}://{parsed.netloc}" != SITE_ORIGIN:
+        return None
+
+    path = unquote(parsed.path)
+    return path if path.startswith(URL_PREFIX) else None
+
+
+class ReferenceParser(HTMLParser):
+    """Collect the references an HTML page makes, plus its inline CSS and scripts"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.references = []
+        self.styles = []
+        self.scripts = []
+        self.inline = None  # 'style' or 'script' while inside one
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value for name, value in attrs if value}
+
+        for name in ('src', 'poster', 'data'):
+            if name in attrs:
+                self.references.append(attrs[name])
+        for name in ('srcset', 'imagesrcset'):
+            if name in attrs:
+                # "small.png 1x, large.png 2x": the URL is the first token of each candidate
+                self.references.extend(candidate.split()[0] for candidate in attrs[name].split(',') if candidate.strip())
+
+        rel = set(attrs.get('rel', '').lower().split())
+        if tag in RESOURCE_HREF_TAGS and not rel & IGNORED_LINK_RELS:
+            for name in ('href', 'xlink:href'):
+                if name in attrs:
+                    self.references.append(attrs[name])
+
+        if 'style' in attrs:
+            self.styles.append(attrs['style'])
+        if tag in ('style', 'script'):
+            self.inline = tag
+
+    def handle_endtag(self, tag):
+        if tag == self.inline:
+            self.inline = None
+
+    def handle_data(self, data):
+        if self.inline == 'style':
+            self.styles.append(data)
+        elif self.inline == 'script':
+            self.scripts.append(data)
+
+
+def css_references(text):
+    """Return the url() and @import references of a stylesheet"""
+    return [match[1] for match in CSS_URL_PATTERN.findall(text)] + \
+        [match[1] for match in CSS_IMPORT_PATTERN.findall(text)]
+
+
+def literal_references(text):
+    """Return quoted asset paths found in JS or JSON source"""
+    return LITERAL_PATTERN.findall(text)
+
+
+def file_references(path):
+    """Return the raw references made by a file, depending on its type"""
+    suffix = path.suffix.lower()
+    if suffix not in PARSED_EXTENSIONS:
+        return []
+
+    text = path.read_text(encoding='utf-8', errors='replace')
+    if suffix in ('.html', '.htm'):
+        parser = ReferenceParser()
+        parser.feed(text)
+        parser.close()
+        references = list(parser.references)
+        for style in parser.styles:
+            references.extend(css_references(style))
+        for script in parser.scripts:
+            references.extend(literal_references(script))
+        return references
+    if suffix == '.css':
+        return css_references(text)
+    return literal_references(text)
+
+
+def is_page(url):
+    """Check whether a URL is an HTML page"""
+    return asset_file(url).suffix.lower() in ('.html', '.htm')
+
+
+class ReferenceGraph:
+    def __init__(self, ignored=()):
+        self.ignored = set(ignored)  # URLs that are neither assets nor followed
+        self.raw = {}  # URL -> raw references made by the file, parsed once
+        self.edges = {}  # (URL, page URL) -> URLs of the existing files it references
+        self.missing = {}  # URL of a missing file -> URLs that reference it
+
+    def references(self, url, page):
+        """Return the URLs of the files a file references when loaded by page"""
+        suffix = asset_file(url).suffix.lower()
+        # Paths in scripts and data resolve against the page that runs them, so the
+        # file's own location is only a fallback; HTML and CSS resolve against themselves
+        bases = (page, url) if suffix in ('.js', '.mjs', '.json') else (url,)
+        key = (url, bases[0])
+        if key in self.edges:
+            return self.edges[key]
+
+        if url not in self.raw:
+            self.raw[url] = file_references(asset_file(url))
+
+        targets = set()
+        for reference in self.raw[url]:
+            candidates = [resolve_reference(reference, base) for base in bases]
+            candidates = [target for target in candidates if target not in (None, url) and target not in self.ignored]
+            found = next((target for target in candidates if asset_file(target).is_file()), None)
+            if found:
+                targets.add(found)
+            elif candidates:
+                self.missing.setdefault(candidates[0], set()).add(url)
+
+        self.edges[key] = sorted(targets)
+        return self.edges[key]
+
+    def reachable(self, entry_url):
+        """Return every URL reachable from an entry page, the page itself included"""
+        seen = {entry_url}
+        pending = [(entry_url, entry_url)]
+        while pending:
+            url, page = pending.pop()
+            for target in self.references(url, page):
+                if target not in seen:
+                    seen.add(target)
+                    pending.append((target, target if is_page(target) else page))
+        return sorted(seen)
+
+
+def discover_references(entry_pages, ignored=()):
+    """Map the URL of each entry page (a project path) to the sorted URLs of every asset it reaches.
+
+    References to the URLs in ignored are dropped. Returns (graph, missing) where
+    missing maps each referenced URL that has no file to the URLs referencing it.
+    """
+    references = ReferenceGraph(ignored)
+    graph = {}
+    for path in entry_pages:
+        url = page_url(path)
+        graph[url] = references.reachable(url)
+    return graph, references.missing
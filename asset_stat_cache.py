@@ -0,0 +1,52 @@
+"""
+On-disk cache of asset content hashes for the asset cache generator
+- Keyed by file path relative to the project root
+- Stores the size, modification time and SHA-256 hash of each file
+- A file is hashed again only when its size or modification time changed
+- Entries for files that were not looked up during a run are dropped on save
+"""
+
+import os
+from pathlib import Path
+from sync_manifest import hash_file, load_json, write_json_atomic
+
+
+class AssetStatCache:
+    def __init__(self, cache_file):
+        self.cache_file = Path(cache_file)
+        self.entries = self.load()
+        self.seen = set()  # paths looked up during this run
+        self.hashed = 0  # files hashed during this run (cache misses)
+        self.dirty = False
+
+    def load(self):
+        """Load cached entries from disk, ignoring a missing or corrupt cache file"""
+        return load_json(self.cache_file, 'asset stat cache').get('files', {})
+
+    def save(self):
+        """Write the cache to disk atomically, keeping only the files looked up during this run"""
+        stale = set(self.entries) - self.seen
+        for path in stale:
+            del self.entries[path]
+        if not self.dirty and not stale:
+            return
+
+        data = {'files': dict(sorted(self.entries.items()))}
+        self.dirty = False
+        write_json_atomic(self.cache_file, data)
+
+    def hash(self, path):
+        """Return the SHA-256 hex digest of a file, reusing the cached one if the file is unchanged"""
+        key = Path(path).as_posix()
+        stat = os.stat(path)
+        self.seen.add(key)
+
+        entry = self.entries.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry['hash']
+
+        digest = hash_file(path)
+        self.entries[key] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': digest}
+        self.hashed += 1
+        self.dirty = True
+        return digest
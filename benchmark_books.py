@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the book updater
+
+Runs BookUpdater against a local stand-in for Google Sheets and Google Drive,
+so a full sync can be measured without touching Google:
+- Sheets CSV export with a synthetic catalog of N books
+- Drive HEAD responses with Content-Disposition, ETag and Last-Modified
+- uc?export=download serving synthetic PDFs, the virus-scan confirm page
+  for "large" files and an unrecognized HTML page that forces the
+  drive.usercontent fallback
+- /file/d/ID/view pages for files whose HEAD has no filename
+
+Each catalog size is synced twice in a fresh directory (a cold run and a warm,
+incremental run). Wall time, requests issued, bytes transferred and peak RSS are
+reported per stage.
+
+Usage:
+    python benchmark_books.py --sizes 10 100 1000 --output benchmark.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+import threading
+import contextlib
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import update_books
+
+# Catalog sizes benchmarked by default
+DEFAULT_SIZES = (10, 100, 1000)
+
+# Size of each synthetic PDF in bytes
+DEFAULT_PDF_SIZE = 64 * 1024
+
+# Every Nth file is "large" (virus-scan confirm page) or needs the usercontent fallback
+LARGE_FILE_EVERY = 10
+FALLBACK_FILE_EVERY = 25
+
+# BookUpdater.run stages timed by the benchmark: (stage name, BookUpdater method)
+# The books stage covers the download → compress → thumbnails pipeline; the busy time
+# of each pipeline stage is in the updater's own metrics
+STAGES = (
+    ('sheet', 'fetch_sheets'),
+    ('books', 'process_books_pipelined'),
+    ('html', 'update_html_file'),
+)
+
+LANGUAGES = ('English', 'Bangla', 'Urdu', 'Arabic', 'English, Urdu')
+CATEGORIES = ('Stories', 'Prophets', 'Duas', 'Activity', 'Magazine')
+
+
+def file_id_for(index):
+    """Return the synthetic Drive file ID of the book at index"""
+    return f"benchFile{index:05d}"
+
+
+def file_index(file_id):
+    """Return the catalog index of a synthetic Drive file ID"""
+    return int(file_id[len('benchFile'):])
+
+
+def synthetic_pdf(file_id, size):
+    """Build a valid one-page PDF of roughly size bytes, unique to file_id"""
+    padding_size = max(0, size - 700)
+    padding = random.Random(file_id).randbytes(padding_size)
+    text = f"BT /F1 24 Tf 50 200 Td (Book {file_id}) Tj ET".encode('ascii')
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 400 400] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(text), text),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(padding), padding),
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(pdf)
+
+
+def catalog_csv(size):
+    """Build the Sheets CSV export of a synthetic catalog with size books"""
+    lines = ['Books,Category,Sub-category,Language,Quality,Price']
+    for index in range(size):
+        drive_url = f"https://drive.google.com/file/d/{file_id_for(index)}/view?usp=sharing"
+        category = CATEGORIES[index % len(CATEGORIES)]
+        language = LANGUAGES[index % len(LANGUAGES)]
+        price = 'Premium' if index % 8 == 7 else 'Free'
+        lines.append(f'{drive_url},{category},Book {index},"{language}",High,{price}')
+    return '\n'.join(lines) + '\n'
+
+
+class StandInStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, bytes_in, bytes_out):
+        with self.lock:
+            self.requests += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def snapshot(self):
+        with self.lock:
+            return {'requests': self.requests, 'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Imitates the Google Sheets and Google Drive endpoints used by BookUpdater"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        file_id = query.get('id', [None])[0]
+        parts = url.path.strip('/').split('/')
+
+        if self.server.error_rate and self.server.random.random() < self.server.error_rate:
+            # Simulated throttling: a 429/503, or for downloads the Drive "too many users" page
+            if url.path == '/uc' and send_body and self.server.random.random() < 0.5:
+                page = b"<html><head><title>Google Drive - Quota exceeded</title></head><body>" \
+                       b"Too many users have viewed or downloaded this file recently.</body></html>"
+                self.respond(200, 'text/html', page, send_body)
+            else:
+                self.respond(self.server.random.choice((429, 503)), 'text/plain', b'Slow down', send_body)
+            return
+
+        if url.path.startswith('/spreadsheets/d/') and url.path.endswith('/export'):
+            self.respond(200, 'text/csv', self.server.csv.encode('utf-8'), send_body)
+        elif len(parts) == 4 and parts[:2] == ['file', 'd'] and parts[3] == 'view':
+            title = f"<html><head><title>Book {parts[2]}.pdf - Google Drive</title></head></html>"
+            self.respond(200, 'text/html', title.encode('utf-8'), send_body)
+        elif url.path == '/uc' and file_id:
+            self.serve_uc(file_id, query, send_body)
+        elif url.path == '/download' and file_id:
+            # drive.usercontent.google.com, reached from the confirm form or the fallback URL
+            self.serve_pdf(file_id, send_body)
+        else:
+            self.respond(404, 'text/plain', b'Not Found', send_body)
+
+    def serve_uc(self, file_id, query, send_body):
+        index = file_index(file_id)
+        if index % FALLBACK_FILE_EVERY == FALLBACK_FILE_EVERY - 1 and send_body:
+            # A page the updater does not recognize; it falls back to drive.usercontent
+            page = b"<html><head><title>Google Drive</title></head><body>Please try again later.</body></html>"
+            self.respond(200, 'text/html', page, send_body)
+        elif index % LARGE_FILE_EVERY == LARGE_FILE_EVERY - 1 and 'confirm' not in query:
+            # Large files get the virus-scan warning instead of the PDF (HEAD included)
+            page = (
+                "<html><head><title>Google Drive - Virus scan warning</title></head><body>"
+                "<p>Google Drive can't scan this file for viruses.</p>"
+                f'<form id="download-form" action="{self.server.base_url}/download" method="get">'
+                '<input type="submit" value="Download anyway"/>'
+                f'<input type="hidden" name="id" value="{file_id}">'
+                '<input type="hidden" name="confirm" value="t">'
+                f'<input type="hidden" name="uuid" value="uuid-{file_id}">'
+                "</form></body></html>"
+            ).encode('utf-8')
+            self.respond(200, 'text/html', page, send_body)
+        else:
+            self.serve_pdf(file_id, send_body)
+
+    def serve_pdf(self, file_id, send_body):
+        pdf = self.server.pdf(file_id)
+        etag = f'"{file_id}-v1"'
+        headers = {
+            'Content-Disposition': f'attachment; filename="Book {file_id}.pdf"',
+            'ETag': etag,
+            'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT',
+            'Accept-Ranges': 'bytes',
+        }
+
+        # Range requests resume a download, unless If-Range names another version
+        status = 200
+        range_header = self.headers.get('Range', '')
+        if range_header.startswith('bytes=') and self.headers.get('If-Range', etag) == etag:
+            start = int(range_header[len('bytes='):].split('-')[0] or 0)
+            if start >= len(pdf):
+                self.respond(416, 'text/plain', b'', send_body, {'Content-Range': f'bytes */{len(pdf)}'})
+                return
+            headers['Content-Range'] = f'bytes {start}-{len(pdf) - 1}/{len(pdf)}'
+            pdf = pdf[start:]
+            status = 206
+
+        # Simulated flaky network: the connection drops halfway through the body
+        truncate = send_body and self.server.interrupt_rate and self.server.random.random() < self.server.interrupt_rate
+        self.respond(status, 'application/pdf', pdf, send_body, headers, truncate=truncate)
+
+    def respond(self, status, content_type, body, send_body, headers=None, truncate=False):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body and truncate:
+            body = body[:len(body) // 2]
+            self.wfile.write(body)
+            self.wfile.flush()
+            self.close_connection = True
+        elif send_body:
+            self.wfile.write(body)
+
+        request_size = len(self.requestline) + sum(len(k) + len(v) + 4 for k, v in self.headers.items())
+        self.server.stats.record(request_size, len(body) if send_body else 0)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, csv, pdf_size, error_rate=0.0, interrupt_rate=0.0):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.csv = csv
+        self.pdf_size = pdf_size
+        self.error_rate = error_rate
+        self.interrupt_rate = interrupt_rate
+        self.random = random.Random(0)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.stats = StandInStats()
+        self.pdfs = {}
+        self.pdfs_lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # The updater closes connections early, e.g. after a throttled response; that is not an error
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    def pdf(self, file_id):
+        with self.pdfs_lock:
+            if file_id not in self.pdfs:
+                self.pdfs[file_id] = synthetic_pdf(file_id, self.pdf_size)
+            return self.pdfs[file_id]
+
+
+def reset_peak_rss():
+    """Reset the peak RSS of this process where the kernel allows it (Linux)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    """Return the peak RSS of this process in MB since the last reset"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is the lifetime peak: kilobytes on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def children_peak_rss_mb():
+    """Return the largest peak RSS of any finished worker process (gs, thumbnails) in MB"""
+    maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def instrument(updater, server, results):
+    """Wrap the stage methods of an updater so each call is measured"""
+    for stage, method_name in STAGES:
+        method = getattr(updater, method_name)
+
+        def measured(*args, _stage=stage, _method=method, **kwargs):
+            before = server.stats.snapshot()
+            reset_peak_rss()
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                after = server.stats.snapshot()
+                results[_stage] = {
+                    'seconds': round(time.perf_counter() - start, 4),
+                    'requests': after['requests'] - before['requests'],
+                    'bytes_in': after['bytes_in'] - before['bytes_in'],
+                    'bytes_out': after['bytes_out'] - before['bytes_out'],
+                    'peak_rss_mb': round(peak_rss_mb(), 1),
+                    'children_peak_rss_mb': round(children_peak_rss_mb(), 1),
+                }
+
+        setattr(updater, method_name, measured)
+
+
+def run_sync(server, workers, verbose):
+    """Run one BookUpdater sync against the stand-in and return per-stage results and the updater's metrics"""
+    updater = update_books.BookUpdater(
+        f"{server.base_url}/spreadsheets/d/benchmark/edit",
+        max_workers=workers
+    )
+    updater.sheets_base_url = server.base_url
+    updater.drive_base_url = server.base_url
+    updater.drive_usercontent_base_url = server.base_url
+
+    results = {}
+    instrument(updater, server, results)
+
+    before = server.stats.snapshot()
+    reset_peak_rss()
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        updater.run()
+    after = server.stats.snapshot()
+
+    results['total'] = {
+        'seconds': round(time.perf_counter() - start, 4),
+        'requests': after['requests'] - before['requests'],
+        'bytes_in': after['bytes_in'] - before['bytes_in'],
+        'bytes_out': after['bytes_out'] - before['bytes_out'],
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'children_peak_rss_mb': round(children_peak_rss_mb(), 1),
+        'failed_downloads': updater.failed_downloads,
+    }
+    return {
+        'stages': results,
+        # The updater's own per-stage metrics, including nested metadata/download stages
+        'updater_metrics': updater.metrics.report()['stages'],
+    }
+
+
+def benchmark_size(size, pdf_size, workers, verbose, error_rate=0.0, interrupt_rate=0.0):
+    """Benchmark a cold and a warm sync of a catalog with size books"""
+    server = StandInServer(catalog_csv(size), pdf_size, error_rate, interrupt_rate)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    html_template = Path(__file__).resolve().parent / 'read' / 'index.html'
+    original_cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory(prefix='book-benchmark-') as work_dir:
+            os.chdir(work_dir)
+            Path('read/pdf').mkdir(parents=True)
+            if html_template.exists():
+                shutil.copy(html_template, 'read/index.html')
+
+            return {
+                'cold': run_sync(server, workers, verbose),
+                'warm': run_sync(server, workers, verbose),
+            }
+    finally:
+        os.chdir(original_cwd)
+        server.shutdown()
+        server.server_close()
+
+
+def print_report(report):
+    """Print a per-stage table for every benchmarked catalog size"""
+    print(f"\n{'books':>6} {'run':<5} {'stage':<11} {'seconds':>9} {'requests':>9} {'MB in':>8} {'MB out':>8} {'peak RSS':>9}")
+    for size, runs in report['sizes'].items():
+        for run_name, run in runs.items():
+            for stage, stats in run['stages'].items():
+                print(f"{size:>6} {run_name:<5} {stage:<11} {stats['seconds']:>9.3f} {stats['requests']:>9} "
+                      f"{stats['bytes_in'] / 1048576:>8.2f} {stats['bytes_out'] / 1048576:>8.2f} "
+                      f"{stats['peak_rss_mb']:>7.1f}MB")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark BookUpdater against a local Sheets/Drive stand-in')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='catalog sizes to benchmark')
+    parser.add_argument('--pdf-size', type=int, default=DEFAULT_PDF_SIZE, help='size of each synthetic PDF in bytes')
+    parser.add_argument('--workers', type=int, default=update_books.DEFAULT_DOWNLOAD_WORKERS, help='parallel PDF downloads')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with throttling (429/503 or a Drive quota page)')
+    parser.add_argument('--interrupt-rate', type=float, default=0.0,
+                        help='fraction of PDF transfers cut off halfway (resumed with Range requests)')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    parser.add_argument('--verbose', action='store_true', help='show the updater output')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        'pdf_size': args.pdf_size,
+        'workers': args.workers,
+        'error_rate': args.error_rate,
+        'interrupt_rate': args.interrupt_rate,
+        'sizes': {}
+    }
+
+    for size in args.sizes:
+        print(f"⏱️  Benchmarking {size} books...")
+        report['sizes'][str(size)] = benchmark_size(size, args.pdf_size, args.workers, args.verbose,
+                                                    args.error_rate, args.interrupt_rate)
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
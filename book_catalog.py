@@ -0,0 +1,214 @@
+"""
+Catalog model and region renderer for the book reader (read/index.html)
+- Groups books by language → category (free books) and premium, in sheet order
+- Rewrites marked regions of the page in a single pass, instead of
+  searching for and splicing around existing elements
+- Indexes the PDFs on disk once per run, so reconciling the sheet,
+  read/pdf and the page is a set lookup instead of a directory scan
+"""
+
+import os
+import threading
+from pathlib import Path
+
+# Marked regions of read/index.html owned by the book updater: (start marker, end marker)
+CATALOG_REGION = ('<!-- BOOK-CATALOG:START -->', '<!-- BOOK-CATALOG:END -->')
+FLIPBOOK_REGION = ('// BOOK-FLIPBOOKS:START', '// BOOK-FLIPBOOKS:END')
+
+# Category used for free books without one
+DEFAULT_CATEGORY = 'General'
+
+
+class BookCatalog:
+    def __init__(self, books=()):
+        # language → {'categories': {category: [books]}, 'premium': [books]}
+        self.languages = {}
+        self.placed = set()  # (language, book ID, premium) already in a section
+        for book in books:
+            self.add_book(book)
+
+    def add_book(self, book):
+        """Add a book to every language section it belongs to
+
+        Books that share a PDF (and so a card ID) appear once per language section, in
+        the category of the first one.
+        """
+        category = book.get('category', '').strip() or DEFAULT_CATEGORY
+        for language in book['languages']:
+            key = (language, book['id'], book.get('is_premium', False))
+            if key in self.placed:
+                continue
+            self.placed.add(key)
+            section = self.languages.setdefault(language, {'categories': {}, 'premium': []})
+            if book.get('is_premium', False):
+                # Premium books go to a separate premium section (no category)
+                section['premium'].append(book)
+            else:
+                section['categories'].setdefault(category, []).append(book)
+
+    def sections(self):
+        """Yield (language, structure) for every language that has books"""
+        for language, structure in self.languages.items():
+            if structure['categories'] or structure['premium']:
+                yield language, structure
+
+    def books(self):
+        """Yield each book once, in catalog order"""
+        seen = set()
+        for language, structure in self.languages.items():
+            for books in structure['categories'].values():
+                for book in books:
+                    if id(book) not in seen:
+                        seen.add(id(book))
+                        yield book
+            for book in structure['premium']:
+                if id(book) not in seen:
+                    seen.add(id(book))
+                    yield book
+
+
+class ReconciliationIndex:
+    def __init__(self, pdf_dir, html_id):
+        """Scan pdf_dir once; html_id(filename, is_premium) generates the HTML ID of a book"""
+        self.pdf_dir = Path(pdf_dir)
+        self.html_id = html_id
+        self.lock = threading.Lock()
+        self.pdfs = {}  # filename (without extension) → PDF path
+        self.ids = {}  # filename → (regular HTML ID, premium HTML ID)
+        self.parts = set()  # filenames with an unfinished download ({filename}.pdf.part)
+
+        if self.pdf_dir.exists():
+            with os.scandir(self.pdf_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or not entry.is_file():
+                        continue
+                    if entry.name.endswith('.pdf'):
+                        self.pdfs[entry.name[:-4]] = Path(entry.path)
+                    elif entry.name.endswith('.pdf.part'):
+                        self.parts.add(entry.name[:-9])
+
+    def __len__(self):
+        with self.lock:
+            return len(self.pdfs)
+
+    def add(self, filename):
+        """Record that the PDF for filename now exists"""
+        with self.lock:
+            self.pdfs[filename] = self.pdf_dir / f"{filename}.pdf"
+
+    def discard(self, filename):
+        """Record that the PDF for filename was removed"""
+        with self.lock:
+            self.pdfs.pop(filename, None)
+
+    def has_pdf(self, filename):
+        """Check whether a PDF exists for filename"""
+        with self.lock:
+            return filename in self.pdfs
+
+    def pdf_path(self, filename):
+        """Return the PDF path for filename, or None if there is no such PDF"""
+        with self.lock:
+            return self.pdfs.get(filename)
+
+    def filenames(self):
+        """Return the filenames of all indexed PDFs, sorted"""
+        with self.lock:
+            return sorted(self.pdfs)
+
+    def part_filenames(self):
+        """Return the filenames of PDFs with an unfinished download, sorted"""
+        with self.lock:
+            return sorted(self.parts)
+
+    def html_ids(self, filename):
+        """Return the (regular, premium) HTML IDs for filename"""
+        with self.lock:
+            ids = self.ids.get(filename)
+        if ids is None:
+            ids = (self.html_id(filename, False), self.html_id(filename, True))
+            with self.lock:
+                self.ids[filename] = ids
+        return ids
+
+    def html_id_for(self, filename, is_premium=False):
+        """Return the regular or premium HTML ID for filename"""
+        return self.html_ids(filename)[1 if is_premium else 0]
+
+
+def has_region(html, region):
+    """Check whether both markers of a region are present in the page"""
+    start_marker, end_marker = region
+    start = html.find(start_marker)
+    return start != -1 and html.find(end_marker, start) != -1
+
+
+def render_regions(html, contents):
+    """Replace the lines between each region's start and end marker lines in one pass over the page.
+
+    contents maps a region (start marker, end marker) to its new content. The marker
+    lines themselves are kept, so the page can be re-rendered on every run.
+    Raises ValueError if a region's markers are missing.
+    """
+    spans = []
+    for (start_marker, end_marker), content in contents.items():
+        start = html.find(start_marker)
+        end = html.find(end_marker, start) if start != -1 else -1
+        if start == -1 or end == -1:
+            raise ValueError(f"Region markers {start_marker} ... {end_marker} not found")
+
+        # The region runs from the line after the start marker to the start of the end marker's line
+        region_start = html.find('\n', start) + 1
+        region_end = html.rfind('\n', 0, end) + 1
+        spans.append((region_start, region_end, content))
+
+    pieces = []
+    position = 0
+    for region_start, region_end, content in sorted(spans):
+        pieces.append(html[position:region_start])
+        if content:
+            pieces.append(content.rstrip('\n') + '\n')
+        position = region_end
+    pieces.append(html[position:])
+
+    return ''.join(pieces)
+
+
+def add_region_markers(html):
+    """Insert the catalog and flipbook region markers into a page that predates them.
+
+    Locates the $(document).ready block of the inline script and the content
+    container the same way the old search-and-splice updater did, and wraps
+    their contents in marker lines. Raises ValueError if either cannot be found.
+    """
+    if not has_region(html, FLIPBOOK_REGION):
+        script_start = html.find('<script type="text/javascript">')
+        script_end = html.find('</script>', script_start) if script_start != -1 else -1
+        ready_start = html.find('$(document).ready(function () {', script_start, script_end) if script_end != -1 else -1
+        ready_end = html.rfind('});', ready_start, script_end) if ready_start != -1 else -1
+        if ready_end == -1:
+            raise ValueError("Could not find the $(document).ready block of the JavaScript script tag")
+
+        after_ready = html.find('\n', ready_start) + 1
+        before_close = html.rfind('\n', 0, ready_end) + 1
+        html = (html[:after_ready]
+                + f"        {FLIPBOOK_REGION[0]}\n"
+                + html[after_ready:before_close]
+                + f"        {FLIPBOOK_REGION[1]}\n"
+                + html[before_close:])
+
+    if not has_region(html, CATALOG_REGION):
+        content_start = html.find('<div class="content-container">')
+        content_end = html.find('</div>\n    </div>', content_start) if content_start != -1 else -1
+        if content_end == -1:
+            raise ValueError("Could not find the content container")
+
+        after_open = html.find('\n', content_start) + 1
+        before_close = html.rfind('\n', 0, content_end) + 1
+        html = (html[:after_open]
+                + f"        {CATALOG_REGION[0]}\n"
+                + html[after_open:before_close]
+                + f"        {CATALOG_REGION[1]}\n"
+                + html[before_close:])
+
+    return html
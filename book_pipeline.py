@@ -0,0 +1,87 @@
+"""
+Staged pipeline for per-book processing in the book updater
+- Each stage has its own worker threads and reads from a bounded queue, so
+  a book moves on to the next stage as soon as one stage is done with it
+- Bounded queues apply backpressure: when a later stage falls behind,
+  putting more books into the pipeline blocks instead of piling up work
+- Closing the pipeline drains every stage in order and returns the books
+  that made it through the last one
+"""
+
+import queue
+import threading
+
+# Books that may wait between two stages, per worker of the receiving stage
+DEFAULT_QUEUE_SIZE = 2
+
+# Tells a stage worker that no more books are coming
+STOP = object()
+
+
+class BookPipeline:
+    def __init__(self, stages, queue_size=DEFAULT_QUEUE_SIZE):
+        """stages is a list of (name, function, workers)
+
+        A stage function receives a book and returns it (or a replacement) for the
+        next stage, or None to drop it. Exceptions are reported and drop the book.
+        """
+        self.stages = [(name, function, max(1, int(workers))) for name, function, workers in stages]
+        self.queues = [queue.Queue(maxsize=queue_size * workers) for name, function, workers in self.stages]
+        self.threads = []
+        self.lock = threading.Lock()
+        self.results = []  # books that came out of the last stage, in completion order
+        self.closed = False
+
+        for index, (name, function, workers) in enumerate(self.stages):
+            stage_threads = []
+            for number in range(workers):
+                thread = threading.Thread(target=self.work, args=(index,), name=f"{name}-{number}", daemon=True)
+                thread.start()
+                stage_threads.append(thread)
+            self.threads.append(stage_threads)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def put(self, book):
+        """Hand a book to the first stage, waiting while its queue is full"""
+        if self.closed:
+            raise RuntimeError("Cannot add books to a closed pipeline")
+        self.queues[0].put(book)
+
+    def work(self, index):
+        """Run one worker of a stage until it is told to stop"""
+        name, function, workers = self.stages[index]
+        next_queue = self.queues[index + 1] if index + 1 < len(self.queues) else None
+        while True:
+            book = self.queues[index].get()
+            if book is STOP:
+                return
+            try:
+                book = function(book)
+            except Exception as e:
+                print(f"❌ {name} failed for {book}: {e}")
+                book = None
+            if book is None:
+                continue
+            if next_queue is not None:
+                next_queue.put(book)
+            else:
+                with self.lock:
+                    self.results.append(book)
+
+    def close(self):
+        """Wait for every book to pass through all stages and return the finished books"""
+        if not self.closed:
+            self.closed = True
+            # A stage is stopped only after the previous one, so everything it passed on is processed
+            for stage_queue, stage_threads in zip(self.queues, self.threads):
+                for thread in stage_threads:
+                    stage_queue.put(STOP)
+                for thread in stage_threads:
+                    thread.join()
+        with self.lock:
+            return list(self.results)
@@ -0,0 +1,95 @@
+"""
+On-disk cache of Google Drive file metadata
+- Keyed by Drive file ID
+- Stores the normalized filename, size and ETag/Last-Modified of each file
+- Entries expire after a TTL (or immediately when a refresh is requested)
+- Shared in memory within one run, so each file ID is resolved at most once
+"""
+
+import time
+import threading
+from pathlib import Path
+from sync_manifest import load_json, write_json_atomic
+
+# Default time-to-live for cached metadata entries (7 days)
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+class DriveMetadataCache:
+    def __init__(self, cache_file, ttl=DEFAULT_TTL, refresh=False):
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self.refresh = refresh
+        self.entries = self.load()
+        self.resolved = set()  # file IDs looked up during this run
+        self.failed = set()  # file IDs whose lookup failed during this run
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def load(self):
+        """Load cached entries from disk, ignoring a missing or corrupt cache file"""
+        return load_json(self.cache_file, 'Drive metadata cache').get('files', {})
+
+    def save(self):
+        """Write the cache to disk atomically if anything changed"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {'files': dict(sorted(self.entries.items()))}
+            self.dirty = False
+        write_json_atomic(self.cache_file, data)
+
+    def key_lock(self, file_id):
+        """Return the lock that serializes lookups of a single file ID"""
+        with self.lock:
+            if file_id not in self.key_locks:
+                self.key_locks[file_id] = threading.Lock()
+            return self.key_locks[file_id]
+
+    def is_fresh(self, entry):
+        """Check whether a cached entry is still within its TTL"""
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    def get(self, file_id):
+        """Return cached metadata for a file ID, or None if it must be looked up again"""
+        with self.lock:
+            entry = self.entries.get(file_id)
+            if entry is None:
+                return None
+            if file_id in self.resolved:
+                return entry
+            if self.refresh or not self.is_fresh(entry):
+                return None
+            return entry
+
+    def put(self, file_id, metadata):
+        """Store freshly fetched metadata for a file ID"""
+        entry = dict(metadata)
+        entry['fetched_at'] = time.time()
+        with self.lock:
+            self.entries[file_id] = entry
+            self.resolved.add(file_id)
+            self.failed.discard(file_id)
+            self.dirty = True
+        return entry
+
+    def resolve(self, file_id, fetch):
+        """Return metadata for a file ID, calling fetch(file_id) at most once per run on a miss"""
+        with self.key_lock(file_id):
+            entry = self.get(file_id)
+            if entry is not None:
+                return entry
+
+            with self.lock:
+                if file_id in self.failed:
+                    return self.entries.get(file_id)
+
+            metadata = fetch(file_id)
+            if metadata is None:
+                with self.lock:
+                    self.failed.add(file_id)
+                    # Fall back to an expired entry rather than losing the book
+                    return self.entries.get(file_id)
+
+            return self.put(file_id, metadata)
@@ -2,74 +2,75 @@
 """
 Asset Cache Generator for KidsGames PWA
 
-This script scans the entire project structure and generates a comprehensive
-list of static assets (CSS, JS, images, fonts) that should be pre-cached
-by the service worker for reliable offline functionality.
+This script follows the references of the site's entry pages (HTML, CSS and JS)
+to find the static assets they actually load, and generates the list of assets
+that should be pre-cached by the service worker for reliable offline functionality.
 """
 
 import os
+import glob
 import json
 import re
+import hashlib
+import argparse
 from pathlib import Path
-
-def find_assets(base_path, asset_extensions):
-    """Find all assets with given extensions in the base path."""
-    assets = []
-    base_path = Path(base_path)
-
-    # Skip these directories to avoid unnecessary files
-    skip_dirs = {
-        '__pycache__', '.git', 'node_modules', '.vscode',
-        '.DS_Store', '*.tmp', '*.log', 'venv', 'env'
-    }
-
-    for root, dirs, files in os.walk(base_path):
-        # Skip unwanted directories
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in skip_dirs]
-
-        for file in files:
-            if not file.startswith('.') and file.endswith(tuple(asset_extensions)):
-                # Get relative path from base_path
-                full_path = Path(root) / file
-                relative_path = full_path.relative_to(base_path)
-                assets.append(f"/KidsGames/{relative_path}")
-
-    return sorted(assets)
-
-def categorize_assets():
-    """Categorize assets by type and priority."""
-
-    # Asset extensions by category
-    extensions = {
-        'css': ['.css'],
-        'js': ['.js', '.mjs'],
-        'images': ['.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico'],
-        'fonts': ['.woff', '.woff2', '.ttf', '.otf', '.eot'],
-        'media': ['.mp3', '.wav', '.mp4', '.webm', '.ogg']
-    }
-
-    # Directories to scan
-    directories = ['games', 'premium-games', 'read', 'icons']
-
-    categorized_assets = {}
-
-    for category, ext_list in extensions.items():
-        assets = []
-        for directory in directories:
-            if os.path.exists(directory):
-                assets.extend(find_assets(directory, ext_list))
-
-        # Also check root level for assets
-        root_path = Path('.')
-        root_assets = []
-        for file in root_path.iterdir():
-            if file.is_file() and not file.name.startswith('.') and file.name.endswith(tuple(ext_list)):
-                root_assets.append(f"/KidsGames/{file.name}")
-        assets.extend(root_assets)
-
-        # Remove duplicates
-        assets = list(set(assets))
-        categorized_assets[category] = sorted(assets)
+from asset_stat_cache import AssetStatCache
+from asset_references import URL_PREFIX, asset_file, discover_references
+
+# Hex digits of a content hash kept as an asset's precache revision
+REVISION_LENGTH = 10
+
+# The service worker script, which is never precached: the browser checks it for
+# updates itself, and its hash changes whenever the manifest written into it does
+SERVICE_WORKER_FILE = 'sw.js'
+
+# Asset extensions by category (anything else reachable is filed under 'other')
+ASSET_EXTENSIONS = {
+    'pages': ['.html', '.htm'],
+    'data': ['.json'],
+    'css': ['.css'],
+    'js': ['.js', '.mjs'],
+    'images': ['.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico'],
+    'fonts': ['.woff', '.woff2', '.ttf', '.otf', '.eot'],
+    'media': ['.mp3', '.wav', '.mp4', '.webm', '.ogg']
+}
+
+# Pages whose references make up the site's assets; every games/*/index.html is one too
+ENTRY_PAGES = ['index.html', 'quizzes.html', 'read/index.html']
+
+# Directory of the games; a game's assets are precached together or not at all
+GAMES_DIR = 'games'
+
+# Megabytes the initial precache may download (override with --budget-mb)
+DEFAULT_BUDGET_MB = 15
+
+# Value of one asset of each priority when ranking groups by value per byte
+PRIORITY_VALUES = {
+    'high_priority': 4,
+    'medium_priority': 2,
+    'low_priority': 1
+}
+
+# Content hashes of scanned files, reused while a file's size and mtime are unchanged
+STAT_CACHE_FILE = '.asset_stat_cache.json'
+
+def find_entry_pages(games_dir=GAMES_DIR):
+    """Return the entry pages that exist: the site pages and every game's index.html."""
+    pages = [page for page in ENTRY_PAGES if os.path.isfile(page)]
+    pages.extend(sorted(glob.glob(os.path.join(games_dir, '*', 'index.html'))))
+    return [Path(page).as_posix() for page in pages]
+
+def categorize_assets(asset_urls):
+    """Categorize assets by type."""
+    categories = {}
+    for category, ext_list in ASSET_EXTENSIONS.items():
+        for ext in ext_list:
+            categories[ext] = category
+
+    categorized_assets = {category: [] for category in ASSET_EXTENSIONS}
+    categorized_assets['other'] = []
+    for url in sorted(set(asset_urls)):
+        categorized_assets[categories.get(asset_file(url).suffix.lower(), 'other')].append(url)
 
     return categorized_assets
 
@@ -80,12 +81,14 @@ def generate_service_worker_assets(categorized_assets):
     core_assets = [
         '/KidsGames/',
         '/KidsGames/index.html',
-        '/KidsGames/manifest.json',
-        '/KidsGames/sw.js'
+        '/KidsGames/quizzes.html',
+        '/KidsGames/manifest.json'
     ]
 
-    # Add high priority assets (CSS and JS)
+    # Add high priority assets (pages, data, CSS and JS)
     high_priority = []
+    high_priority.extend(categorized_assets.get('pages', []))
+    high_priority.extend(categorized_assets.get('data', []))
     high_priority.extend(categorized_assets.get('css', []))
     high_priority.extend(categorized_assets.get('js', []))
     high_priority.extend(categorized_assets.get('fonts', []))
@@ -104,6 +107,12 @@ def generate_service_worker_assets(categorized_assets):
             low_priority.append(img)
 
     low_priority.extend(categorized_assets.get('media', []))
+    low_priority.extend(categorized_assets.get('other', []))
+
+    # Core files are precached anyway
+    high_priority = [url for url in high_priority if url not in core_assets]
+    medium_priority = [url for url in medium_priority if url not in core_assets]
+    low_priority = [url for url in low_priority if url not in core_assets]
 
     return {
         'core': core_assets,
@@ -112,15 +121,150 @@ def generate_service_worker_assets(categorized_assets):
         'low_priority': low_priority
     }
 
-def generate_cache_version():
-    """Generate a cache version based on current timestamp."""
-    import datetime
-    return datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
-
-def update_service_worker(assets_by_priority):
-    """Update the service worker with new asset lists."""
-
-    sw_file = 'sw.js'
+def asset_size(url):
+    """Return the size in bytes of the file served at an asset URL (0 if it is missing)."""
+    path = asset_file(url)
+    return path.stat().st_size if path.is_file() else 0
+
+def generate_game_bundles(reference_graph, games_dir=GAMES_DIR):
+    """List every asset each game's index.html reaches, with the game's total size."""
+    bundles = {}
+    for page, urls in reference_graph.items():
+        parts = asset_file(page).parts
+        if len(parts) == 3 and parts[0] == games_dir and parts[2] == 'index.html':
+            bundles[parts[1]] = {
+                'files': urls,
+                'bytes': sum(asset_size(url) for url in urls)
+            }
+
+    return dict(sorted(bundles.items()))
+
+def format_size(size):
+    """Format a byte count in megabytes."""
+    return f"{size / (1024 * 1024):.2f} MB"
+
+def plan_precache(assets_by_priority, budget, game_bundles):
+    """Choose the assets to precache within a byte budget.
+
+    Core assets are always included. The rest are grouped (each game's bundle
+    forms one group, any asset outside a game is its own group) and groups are
+    added by priority, then by value per byte, skipping any group that no longer
+    fits. Assets a group shares with one already included cost nothing again.
+    Returns (assets, plan) where plan lists every group, its size and why it was
+    included or excluded.
+    """
+    core = assets_by_priority['core']
+    used = sum(asset_size(url) for url in core)
+    assets = list(core)
+    plan = [{
+        'group': 'core',
+        'priority': 'core',
+        'files': len(core),
+        'bytes': used,
+        'added_bytes': used,
+        'included': True,
+        'reason': 'core assets are always precached'
+    }]
+    if used > budget:
+        print(f"⚠️  Core assets alone ({format_size(used)}) exceed the precache budget of {format_size(budget)}")
+
+    # A group takes the highest priority of its assets and the value of all of them
+    priorities = {}
+    for priority in PRIORITY_VALUES:
+        for url in assets_by_priority[priority]:
+            priorities.setdefault(url, priority)
+    ranks = {priority: rank for rank, priority in enumerate(PRIORITY_VALUES)}
+
+    members = {f"{GAMES_DIR}/{game}": bundle['files'] for game, bundle in game_bundles.items()}
+    in_games = {url for urls in members.values() for url in urls}
+    for url in priorities:
+        if url not in in_games:
+            members[url[len(URL_PREFIX):]] = [url]
+
+    groups = []
+    for name, urls in members.items():
+        urls = [url for url in urls if url in priorities]
+        if not urls:
+            continue
+        priority = min((priorities[url] for url in urls), key=ranks.get)
+        groups.append({
+            'group': name,
+            'priority': priority,
+            'rank': ranks[priority],
+            'urls': urls,
+            'bytes': sum(asset_size(url) for url in urls),
+            'value': sum(PRIORITY_VALUES[priorities[url]] for url in urls)
+        })
+
+    included_urls = set(assets)
+    ranked = sorted(groups, key=lambda group: (
+        group['rank'], -group['value'] / max(group['bytes'], 1), group['group']
+    ))
+    for group in ranked:
+        new_urls = [url for url in group['urls'] if url not in included_urls]
+        needed = sum(asset_size(url) for url in new_urls)
+        included = used + needed <= budget
+        if included:
+            used += needed
+            assets.extend(new_urls)
+            included_urls.update(new_urls)
+            reason = 'fits within the budget'
+        else:
+            reason = f"over budget ({format_size(needed)} needed, {format_size(budget - used)} left)"
+        plan.append({
+            'group': group['group'],
+            'priority': group['priority'],
+            'files': len(group['urls']),
+            'bytes': group['bytes'],
+            'added_bytes': needed if included else 0,
+            'included': included,
+            'reason': reason
+        })
+
+    return assets, plan
+
+def print_precache_report(plan, budget):
+    """Print which asset groups were included in the precache and why the others were not."""
+    included = [entry for entry in plan if entry['included']]
+    used = sum(entry['added_bytes'] for entry in included)
+    print(f"\n📦 Precache plan: {len(included)} of {len(plan)} groups, {format_size(used)} of {format_size(budget)} budget")
+    for entry in plan:
+        icon = '✅' if entry['included'] else '⏭️ '
+        print(f"  {icon} {entry['group']} [{entry['priority']}] {entry['files']} files, "
+              f"{format_size(entry['bytes'])}: {entry['reason']}")
+
+def asset_revision(path, stat_cache):
+    """Return an asset's revision: a short hash of its content."""
+    return stat_cache.hash(path)[:REVISION_LENGTH]
+
+def generate_precache_manifest(asset_urls, stat_cache):
+    """Build the precache manifest, one {url, revision} entry per asset."""
+    manifest = []
+    seen = set()
+    for url in asset_urls:
+        if url in seen:
+            continue
+        seen.add(url)
+
+        path = asset_file(url)
+        if not path.is_file():
+            print(f"⚠️  Skipping {url}: {path} not found")
+            continue
+        manifest.append({'url': url, 'revision': asset_revision(path, stat_cache)})
+
+    return manifest
+
+def generate_cache_version(precache_manifest):
+    """Derive the cache version from the asset revisions, so it only changes when an asset does."""
+    digest = hashlib.sha256()
+    for entry in sorted(precache_manifest, key=lambda entry: entry['url']):
+        digest.update(f"{entry['url']} {entry['revision']}\n".encode('utf-8'))
+    return digest.hexdigest()[:REVISION_LENGTH]
+
+def update_service_worker(precache_manifest, cache_version, game_bundles):
+    """Update the service worker with the precache manifest, cache version and game bundles."""
+
+    sw_file = SERVICE_WORKER_FILE
     if not os.path.exists(sw_file):
         print(f"Error: {sw_file} not found!")
         return False
@@ -129,46 +273,55 @@ def update_service_worker(assets_by_priority):
     with open(sw_file, 'r', encoding='utf-8') as f:
         content = f.read()
 
-    # Generate new STATIC_ASSETS array
-    all_assets = []
-    all_assets.extend(assets_by_priority['core'])
-    all_assets.extend(assets_by_priority['high_priority'])
-    all_assets.extend(assets_by_priority['medium_priority'])
-
-    # Limit low priority assets to prevent cache size issues
-    low_priority_limit = 100  # Adjust based on cache size constraints
-    all_assets.extend(assets_by_priority['low_priority'][:low_priority_limit])
-
-    # Create the new STATIC_ASSETS array
-    static_assets_str = 'const STATIC_ASSETS = [\n'
-    for asset in all_assets:
-        static_assets_str += f"  '{asset}',\n"
-    static_assets_str += '];'
+    # Create the new PRECACHE_MANIFEST array
+    manifest_str = 'const PRECACHE_MANIFEST = [\n'
+    for entry in precache_manifest:
+        manifest_str += f"  {{ url: {json.dumps(entry['url'])}, revision: '{entry['revision']}' }},\n"
+    manifest_str += '];'
+
+    # Find and replace the PRECACHE_MANIFEST definition
+    pattern = r'const PRECACHE_MANIFEST = \[[\s\S]*?\];'
+    new_content, replaced = re.subn(pattern, lambda match: manifest_str, content)
+    if not replaced:
+        print(f"Error: no PRECACHE_MANIFEST found in {sw_file}!")
+        return False
 
-    # Update the service worker content
-    # Find and replace the STATIC_ASSETS definition
-    pattern = r'const STATIC_ASSETS = \[[\s\S]*?\];'
-    new_content = re.sub(pattern, static_assets_str, content)
+    # Replace the GAME_BUNDLES definition (only its closing brace is followed by a semicolon)
+    bundles_str = f"const GAME_BUNDLES = {json.dumps(game_bundles, indent=2)};"
+    new_content, replaced = re.subn(r'const GAME_BUNDLES = \{[\s\S]*?\};', lambda match: bundles_str, new_content)
+    if not replaced:
+        print(f"Error: no GAME_BUNDLES found in {sw_file}!")
+        return False
 
     # Update cache version
-    cache_version = generate_cache_version()
     version_pattern = r'const CACHE_VERSION = [\'"][^\'\"]*[\'"];'
     new_content = re.sub(version_pattern, f"const CACHE_VERSION = '{cache_version}';", new_content)
 
+    if new_content == content:
+        print(f"✅ {sw_file} is already up to date ({len(precache_manifest)} assets)")
+        return True
+
     # Write updated service worker
     with open(sw_file, 'w', encoding='utf-8') as f:
         f.write(new_content)
 
-    print(f"✅ Updated {sw_file} with {len(all_assets)} assets")
+    print(f"✅ Updated {sw_file} with {len(precache_manifest)} assets")
     print(f"📦 Cache version: {cache_version}")
     return True
 
-def main():
+def main(budget_mb=DEFAULT_BUDGET_MB):
     """Main function to generate asset cache and update service worker."""
-    print("🔍 Scanning for static assets...")
+    print("🔍 Following references from the entry pages...")
+
+    # Every asset some entry page reaches; the service worker script lists all assets, so it is not followed
+    entry_pages = find_entry_pages()
+    reference_graph, missing_references = discover_references(entry_pages, ignored=[f"{URL_PREFIX}{SERVICE_WORKER_FILE}"])
+    print(f"🔗 {len(entry_pages)} entry pages reach {len(set().union(*reference_graph.values()))} assets")
+    if missing_references:
+        print(f"⚠️  {len(missing_references)} referenced files do not exist (listed in the asset inventory)")
 
     # Categorize all assets
-    categorized_assets = categorize_assets()
+    categorized_assets = categorize_assets(url for urls in reference_graph.values() for url in urls)
 
     # Print asset summary
     total_assets = sum(len(assets) for assets in categorized_assets.values())
@@ -181,28 +334,57 @@ def main():
 
     print(f"\n📋 Asset distribution for caching:")
     print(f"  Core: {len(assets_by_priority['core'])}")
-    print(f"  High Priority (CSS/JS/Fonts): {len(assets_by_priority['high_priority'])}")
+    print(f"  High Priority (Pages/Data/CSS/JS/Fonts): {len(assets_by_priority['high_priority'])}")
     print(f"  Medium Priority (Essential Images): {len(assets_by_priority['medium_priority'])}")
     print(f"  Low Priority (Other Assets): {len(assets_by_priority['low_priority'])}")
 
+    # Every game can also be cached whole on request
+    game_bundles = generate_game_bundles(reference_graph)
+    bundle_bytes = sum(bundle['bytes'] for bundle in game_bundles.values())
+    print(f"🎮 {len(game_bundles)} game bundles for offline install, {format_size(bundle_bytes)} in total")
+
+    # Fill the precache budget group by group
+    budget = int(budget_mb * 1024 * 1024)
+    precache_assets, precache_plan = plan_precache(assets_by_priority, budget, game_bundles)
+    print_precache_report(precache_plan, budget)
+
+    # Hash every precached asset; files unchanged since the last run reuse their cached hash
+    stat_cache = AssetStatCache(STAT_CACHE_FILE)
+    precache_manifest = generate_precache_manifest(precache_assets, stat_cache)
+    stat_cache.save()
+    print(f"\n🔑 Hashed {stat_cache.hashed} of {len(precache_manifest)} precached assets (others unchanged)")
+    cache_version = generate_cache_version(precache_manifest)
+
     # Save asset inventory to JSON file for reference
     inventory_file = 'asset_inventory.json'
     with open(inventory_file, 'w', encoding='utf-8') as f:
         json.dump({
+            'reference_graph': reference_graph,
+            'missing_references': {url: sorted(pages) for url, pages in sorted(missing_references.items())},
             'categorized': categorized_assets,
             'by_priority': assets_by_priority,
-            'cache_version': generate_cache_version()
+            'precache_plan': precache_plan,
+            'precache': precache_manifest,
+            'game_bundles': game_bundles,
+            'cache_version': cache_version
         }, f, indent=2)
 
     print(f"\n💾 Asset inventory saved to {inventory_file}")
 
     # Update service worker
-    if update_service_worker(assets_by_priority):
+    if update_service_worker(precache_manifest, cache_version, game_bundles):
         print("✅ Service worker updated successfully!")
         print("\n🚀 PWA is now configured for complete offline functionality!")
         print("💡 Remember to clear browser cache and restart the PWA to test.")
     else:
         print("❌ Failed to update service worker")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate the service worker precache manifest and asset inventory')
+    parser.add_argument('--budget-mb', type=float, default=DEFAULT_BUDGET_MB,
+                        help=f'megabytes the initial precache may download (default: {DEFAULT_BUDGET_MB})')
+    return parser.parse_args()
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(budget_mb=args.budget_mb)
\ No newline at end of file
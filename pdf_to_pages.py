@@ -0,0 +1,135 @@
+import os
+import json
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pdf2image import convert_from_path, pdfinfo_from_path
+import glob
+from sync_manifest import hash_file
+
+# Directory the page images are written to, one subdirectory per book
+DEFAULT_PAGES_DIR = 'read/pages'
+
+# Longest side of a page image in pixels (the flipbook's default page texture size is 2048)
+PAGE_IMAGE_SIZE = 1600
+
+# WebP options for page images
+PAGE_IMAGE_OPTIONS = {'quality': 80, 'method': 4}
+
+# Pages rasterized per pdftoppm call, so a long book never holds all its pages in memory
+PAGES_PER_BATCH = 8
+
+# Per-book page manifest read by the flipbook
+MANIFEST_NAME = 'pages.json'
+
+def page_filename(number):
+    """Return the file name of a page image, e.g. page-001.webp"""
+    return f'page-{number:03d}.webp'
+
+def manifest_path(filename, output_dir=DEFAULT_PAGES_DIR):
+    """Return the path of a book's page manifest"""
+    return os.path.join(output_dir, filename, MANIFEST_NAME)
+
+def pages_up_to_date(pdf_path, output_dir=DEFAULT_PAGES_DIR, size=PAGE_IMAGE_SIZE, source=None):
+    """Check whether a book's page images were rendered from this version of the PDF at this size
+
+    source identifies the version (default: the PDF's current content hash).
+    """
+    filename = os.path.splitext(os.path.basename(pdf_path))[0]
+    try:
+        with open(manifest_path(filename, output_dir), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return manifest.get('source') == (source or hash_file(pdf_path)) and manifest.get('size') == size
+
+def render_pages(pdf_path, output_dir=DEFAULT_PAGES_DIR, size=PAGE_IMAGE_SIZE, url_prefix='pages', source=None):
+    """Render every page of a PDF to a WebP image and write the book's page manifest.
+
+    Images go to {output_dir}/{filename}/page-NNN.webp and the manifest to
+    {output_dir}/{filename}/pages.json, listing each page's URL (under url_prefix,
+    relative to the reader page), width and height. source identifies the version of
+    the PDF (default: its content hash; the book updater passes the hash of the PDF as
+    downloaded, so pages stay valid after compression). Books whose manifest matches
+    it are skipped. Returns True if pages were rendered.
+    """
+    filename = os.path.splitext(os.path.basename(pdf_path))[0]
+    book_dir = os.path.join(output_dir, filename)
+    temp_dir = os.path.join(output_dir, f'.{filename}.tmp')
+    try:
+        source = source or hash_file(pdf_path)
+        if pages_up_to_date(pdf_path, output_dir, size, source):
+            print(f'Page images already exist for {filename}, skipping...')
+            return False
+
+        page_count = pdfinfo_from_path(pdf_path)['Pages']
+
+        # Render into a scratch directory so a failed render never leaves a half-updated book
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        os.makedirs(temp_dir)
+        pages = []
+        for first_page in range(1, page_count + 1, PAGES_PER_BATCH):
+            last_page = min(page_count, first_page + PAGES_PER_BATCH - 1)
+            # An int size scales the longest side (pdftoppm -scale-to)
+            images = convert_from_path(pdf_path, first_page=first_page, last_page=last_page, size=size)
+            for number, image in enumerate(images, start=first_page):
+                image = image.convert('RGB')
+                image.save(os.path.join(temp_dir, page_filename(number)), 'WEBP', **PAGE_IMAGE_OPTIONS)
+                # The content hash in the URL keeps browsers and the service worker from serving old pages
+                pages.append({
+                    'src': f'{url_prefix}/{filename}/{page_filename(number)}?v={source[:12]}',
+                    'width': image.width,
+                    'height': image.height
+                })
+                image.close()
+
+        manifest = {'source': source, 'size': size, 'pages': pages}
+        with open(os.path.join(temp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+
+        shutil.rmtree(book_dir, ignore_errors=True)
+        os.replace(temp_dir, book_dir)
+        print(f'Created {len(pages)} page images for {filename}')
+        return True
+
+    except Exception as e:
+        print(f'Error rendering pages of {pdf_path}: {str(e)}')
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return False
+
+def remove_pages(filename, output_dir=DEFAULT_PAGES_DIR):
+    """Remove a book's page images and manifest"""
+    shutil.rmtree(os.path.join(output_dir, filename), ignore_errors=True)
+
+def create_page_images(pdf_dir='read/pdf', output_dir=DEFAULT_PAGES_DIR, size=PAGE_IMAGE_SIZE, max_workers=None):
+    """Render page images for every PDF in pdf_dir, one book per worker process"""
+    pdf_files = sorted(glob.glob(os.path.join(pdf_dir, '*.pdf')))
+    if not pdf_files:
+        return 0
+
+    workers = min(max_workers or os.cpu_count() or 1, len(pdf_files))
+    render = partial(render_pages, output_dir=output_dir, size=size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rendered = sum(executor.map(render, pdf_files))
+
+    return rendered
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Render every page of each PDF to WebP images for the flipbook reader')
+    parser.add_argument('--pdf-dir', default='read/pdf', help='directory containing the PDFs')
+    parser.add_argument('--output-dir', default=DEFAULT_PAGES_DIR, help='directory to write page images to')
+    parser.add_argument('--size', type=int, default=PAGE_IMAGE_SIZE, help='longest side of a page image in pixels')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: CPU count)')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    create_page_images(
+        pdf_dir=args.pdf_dir,
+        output_dir=args.output_dir,
+        size=args.size,
+        max_workers=args.workers
+    )
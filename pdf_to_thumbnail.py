@@ -1,40 +1,166 @@
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pdf2image import convert_from_path
 from PIL import Image
 import glob
 
-def create_thumbnails():
+# Thumbnail edge length in pixels (the 1x size)
+THUMBNAIL_SIZE = 200
+
+# Pixel densities rendered for responsive images; the PNG fallback is always 1x
+DENSITIES = (1, 2)
+
+# Responsive image formats: file extension → Pillow format name and save options
+VARIANT_FORMATS = {
+    'avif': ('AVIF', {'quality': 60}),
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+}
+
+# Formats generated by default (AVIF is opt-in)
+DEFAULT_FORMATS = ('webp',)
+
+def avif_supported():
+    """Check whether this Pillow build can write AVIF images"""
+    Image.init()
+    return 'AVIF' in Image.SAVE
+
+def variant_filename(filename, fmt, density):
+    """Return the file name of a responsive thumbnail variant, e.g. book.webp or book@2x.webp"""
+    suffix = '' if density == 1 else f'@{density}x'
+    return f'{filename}{suffix}.{fmt}'
+
+def thumbnail_files(filename, output_dir='.', formats=None):
+    """Return the thumbnail files (PNG fallback and responsive variants) of a PDF
+
+    Lists the variants of every known format unless specific formats are given.
+    """
+    paths = [os.path.join(output_dir, f'{filename}.png')]
+    for fmt in (formats if formats is not None else VARIANT_FORMATS):
+        for density in DENSITIES:
+            paths.append(os.path.join(output_dir, variant_filename(filename, fmt, density)))
+    return paths
+
+def thumbnail_srcsets(filename, output_dir='.', url_prefix=''):
+    """Return (mime type, srcset) pairs for the responsive variants that exist on disk, best format first"""
+    srcsets = []
+    for fmt in VARIANT_FORMATS:
+        candidates = []
+        for density in DENSITIES:
+            name = variant_filename(filename, fmt, density)
+            if os.path.exists(os.path.join(output_dir, name)):
+                candidates.append(f'{url_prefix}{name} {density}x')
+        if candidates:
+            srcsets.append((f'image/{fmt}', ', '.join(candidates)))
+    return srcsets
+
+def create_thumbnail(pdf_path, output_dir='.', size=THUMBNAIL_SIZE, keep_aspect=False, formats=DEFAULT_FORMATS):
+    """Render the first page of a PDF directly at thumbnail size and save all thumbnail files.
+
+    poppler scales the page while rasterizing, so the full-resolution bitmap is never
+    allocated. The page is rendered once at the largest density and downscaled for the
+    others. Writes a 1x PNG fallback plus 1x/2x variants for each requested format.
+    By default the page is squashed to a square; with keep_aspect the longest side is
+    size pixels (per density) and the aspect ratio is preserved.
+    """
+    try:
+        # Get the filename without extension
+        filename = os.path.splitext(os.path.basename(pdf_path))[0]
+
+        # Work out which files are still missing
+        png_path = os.path.join(output_dir, f'{filename}.png')
+        missing = {}
+        for density in DENSITIES:
+            for fmt in formats:
+                path = os.path.join(output_dir, variant_filename(filename, fmt, density))
+                if not os.path.exists(path):
+                    missing.setdefault(density, []).append((fmt, path))
+        needs_png = not os.path.exists(png_path)
+
+        # Check if thumbnails already exist
+        if not missing and not needs_png:
+            print(f'Thumbnail already exists for {filename}, skipping...')
+            return False
+
+        # Convert first page of PDF straight to the largest size needed
+        max_density = max(DENSITIES)
+        render_size = size * max_density
+        if keep_aspect:
+            # An int size scales the longest side (pdftoppm -scale-to)
+            images = convert_from_path(pdf_path, first_page=1, last_page=1, size=render_size)
+        else:
+            images = convert_from_path(pdf_path, first_page=1, last_page=1, size=(render_size, render_size))
+
+        if images:
+            # Get the first page
+            page = images[0].convert('RGB')
+
+            # poppler can be a pixel off when rounding; fix up the (already small) image
+            if not keep_aspect and page.size != (render_size, render_size):
+                page = page.resize((render_size, render_size), Image.Resampling.LANCZOS)
+
+            for density in DENSITIES:
+                if density == max_density:
+                    image = page
+                else:
+                    width = max(1, round(page.width * density / max_density))
+                    height = max(1, round(page.height * density / max_density))
+                    image = page.resize((width, height), Image.Resampling.LANCZOS)
+
+                # Save the PNG fallback at 1x in the output directory
+                if density == 1 and needs_png:
+                    image.save(png_path, 'PNG')
+
+                for fmt, path in missing.get(density, []):
+                    pil_format, options = VARIANT_FORMATS[fmt]
+                    image.save(path, pil_format, **options)
+
+            print(f'Created thumbnail for {filename}')
+            return True
+
+    except Exception as e:
+        print(f'Error processing {pdf_path}: {str(e)}')
+
+    return False
+
+def create_thumbnails(pdf_dir='read/pdf', output_dir='.', size=THUMBNAIL_SIZE, keep_aspect=False,
+                      max_workers=None, formats=DEFAULT_FORMATS):
+    """Create thumbnails for every PDF in pdf_dir, rendering them in parallel worker processes"""
+    if 'avif' in formats and not avif_supported():
+        print('AVIF is not supported by this Pillow build, skipping AVIF thumbnails')
+        formats = tuple(fmt for fmt in formats if fmt != 'avif')
+
     # Get all PDF files from the pdf directory
-    pdf_dir = 'read/pdf'
-    pdf_files = glob.glob(os.path.join(pdf_dir, '*.pdf'))
-    
-    for pdf_path in pdf_files:
-        try:
-            # Get the filename without extension
-            filename = os.path.splitext(os.path.basename(pdf_path))[0]
-            
-            # Check if thumbnail already exists
-            output_path = f'{filename}.png'
-            if os.path.exists(output_path):
-                print(f'Thumbnail already exists for {filename}, skipping...')
-                continue
-            
-            # Convert first page of PDF to image
-            images = convert_from_path(pdf_path, first_page=1, last_page=1)
-            
-            if images:
-                # Get the first page
-                first_page = images[0]
-                
-                # Resize to 200x200
-                thumbnail = first_page.resize((200, 200), Image.Resampling.LANCZOS)
-                
-                # Save as PNG in project root
-                thumbnail.save(output_path, 'PNG')
-                print(f'Created thumbnail for {filename}')
-            
-        except Exception as e:
-            print(f'Error processing {pdf_path}: {str(e)}')
+    pdf_files = sorted(glob.glob(os.path.join(pdf_dir, '*.pdf')))
+    if not pdf_files:
+        return 0
+
+    workers = min(max_workers or os.cpu_count() or 1, len(pdf_files))
+    render = partial(create_thumbnail, output_dir=output_dir, size=size, keep_aspect=keep_aspect, formats=formats)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        created = sum(executor.map(render, pdf_files))
+
+    return created
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Create thumbnails from the first page of each PDF')
+    parser.add_argument('--pdf-dir', default='read/pdf', help='directory containing the PDFs')
+    parser.add_argument('--output-dir', default='.', help='directory to write thumbnails to')
+    parser.add_argument('--size', type=int, default=THUMBNAIL_SIZE, help='thumbnail edge length in pixels')
+    parser.add_argument('--keep-aspect', action='store_true', help='keep the page aspect ratio instead of squashing to a square')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: CPU count)')
+    parser.add_argument('--avif', action='store_true', help='also write AVIF variants')
+    return parser.parse_args()
 
 if __name__ == '__main__':
-    create_thumbnails() 
\ No newline at end of file
+    args = parse_args()
+    create_thumbnails(
+        pdf_dir=args.pdf_dir,
+        output_dir=args.output_dir,
+        size=args.size,
+        keep_aspect=args.keep_aspect,
+        max_workers=args.workers,
+        formats=DEFAULT_FORMATS + (('avif',) if args.avif else ())
+    )
@@ -66,6 +66,90 @@ function initFlipbook(elementId, pdfUrl, customConfig = {}, showAlert = false) {
     }
 }
 
+// Function to initialize flipbooks lazily from the books.json catalog written by update_books.py.
+// A flipbook is created when its card scrolls into view, or on its first click if that comes first.
+// Books with a page manifest (update_books.py --page-images) show pre-rendered page images instead of the PDF.
+function initLazyFlipbooks(catalogUrl) {
+    const isPremiumPurchased = getQueryParam("isPremiumPurchased") || "false";
+    const isWeb = getQueryParam("isWeb") || "true";
+    const books = {};
+    const initialized = {};
+
+    function initBook(elementId, onReady) {
+        if (initialized[elementId]) {
+            return;
+        }
+        initialized[elementId] = true;
+        const book = books[elementId];
+        if (!book.pages) {
+            initFlipbook(elementId, book.pdf);
+            if (onReady) {
+                onReady();
+            }
+            return;
+        }
+
+        // An empty pdfUrl puts the flipbook in image mode; fall back to the PDF if the manifest is missing
+        $.getJSON(book.pages).done(function (manifest) {
+            initFlipbook(elementId, "", { pages: manifest.pages });
+        }).fail(function () {
+            initFlipbook(elementId, book.pdf);
+        }).always(function () {
+            if (onReady) {
+                onReady();
+            }
+        });
+    }
+
+    // Premium books that are not purchased never get a flipbook; clicks are reported instead
+    $(document).on("click", ".game-link", function () {
+        const book = books[this.id];
+        if (!book) {
+            return;
+        }
+        if (book.premium && isPremiumPurchased === "false") {
+            initFlipbook(book.id, book.pdf, {}, true);
+            return;
+        }
+        if (!initialized[book.id]) {
+            // The flipbook binds its own click handler when created; replay the click to open it
+            const link = this;
+            initBook(book.id, function () {
+                $(link).trigger("click");
+            });
+        }
+    });
+
+    return $.getJSON(catalogUrl).done(function (catalog) {
+        const observer = "IntersectionObserver" in window ? new IntersectionObserver(function (entries) {
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    initBook(entry.target.id);
+                }
+            });
+        }, { rootMargin: "200px" }) : null;
+
+        catalog.books.forEach(function (book) {
+            books[book.id] = book;
+            const element = document.getElementById(book.id);
+            if (!element) {
+                return;
+            }
+
+            if (book.premium && isWeb === "true") {
+                // Premium books are hidden on the web right away
+                initBook(book.id);
+            } else if (observer && (!book.premium || isPremiumPurchased === "true")) {
+                observer.observe(element);
+            }
+        });
+    }).fail(function () {
+        console.log("Could not load book catalog", catalogUrl);
+    });
+}
+
 // Example usage:
 // initFlipbook('waiting-for-fathers-return', 'pdf/waiting-for-fathers-return.pdf');
-// initFlipbook('another-book', 'pdf/another-book.pdf', { layout: 2 }); 
\ No newline at end of file
+// initFlipbook('another-book', 'pdf/another-book.pdf', { layout: 2 });
+// initLazyFlipbooks('books.json');
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Throttled HTTP requests for Google Sheets and Google Drive
+- Timeouts on every request
+- Retries on 429/5xx responses and connection errors, with exponential
+  backoff, full jitter and Retry-After support
+- A token bucket that caps the request rate
+- Adaptive (AIMD) concurrency: the number of parallel transfers grows by one
+  per window of successes and halves on throttling signals
+"""
+
+import time
+import random
+import threading
+import contextlib
+import requests
+
+# (connect, read) timeout in seconds for every request
+DEFAULT_TIMEOUT = (10, 60)
+
+# Retry settings
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds before the first retry (before jitter)
+BACKOFF_MAX = 60.0  # cap on a single backoff delay
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Default request rate ceiling (requests per second)
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+# Minimum time between two concurrency decreases, so one burst of errors halves it only once
+DECREASE_COOLDOWN = 2.0
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, waiting until one is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    def __init__(self, maximum, minimum=1):
+        self.maximum = max(1, int(maximum))
+        self.minimum = max(1, min(int(minimum), self.maximum))
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self.successes = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Hold one of the currently allowed parallel slots"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify()
+
+    def on_success(self):
+        """Additive increase: one more slot after a full window of successes"""
+        with self.condition:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.maximum:
+                self.limit = min(self.maximum, self.limit + 1)
+                self.successes = 0
+                self.condition.notify()
+
+    def on_throttle(self):
+        """Multiplicative decrease: halve the allowed slots on a throttling signal"""
+        with self.condition:
+            now = time.monotonic()
+            self.successes = 0
+            if now - self.last_decrease < DECREASE_COOLDOWN:
+                return
+            self.last_decrease = now
+            new_limit = max(self.minimum, self.limit / 2)
+            if int(new_limit) < int(self.limit):
+                print(f"🐢 Throttled by the server, reducing parallel transfers to {int(new_limit)}")
+            self.limit = new_limit
+
+
+class ThrottledSession:
+    """Wraps a requests.Session with timeouts, retries, a rate limit and adaptive concurrency"""
+
+    def __init__(self, session, max_concurrency, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                 max_retries=DEFAULT_MAX_RETRIES, timeout=DEFAULT_TIMEOUT):
+        self.session = session
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.bucket = TokenBucket(requests_per_second)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.retry_count = 0
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def request(self, method, url, **kwargs):
+        """Send a request, retrying throttled (429/5xx) responses and connection errors with backoff
+
+        After the last retry the final response is returned (or the final error raised).
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            with self.lock:
+                self.request_count += 1
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                self.backoff(attempt)
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                self.concurrency.on_success()
+                return response
+            if attempt >= self.max_retries:
+                return response
+
+            retry_after = response.headers.get('retry-after')
+            response.close()
+            self.backoff(attempt, retry_after)
+            attempt += 1
+
+    def backoff(self, attempt, retry_after=None):
+        """Signal throttling and sleep before retry number attempt + 1 (exponential backoff, full jitter)"""
+        self.concurrency.on_throttle()
+        with self.lock:
+            self.retry_count += 1
+
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+        if retry_after and retry_after.strip().isdigit():
+            delay = max(delay, min(BACKOFF_MAX, float(retry_after)))
+        time.sleep(delay)
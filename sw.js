@@ -3,264 +3,678 @@ const STATIC_CACHE = 'kidsgames-static-v1.3.5';
 const GAMES_CACHE = 'kidsgames-games-v1.3.5';
 const PREMIUM_CACHE = 'kidsgames-premium-v1.3.5';
 
-// Core files that should be cached immediately
-const STATIC_ASSETS = [
-  '/KidsGames/',
-  '/KidsGames/index.html',
-  '/KidsGames/quizzes.html',
-  '/KidsGames/manifest.json',
-  '/KidsGames/sw.js',
-  '/KidsGames/2048/style/fonts/clear-sans.css',
-  '/KidsGames/2048/style/main.css',
-  '/KidsGames/arithmetic-speed-drill/style.css',
-  '/KidsGames/chess/style.css',
-  '/KidsGames/css/flipbook.style.css',
-  '/KidsGames/css/font-awesome.css',
-  '/KidsGames/css/footer.css',
-  '/KidsGames/hextris/style/fa/css/font-awesome.css',
-  '/KidsGames/hextris/style/fa/css/font-awesome.min.css',
-  '/KidsGames/hextris/style/rrssb.css',
-  '/KidsGames/hextris/style/style.css',
-  '/KidsGames/tic-tac-toe/style.css',
-  '/KidsGames/tower-blocks/style.css',
-  '/KidsGames/2048/js/animframe_polyfill.js',
-  '/KidsGames/2048/js/application.js',
-  '/KidsGames/2048/js/bind_polyfill.js',
-  '/KidsGames/2048/js/classlist_polyfill.js',
-  '/KidsGames/2048/js/game_manager.js',
-  '/KidsGames/2048/js/grid.js',
-  '/KidsGames/2048/js/html_actuator.js',
-  '/KidsGames/2048/js/keyboard_input_manager.js',
-  '/KidsGames/2048/js/local_storage_manager.js',
-  '/KidsGames/2048/js/tile.js',
-  '/KidsGames/arithmetic-speed-drill/script.js',
-  '/KidsGames/chess/script.js',
-  '/KidsGames/generate-icons.js',
-  '/KidsGames/hextris/a.js',
-  '/KidsGames/hextris/js/Block.js',
-  '/KidsGames/hextris/js/Hex.js',
-  '/KidsGames/hextris/js/Text.js',
-  '/KidsGames/hextris/js/checking.js',
-  '/KidsGames/hextris/js/comboTimer.js',
-  '/KidsGames/hextris/js/initialization.js',
-  '/KidsGames/hextris/js/input.js',
-  '/KidsGames/hextris/js/main.js',
-  '/KidsGames/hextris/js/math.js',
-  '/KidsGames/hextris/js/render.js',
-  '/KidsGames/hextris/js/save-state.js',
-  '/KidsGames/hextris/js/update.js',
-  '/KidsGames/hextris/js/view.js',
-  '/KidsGames/hextris/js/wavegen.js',
-  '/KidsGames/hextris/vendor/hammer.min.js',
-  '/KidsGames/hextris/vendor/jquery.js',
-  '/KidsGames/hextris/vendor/js.cookie.js',
-  '/KidsGames/hextris/vendor/jsonfn.min.js',
-  '/KidsGames/hextris/vendor/keypress.min.js',
-  '/KidsGames/hextris/vendor/rrssb.min.js',
-  '/KidsGames/hextris/vendor/sweet-alert.min.js',
-  '/KidsGames/js/flipbook-init.js',
-  '/KidsGames/js/flipbook.book3.min.js',
-  '/KidsGames/js/flipbook.min.js',
-  '/KidsGames/js/flipbook.pdfservice.min.js',
-  '/KidsGames/js/flipbook.swipe.min.js',
-  '/KidsGames/js/flipbook.webgl.js',
-  '/KidsGames/js/flipbook.webgl.min.js',
-  '/KidsGames/js/iscroll.min.js',
-  '/KidsGames/js/pdf.min.js',
-  '/KidsGames/js/pdf.worker.min.js',
-  '/KidsGames/js/three.min.js',
-  '/KidsGames/sw.js',
-  '/KidsGames/tic-tac-toe/script.js',
-  '/KidsGames/tower-blocks/script.js',
-  '/KidsGames/2048/style/fonts/ClearSans-Bold-webfont.eot',
-  '/KidsGames/2048/style/fonts/ClearSans-Bold-webfont.woff',
-  '/KidsGames/2048/style/fonts/ClearSans-Light-webfont.eot',
-  '/KidsGames/2048/style/fonts/ClearSans-Light-webfont.woff',
-  '/KidsGames/2048/style/fonts/ClearSans-Regular-webfont.eot',
-  '/KidsGames/2048/style/fonts/ClearSans-Regular-webfont.woff',
-  '/KidsGames/hextris/style/fa/fonts/FontAwesome.otf',
-  '/KidsGames/hextris/style/fa/fonts/fontawesome-webfont.eot',
-  '/KidsGames/hextris/style/fa/fonts/fontawesome-webfont.ttf',
-  '/KidsGames/hextris/style/fa/fonts/fontawesome-webfont.woff',
-  '/KidsGames/hextris/style/fonts/Exo2-ExtraLight.otf',
-  '/KidsGames/hextris/style/fonts/Exo2-Regular.otf',
-  '/KidsGames/hextris/style/fonts/Exo2-SemiBold.otf',
-  '/KidsGames/hextris/style/fonts/Lovelo.otf',
-  '/KidsGames/hextris/style/fonts/QuattrocentoSans-Regular.ttf',
-  '/KidsGames/hextris/style/fonts/roboto.woff',
-  '/KidsGames/webfonts/fa-brands-400.eot',
-  '/KidsGames/webfonts/fa-brands-400.ttf',
-  '/KidsGames/webfonts/fa-brands-400.woff',
-  '/KidsGames/webfonts/fa-brands-400.woff2',
-  '/KidsGames/webfonts/fa-regular-400.eot',
-  '/KidsGames/webfonts/fa-regular-400.ttf',
-  '/KidsGames/webfonts/fa-regular-400.woff',
-  '/KidsGames/webfonts/fa-regular-400.woff2',
-  '/KidsGames/webfonts/fa-solid-900.eot',
-  '/KidsGames/webfonts/fa-solid-900.ttf',
-  '/KidsGames/webfonts/fa-solid-900.woff',
-  '/KidsGames/webfonts/fa-solid-900.woff2',
-  '/KidsGames/2048/favicon.ico',
-  '/KidsGames/2048/meta/apple-touch-icon.png',
-  '/KidsGames/A_Brief_Illustrated_Guide_To_Understanding_Islam.png',
-  '/KidsGames/appicon.png',
-  '/KidsGames/favicon.ico',
-  '/KidsGames/hextris/favicon.ico',
-  '/KidsGames/hextris/images/icon_arrows.svg',
-  '/KidsGames/hextris/images/icons/apple-touch-120.png',
-  '/KidsGames/hextris/images/icons/apple-touch-152.png',
-  '/KidsGames/hextris/images/icons/apple-touch-167.png',
-  '/KidsGames/hextris/images/icons/apple-touch-180.png',
-  '/KidsGames/hextris/images/icons/apple-touch-512.png',
-  '/KidsGames/hextris/images/icons/apple-touch.svg',
-  '/KidsGames/hextris/images/icons/maskable-192.png',
-  '/KidsGames/hextris/images/icons/maskable-192.webp',
-  '/KidsGames/hextris/images/icons/maskable-512.png',
-  '/KidsGames/hextris/images/icons/maskable-512.webp',
-  '/KidsGames/hextris/images/icons/maskable.svg',
-  '/KidsGames/hextris/images/icons/transparent-192.png',
-  '/KidsGames/hextris/images/icons/transparent-192.webp',
-  '/KidsGames/hextris/images/icons/transparent-512.png',
-  '/KidsGames/hextris/images/icons/transparent-512.webp',
-  '/KidsGames/hextris/images/icons/transparent.svg',
-  '/KidsGames/icon-1024x1024.png',
-  '/KidsGames/icon-128x128.png',
-  '/KidsGames/icon-144x144.png',
-  '/KidsGames/icon-150x150.png',
-  '/KidsGames/icon-152x152.png',
-  '/KidsGames/icon-167x167.png',
-  '/KidsGames/icon-16x16.png',
-  '/KidsGames/icon-180x180.png',
-  '/KidsGames/icon-192x192.png',
-  '/KidsGames/icon-194x194.png',
-  '/KidsGames/icon-195x195.png',
-  '/KidsGames/icon-196x196.png',
-  '/KidsGames/icon-210x210.png',
-  '/KidsGames/icon-256x256.png',
-  '/KidsGames/icon-310x310.png',
-  '/KidsGames/icon-320x320.png',
-  '/KidsGames/icon-32x32.png',
-  '/KidsGames/icon-384x384.png',
-  '/KidsGames/icon-400x400.png',
-  '/KidsGames/icon-512x512.png',
-  '/KidsGames/icon-70x70.png',
-  '/KidsGames/icon-72x72.png',
-  '/KidsGames/icon-96x96.png',
-  '/KidsGames/images/KPK_Logo.svg',
-  '/KidsGames/images/logo.png',
-  '/KidsGames/kidsgames-icon.svg',
-  '/KidsGames/maskable-icon-192x192.png',
-  '/KidsGames/maskable-icon-512x512.png',
-  '/KidsGames/monochrome-icon-192x192.png',
-  '/KidsGames/monochrome-icon-512x512.png',
-  '/KidsGames/simple-icon.svg',
-  '/KidsGames/121.png',
-  '/KidsGames/2048.jpeg',
-  '/KidsGames/2048/meta/apple-touch-startup-image-640x1096.png',
-  '/KidsGames/2048/meta/apple-touch-startup-image-640x920.png',
-  '/KidsGames/2048/style/fonts/ClearSans-Bold-webfont.svg',
-  '/KidsGames/2048/style/fonts/ClearSans-Light-webfont.svg',
-  '/KidsGames/2048/style/fonts/ClearSans-Regular-webfont.svg',
-  '/KidsGames/30s-chellenge.jpeg',
-  '/KidsGames/601.png',
-  '/KidsGames/603.png',
-  '/KidsGames/606.png',
-  '/KidsGames/701.png',
-  '/KidsGames/704.png',
-  '/KidsGames/705.png',
-  '/KidsGames/707.png',
-  '/KidsGames/708.png',
-  '/KidsGames/709.png',
-  '/KidsGames/711.png',
-  '/KidsGames/712.png',
-  '/KidsGames/713.png',
-  '/KidsGames/714.png',
-  '/KidsGames/716.png',
-  '/KidsGames/718.png',
-  '/KidsGames/720.png',
-  '/KidsGames/721.png',
-  '/KidsGames/722.png',
-  '/KidsGames/723.png',
-  '/KidsGames/804_text_1.png',
-  '/KidsGames/807_text.png',
-  '/KidsGames/808_text.png',
-  '/KidsGames/809_text.png',
-  '/KidsGames/810_text.png',
-  '/KidsGames/Allah_made_everything.png',
-  '/KidsGames/Allah_made_me_special.png',
-  '/KidsGames/Bedtime_with_a_guard_from_Allah.png',
-  '/KidsGames/Bee-Not-So-Busy-FKB-Kids-Stories.png',
-  '/KidsGames/Dhul_Hijjah_and_Hajj_2024_Z.png',
-  '/KidsGames/I_love_Allah_eBook_Premium_Final.png',
-  '/KidsGames/Islamic_Learning_october.png',
-  '/KidsGames/Life-of-Muhammad-PUBH-in-story.png',
-  '/KidsGames/Muharram_and_Ashura.png',
-  '/KidsGames/Ramadan_Planner.png',
-  '/KidsGames/SholoApril.png',
-  '/KidsGames/SholoJanuary.png',
-  '/KidsGames/Sholo_4_-_June-August_2023.png',
-  '/KidsGames/Sholo_December.png',
-  '/KidsGames/Sholo_March_1.png',
-  '/KidsGames/Sholo_September.png',
-  '/KidsGames/That-Worked.png',
-  '/KidsGames/The-story-of-Adam-for-children.png',
-  '/KidsGames/The_Power_of_Bismillah_new.png',
-  '/KidsGames/Urdu_kid_Story_09.png',
-  '/KidsGames/a_day_in_the_life_of_a_muslim_child.png',
-  '/KidsGames/aa34aa2_aaa_aaaa34_a_aaa34aa_aa34a_aa2aa_a_aaaaa_aaa34a__a_a_a34a2aa34a__aa2_aaaa34.png',
-  '/KidsGames/allah_is_the_creator.png',
-  '/KidsGames/amazing-science-adventures.png',
-  '/KidsGames/animal-memory-match.png',
-  '/KidsGames/aqeedah_course_for_children.png',
-  '/KidsGames/arithmetic-speed-drill.jpeg',
-  '/KidsGames/baby-s-first-science-book.png',
-  '/KidsGames/balloon-pop-adventure.jpeg',
-  '/KidsGames/checkers.jpeg',
-  '/KidsGames/chess.jpeg',
-  '/KidsGames/connect-4.png',
-  '/KidsGames/dua_for_kids_-_Aussie_Muslim_Kids_wwwaussiemuslimkidsweeblycom.png',
-  '/KidsGames/eating_etiquettes.png',
-  '/KidsGames/flappy-bird.png',
-  '/KidsGames/hextris.jpeg',
-  '/KidsGames/hextris/images/android.png',
-  '/KidsGames/hextris/images/appstore.svg',
-  '/KidsGames/hextris/images/btn_back.svg',
-  '/KidsGames/hextris/images/btn_facebook.svg',
-  '/KidsGames/hextris/images/btn_help.svg',
-  '/KidsGames/hextris/images/btn_pause.svg',
-  '/KidsGames/hextris/images/btn_restart.svg',
-  '/KidsGames/hextris/images/btn_resume.svg',
-  '/KidsGames/hextris/images/btn_share.svg',
-  '/KidsGames/hextris/images/btn_twitter.svg',
-  '/KidsGames/hextris/images/facebook-opengraph.png',
-  '/KidsGames/hextris/images/twitter-opengraph.png',
-  '/KidsGames/hextris/style/fa/fonts/fontawesome-webfont.svg',
-  '/KidsGames/images/Transparent.png',
-  '/KidsGames/images/book2/1.jpg',
-  '/KidsGames/images/book2/10.jpg',
-  '/KidsGames/images/book2/11.jpg',
-  '/KidsGames/images/book2/12.jpg',
-  '/KidsGames/images/book2/2.jpg',
-  '/KidsGames/images/book2/3.jpg',
-  '/KidsGames/images/book2/4.jpg',
-  '/KidsGames/images/book2/5.jpg',
-  '/KidsGames/images/book2/6.jpg',
-  '/KidsGames/images/book2/7.jpg',
-  '/KidsGames/images/book2/8.jpg',
-  '/KidsGames/images/book2/9.jpg',
-  '/KidsGames/images/overlay.png',
-  '/KidsGames/images/overlay_lightbox.png',
-  '/KidsGames/images/preloader.jpg',
-  '/KidsGames/images/shelf_glass.png',
-  '/KidsGames/images/shelf_metal.png',
-  '/KidsGames/images/shelf_wood.png',
-  '/KidsGames/ramadan-maze.png',
-  '/KidsGames/games/ramadan-maze/index.html',
-  '/KidsGames/ramadan-quest.png',
-  '/KidsGames/games/ramadan-quest/index.html',
-  '/KidsGames/icons/shortcut-ramadan-quest.png',
+// Derived from the asset revisions by generate_asset_cache.py
+const CACHE_VERSION = 'd629ac111a';
+
+// Core files that should be cached immediately, with a content hash per file.
+// Generated by generate_asset_cache.py: on update only entries whose revision
+// changed are downloaded again.
+const PRECACHE_MANIFEST = [
+  { url: "/KidsGames/", revision: '6f685788fb' },
+  { url: "/KidsGames/index.html", revision: '6f685788fb' },
+  { url: "/KidsGames/quizzes.html", revision: '854d80885a' },
+  { url: "/KidsGames/manifest.json", revision: '28e196cf37' },
+  { url: "/KidsGames/read/css/footer.css", revision: 'f7ccec5be6' },
+  { url: "/KidsGames/games/arithmetic-speed-drill/index.html", revision: '3f7bdf5ce0' },
+  { url: "/KidsGames/games/arithmetic-speed-drill/script.js", revision: 'b639fa6d75' },
+  { url: "/KidsGames/games/arithmetic-speed-drill/style.css", revision: '7492cd4198' },
+  { url: "/KidsGames/read/js/flipbook-init.js", revision: '278fadbb88' },
+  { url: "/KidsGames/games/tower-blocks/index.html", revision: '286b007dfc' },
+  { url: "/KidsGames/games/tower-blocks/script.js", revision: 'fe369aa0c0' },
+  { url: "/KidsGames/games/tower-blocks/style.css", revision: 'a11be7930d' },
+  { url: "/KidsGames/read/books.json", revision: '354b3e19b6' },
+  { url: "/KidsGames/games/30-seconds-challenge/index.html", revision: '6dc8af1e40' },
+  { url: "/KidsGames/read/webfonts/fa-regular-400.woff2", revision: 'a36d4f83ad' },
+  { url: "/KidsGames/games/islamic-checkers/index.html", revision: '99be1c29de' },
+  { url: "/KidsGames/read/webfonts/fa-regular-400.woff", revision: '4773adbb08' },
+  { url: "/KidsGames/games/tower-defence-2/index.html", revision: '2b63fdac51' },
+  { url: "/KidsGames/games/ramadan-maze/index.html", revision: '25878eaeef' },
+  { url: "/KidsGames/games/follow-the-light/index.html", revision: '12b3bc2691' },
+  { url: "/KidsGames/games/connect-4/index.html", revision: '3d4fa0d789' },
+  { url: "/KidsGames/games/2048/index.html", revision: 'c374baa3c9' },
+  { url: "/KidsGames/games/2048/js/animframe_polyfill.js", revision: 'b97db8f897' },
+  { url: "/KidsGames/games/2048/js/application.js", revision: '5fc4386322' },
+  { url: "/KidsGames/games/2048/js/bind_polyfill.js", revision: '90e671a58a' },
+  { url: "/KidsGames/games/2048/js/classlist_polyfill.js", revision: '6abb09a375' },
+  { url: "/KidsGames/games/2048/js/game_manager.js", revision: 'b02baa6b75' },
+  { url: "/KidsGames/games/2048/js/grid.js", revision: '169428f5ff' },
+  { url: "/KidsGames/games/2048/js/html_actuator.js", revision: '67b796d4f6' },
+  { url: "/KidsGames/games/2048/js/keyboard_input_manager.js", revision: '7d579ab5b6' },
+  { url: "/KidsGames/games/2048/js/local_storage_manager.js", revision: '8e12c6a9aa' },
+  { url: "/KidsGames/games/2048/js/tile.js", revision: '13699e51d6' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Bold-webfont.eot", revision: '820a4c2904' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Bold-webfont.svg", revision: 'a669c91932' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Bold-webfont.woff", revision: 'b16e36cc53' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Light-webfont.eot", revision: '77ef51b080' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Light-webfont.svg", revision: '5080487cca' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Light-webfont.woff", revision: '465697ff07' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Regular-webfont.eot", revision: '4d1fe136c3' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Regular-webfont.svg", revision: '5d7fbc7adb' },
+  { url: "/KidsGames/games/2048/style/fonts/ClearSans-Regular-webfont.woff", revision: '8c94cd2fdc' },
+  { url: "/KidsGames/games/2048/style/fonts/clear-sans.css", revision: 'ada5fc5f50' },
+  { url: "/KidsGames/games/2048/style/main.css", revision: '25e216e77c' },
+  { url: "/KidsGames/games/flappy-bird/index.html", revision: '0de649ed85' },
+  { url: "/KidsGames/games/space-shooter/index.html", revision: 'a4810e47c9' },
+  { url: "/KidsGames/games/chess/index.html", revision: '3f322bafc1' },
+  { url: "/KidsGames/games/chess/script.js", revision: 'e628e75f81' },
+  { url: "/KidsGames/games/chess/style.css", revision: '6b48f4bbbc' },
+  { url: "/KidsGames/games/hextris/images/btn_back.svg", revision: '84b7c15aec' },
+  { url: "/KidsGames/games/hextris/images/btn_help.svg", revision: 'b5b8db43c7' },
+  { url: "/KidsGames/games/hextris/images/btn_pause.svg", revision: 'bd12124155' },
+  { url: "/KidsGames/games/hextris/images/btn_restart.svg", revision: '40c88cd8d0' },
+  { url: "/KidsGames/games/hextris/images/btn_resume.svg", revision: '6e27c24cbc' },
+  { url: "/KidsGames/games/hextris/index.html", revision: '7a52e3a333' },
+  { url: "/KidsGames/games/hextris/js/Block.js", revision: '8dc16633cf' },
+  { url: "/KidsGames/games/hextris/js/Hex.js", revision: '021ac30991' },
+  { url: "/KidsGames/games/hextris/js/Text.js", revision: '7eb73bf9f1' },
+  { url: "/KidsGames/games/hextris/js/checking.js", revision: '9f8761f25c' },
+  { url: "/KidsGames/games/hextris/js/comboTimer.js", revision: '90c9df8009' },
+  { url: "/KidsGames/games/hextris/js/initialization.js", revision: '9337e31225' },
+  { url: "/KidsGames/games/hextris/js/input.js", revision: 'ec27fdd24c' },
+  { url: "/KidsGames/games/hextris/js/main.js", revision: '1ad07186e9' },
+  { url: "/KidsGames/games/hextris/js/math.js", revision: '032789a4e1' },
+  { url: "/KidsGames/games/hextris/js/render.js", revision: 'bcf8339109' },
+  { url: "/KidsGames/games/hextris/js/save-state.js", revision: '22ab1cb924' },
+  { url: "/KidsGames/games/hextris/js/update.js", revision: 'f6983acf1c' },
+  { url: "/KidsGames/games/hextris/js/view.js", revision: '75340076d0' },
+  { url: "/KidsGames/games/hextris/js/wavegen.js", revision: '05c9b4f996' },
+  { url: "/KidsGames/games/hextris/style/fa/css/font-awesome.min.css", revision: '05540f3515' },
+  { url: "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.eot", revision: '9f8288933d' },
+  { url: "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.svg", revision: '4f1f9ffe01' },
+  { url: "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.ttf", revision: 'c2a9333b00' },
+  { url: "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.woff", revision: '66db52b456' },
+  { url: "/KidsGames/games/hextris/style/fonts/Exo2-ExtraLight.otf", revision: 'a5a6d21b8d' },
+  { url: "/KidsGames/games/hextris/style/fonts/Exo2-Regular.otf", revision: 'ebfec5f5c1' },
+  { url: "/KidsGames/games/hextris/style/fonts/Exo2-SemiBold.otf", revision: 'b40e64b126' },
+  { url: "/KidsGames/games/hextris/style/rrssb.css", revision: '0c5cd0d327' },
+  { url: "/KidsGames/games/hextris/style/style.css", revision: '23167b2f47' },
+  { url: "/KidsGames/games/hextris/vendor/hammer.min.js", revision: 'f910948483' },
+  { url: "/KidsGames/games/hextris/vendor/jquery.js", revision: 'ee120ee3cc' },
+  { url: "/KidsGames/games/hextris/vendor/js.cookie.js", revision: 'dd97238760' },
+  { url: "/KidsGames/games/hextris/vendor/jsonfn.min.js", revision: '5f0502c3c4' },
+  { url: "/KidsGames/games/hextris/vendor/keypress.min.js", revision: 'e3a60e9676' },
+  { url: "/KidsGames/games/hextris/vendor/rrssb.min.js", revision: '974e9bf2a2' },
+  { url: "/KidsGames/games/hextris/vendor/sweet-alert.min.js", revision: 'ac46ed6a83' },
+  { url: "/KidsGames/read/webfonts/fa-regular-400.ttf", revision: '8721a52384' },
+  { url: "/KidsGames/read/webfonts/fa-regular-400.eot", revision: 'e73d73f67b' },
+  { url: "/KidsGames/games/tasbeeh-counter/index.html", revision: '399e0cd7ed' },
+  { url: "/KidsGames/games/solar-system/index.html", revision: '99b61f273e' },
+  { url: "/KidsGames/games/quran-quest/index.html", revision: 'f399d9c48d' },
+  { url: "/KidsGames/games/animal-memory-match/index.html", revision: '25654715a3' },
+  { url: "/KidsGames/read/css/font-awesome.css", revision: 'ed0f122470' },
+  { url: "/KidsGames/games/space-bluster/index.html", revision: '865a2f58e3' },
+  { url: "/KidsGames/read/index.html", revision: '00345c48a3' },
+  { url: "/KidsGames/read/webfonts/fa-solid-900.woff2", revision: '62554277d0' },
+  { url: "/KidsGames/games/sequence-memory/index.html", revision: 'ac2e0be7fa' },
+  { url: "/KidsGames/games/english-vocabulary/index.html", revision: '924cd00343' },
+  { url: "/KidsGames/games/geography-quiz/index.html", revision: 'c7db073330' },
+  { url: "/KidsGames/games/history-quiz/index.html", revision: '9ff10bdf72' },
+  { url: "/KidsGames/read/css/flipbook.style.css", revision: '172062ee28' },
+  { url: "/KidsGames/read/webfonts/fa-solid-900.woff", revision: '6f43ff9f2f' },
+  { url: "/KidsGames/games/name-of-allah/index.html", revision: 'b0fc435e50' },
+  { url: "/KidsGames/read/webfonts/fa-brands-400.woff2", revision: '155963e3fb' },
+  { url: "/KidsGames/games/tic-tac-toe/index.html", revision: 'bac22cbfe0' },
+  { url: "/KidsGames/games/tic-tac-toe/script.js", revision: '098ed55f9e' },
+  { url: "/KidsGames/games/tic-tac-toe/style.css", revision: '5399bac38f' },
+  { url: "/KidsGames/games/breakout-game/index.html", revision: '3db6b43f39' },
+  { url: "/KidsGames/read/webfonts/fa-brands-400.woff", revision: '0d9317d555' },
+  { url: "/KidsGames/games/science-quiz/index.html", revision: 'fc3d7894bb' },
+  { url: "/KidsGames/games/jannah-garden/index.html", revision: 'c2a23d0272' },
+  { url: "/KidsGames/games/ramadan-quest/index.html", revision: 'f376f9dbb9' },
+  { url: "/KidsGames/read/webfonts/fa-brands-400.ttf", revision: '345def96eb' },
+  { url: "/KidsGames/read/webfonts/fa-brands-400.eot", revision: '75a8d21d40' },
+  { url: "/KidsGames/read/webfonts/fa-solid-900.ttf", revision: '9ae2e3bc15' },
+  { url: "/KidsGames/read/webfonts/fa-solid-900.eot", revision: 'f5d00bfd44' },
+  { url: "/KidsGames/read/js/flipbook.min.js", revision: 'e27d33f94c' },
+  { url: "/KidsGames/games/islamic-good-deeds-game/index.html", revision: '7a894680f7' },
+  { url: "/KidsGames/games/ramadan-stars/index.html", revision: 'd29383f2c2' },
+  { url: "/KidsGames/games/islamic-good-deeds-game---100-levels/index.html", revision: '11b7d016d0' },
+  { url: "/KidsGames/games/balloon-pop-adventure/index.html", revision: 'fc8f6e8c91' },
+  { url: "/KidsGames/games/balloon-pop-adventure-2/index.html", revision: '5e187f2c33' },
+  { url: "/KidsGames/games/kids-maze-adventure/index.html", revision: '17310665c3' },
+  { url: "/KidsGames/games/math-challenge/index.html", revision: '74dc586693' },
+  { url: "/KidsGames/games/islamic-maze-adventure/index.html", revision: '18542ec490' },
+  { url: "/KidsGames/games/islamic-maze-adventure-2/index.html", revision: 'a113bbcee7' },
+  { url: "/KidsGames/games/islamic-fun-games-for-kids/index.html", revision: '9f8d6be986' },
+  { url: "/KidsGames/games/islamic-shapes-drawing-game/index.html", revision: 'a4ab70f741' },
+  { url: "/KidsGames/games/islamic-maze-adventure-3/index.html", revision: '432418d894' },
+  { url: "/KidsGames/games/shape-pattern-game/index.html", revision: 'bf9f0df4f2' },
+  { url: "/KidsGames/games/islamic-maze-adventure-4/index.html", revision: '0bd7de563a' },
+  { url: "/KidsGames/games/friendly-racing-adventure/index.html", revision: '9c87c47018' },
+  { url: "/KidsGames/games/shape-pattern-game-2/index.html", revision: '526e25227c' },
+  { url: "/KidsGames/games/alphabet-adventure/index.html", revision: '067794a384' },
+  { url: "/KidsGames/games/islamic-maze-adventure-3d/index.html", revision: 'c25a8d07ed' },
+  { url: "/KidsGames/games/hajj-adventure-maze/index.html", revision: '3543e3fcb0' },
+  { url: "/KidsGames/games/interactive-surah-al-fatiha-for-kids/index.html", revision: 'f1740607ab' },
+  { url: "/KidsGames/games/shape-pattern-game-3/index.html", revision: 'd4e5879370' },
+  { url: "/KidsGames/games/interactive-surah-al-fil-(the-elephant)/index.html", revision: '311bd54dff' },
+  { url: "/KidsGames/games/interactive-surah-al-fatiha-with-audio/index.html", revision: 'edcc787e9a' },
+  { url: "/KidsGames/games/interactive-surah-quraish/index.html", revision: 'ef46bd1b83' },
+  { url: "/KidsGames/games/hajj-adventure-maze-2/index.html", revision: '580c9676d7' },
+  { url: "/KidsGames/games/amazing-science-adventures/index.html", revision: 'ab9d84c182' },
+  { url: "/KidsGames/games/baby-s-first-science-book/index.html", revision: '8efe870189' },
+  { url: "/KidsGames/games/alphabet-learning-game/index.html", revision: 'b37f79fc82' },
+  { url: "/KidsGames/games/islamic-abc-learning-book/index.html", revision: '46ab7d22de' },
+  { url: "/KidsGames/geography-quiz.png", revision: '29ce31e270' },
+  { url: "/KidsGames/science-quiz.png", revision: 'aeec0ea0b5' },
+  { url: "/KidsGames/history-quiz.png", revision: 'c76f15bc3b' },
+  { url: "/KidsGames/A_Brief_Illustrated_Guide_To_Understanding_Islam.png", revision: 'cf6eceead8' },
+  { url: "/KidsGames/read/images/preloader.jpg", revision: 'db579e6427' },
+  { url: "/KidsGames/read/images/overlay.png", revision: 'a163bab860' },
+  { url: "/KidsGames/read/images/overlay_lightbox.png", revision: 'a163bab860' },
+  { url: "/KidsGames/read/images/spinner.gif", revision: '483c4a0396' },
+  { url: "/KidsGames/aqeedah_course_for_children.png", revision: '87250d5763' },
+  { url: "/KidsGames/ramadan-quest.png", revision: '52e4b45100' },
+  { url: "/KidsGames/islamic-shapes-drawing-game.jpeg", revision: '4b81df887c' },
+  { url: "/KidsGames/tawheed_for_children.png", revision: 'b47be88a0d' },
+  { url: "/KidsGames/allah_is_the_creator.png", revision: '076b944866' },
+  { url: "/KidsGames/follow-the-light.png", revision: '60c06fb115' },
+  { url: "/KidsGames/jannah-garden.png", revision: '1b7d9fb587' },
+  { url: "/KidsGames/eating_etiquettes.png", revision: '8d274fc2b7' },
+  { url: "/KidsGames/read/mp3/turnPage.mp3", revision: '15dd78185f' },
+  { url: "/KidsGames/solar-system.png", revision: 'd37c893a04' },
+  { url: "/KidsGames/tic-tac-toe.jpeg", revision: '8c898b0844' },
+  { url: "/KidsGames/Sholo_December.png", revision: '325c30a90e' },
+  { url: "/KidsGames/121.png", revision: '978d692dba' },
+  { url: "/KidsGames/breakout.png", revision: 'a4cf21fefb' },
+  { url: "/KidsGames/stories.png", revision: '826ef7f811' },
+  { url: "/KidsGames/we_are_going_back_to_Allah.png", revision: '1804167cf5' },
+  { url: "/KidsGames/space-shooter.jpeg", revision: 'a5cd9fcf5a' },
+  { url: "/KidsGames/tower-blocks.jpeg", revision: '1259a53eff' },
+  { url: "/KidsGames/quran-quest.jpeg", revision: 'e2e9526af7' },
+  { url: "/KidsGames/Bedtime_with_a_guard_from_Allah.png", revision: 'f1c5720608' },
+  { url: "/KidsGames/2048.jpeg", revision: 'c6fa4f8711' },
+  { url: "/KidsGames/checkers.jpeg", revision: '897722438a' },
+  { url: "/KidsGames/30s-chellenge.jpeg", revision: '9707a9b9b1' },
+  { url: "/KidsGames/Dhul_Hijjah_and_Hajj_2024_Z.png", revision: 'ae448bc0bd' },
+  { url: "/KidsGames/pillars_of_islam.png", revision: '61f3bf48b7' },
+  { url: "/KidsGames/SholoJanuary.png", revision: 'f1b5727f6b' },
+  { url: "/KidsGames/The-story-of-Adam-for-children.png", revision: 'ed0a94ccd6' },
+  { url: "/KidsGames/Sholo_March_1.png", revision: 'ebf60278a4' },
+  { url: "/KidsGames/Islamic_Learning_october.png", revision: '42826beec4' },
+  { url: "/KidsGames/space-bluster.png", revision: '51b0c4d6d5' },
+  { url: "/KidsGames/hextris.jpeg", revision: 'b7ffbed297' },
+  { url: "/KidsGames/Sholo_4_-_June-August_2023.png", revision: '84b2630623' },
+  { url: "/KidsGames/Muharram_and_Ashura.png", revision: '99c0964389' },
+  { url: "/KidsGames/That-Worked.png", revision: 'a5a0489b9c' },
+  { url: "/KidsGames/ramadan-maze.png", revision: '8dbccbcfc5' },
+  { url: "/KidsGames/Ramadan_Planner.png", revision: 'f387682c97' },
+  { url: "/KidsGames/the_story_of_2_gardens.png", revision: 'bca238b350' },
+  { url: "/KidsGames/a_day_in_the_life_of_a_muslim_child.png", revision: '422cc162a4' },
+  { url: "/KidsGames/islamicstudies_tb1.png", revision: '67ecc418cb' },
+  { url: "/KidsGames/islamicstudies_tb3.png", revision: 'b4cfd685e4' },
+  { url: "/KidsGames/I_love_Allah_eBook_Premium_Final.png", revision: 'f0f2389bff' },
+  { url: "/KidsGames/islamicstudies_tb2.png", revision: 'cfbe67550a' },
+  { url: "/KidsGames/the_story_of_eesa.png", revision: '85318c2234' },
+  { url: "/KidsGames/the_story_of_adam.png", revision: '914d317604' },
+  { url: "/KidsGames/the_story_of_ibrahim.png", revision: 'a65c061e00' },
+  { url: "/KidsGames/Sholo_September.png", revision: '609ba94e97' },
+  { url: "/KidsGames/Bee-Not-So-Busy-FKB-Kids-Stories.png", revision: 'b5f3c4ec22' },
+  { url: "/KidsGames/The_Power_of_Bismillah_new.png", revision: '7663670ac2' },
+  { url: "/KidsGames/SholoApril.png", revision: '408a621e28' },
+  { url: "/KidsGames/721.png", revision: '2ae886976d' },
+  { url: "/KidsGames/714.png", revision: '45256845c0' },
+  { url: "/KidsGames/the-three-doof-doofs_english_20170320-bedtime-story.png", revision: '41694d4ef9' },
+  { url: "/KidsGames/animal-memory-match.png", revision: 'a850221088' },
+  { url: "/KidsGames/sholoRamadan.png", revision: '4921c74620' },
+  { url: "/KidsGames/justdua.png", revision: 'fab3f3f622' },
+  { url: "/KidsGames/718.png", revision: '8a3f587760' },
+  { url: "/KidsGames/Allah_made_me_special.png", revision: 'd2ae6759eb' },
+  { url: "/KidsGames/kishor-sahaba.png", revision: 'e3604a05e6' },
+  { url: "/KidsGames/711.png", revision: '549d778e9e' },
+  { url: "/KidsGames/722.png", revision: '83f8ceeb41' },
+  { url: "/KidsGames/dua_for_kids_-_Aussie_Muslim_Kids_wwwaussiemuslimkidsweeblycom.png", revision: '15b06a99ce' },
+  { url: "/KidsGames/713.png", revision: '4ed35b84f3' },
+  { url: "/KidsGames/kids-maze-adventure.png", revision: '50ecbcb3cb' },
+  { url: "/KidsGames/712.png", revision: '88d7e88b43' },
+  { url: "/KidsGames/705.png", revision: 'b876e0c7c9' },
+  { url: "/KidsGames/709.png", revision: '47dc075f78' },
+  { url: "/KidsGames/606.png", revision: '62399f65f5' },
+  { url: "/KidsGames/707.png", revision: 'bde5e45689' },
+  { url: "/KidsGames/shape-pattern-game-2.png", revision: '316277861e' },
+  { url: "/KidsGames/723.png", revision: 'f5d4ad6c5e' },
+  { url: "/KidsGames/720.png", revision: 'ef285f4792' },
+  { url: "/KidsGames/810_text.png", revision: '6cd2f43d65' },
+  { url: "/KidsGames/Life-of-Muhammad-PUBH-in-story.png", revision: '675f0fbf7e' },
+  { url: "/KidsGames/math-challenge.png", revision: '631d03944a' },
+  { url: "/KidsGames/Urdu_kid_Story_09.png", revision: '406b03519a' },
+  { url: "/KidsGames/809_text.png", revision: 'bbe34b96aa' },
+  { url: "/KidsGames/708.png", revision: '5a65b110a6' },
+  { url: "/KidsGames/808_text.png", revision: 'b575595271' },
+  { url: "/KidsGames/Allah_made_everything.png", revision: 'a30b9dd153' },
+  { url: "/KidsGames/701.png", revision: '327e34686d' },
+  { url: "/KidsGames/aa34aa2_aaa_aaaa34_a_aaa34aa_aa34a_aa2aa_a_aaaaa_aaa34a__a_a_a34a2aa34a__aa2_aaaa34.png", revision: '92c4c5f69a' },
+  { url: "/KidsGames/kaha_na_manne_ki_saaza_iqbalkalmatiblogspotcom.png", revision: '4f27898567' },
+  { url: "/KidsGames/716.png", revision: '2014afa174' },
+  { url: "/KidsGames/807_text.png", revision: 'de2770481b' },
+  { url: "/KidsGames/804_text_1.png", revision: '505ef80158' },
+  { url: "/KidsGames/balloon-pop-adventure.jpeg", revision: 'b335e57354' },
+  { url: "/KidsGames/603.png", revision: '868cc8dc5b' },
+  { url: "/KidsGames/704.png", revision: '84a1b48de5' },
+  { url: "/KidsGames/601.png", revision: '44042010ac' },
+  { url: "/KidsGames/read/webfonts/fa-regular-400.svg", revision: '42e44be1cf' },
+  { url: "/KidsGames/read/webfonts/fa-solid-900.svg", revision: 'b0f3ece320' },
+  { url: "/KidsGames/read/webfonts/fa-brands-400.svg", revision: '981c7b389b' },
 ];
 
+// Cache key of each precached URL; the revision in the key lets a new version
+// be installed next to the old one without touching unchanged entries
+const PRECACHE_KEYS = new Map(
+  PRECACHE_MANIFEST.map(entry => [entry.url, `${entry.url}?__revision=${entry.revision}`])
+);
+
+// Every file of each game under games/, with the game's total size, so a game can
+// be cached for offline play (or evicted) as a whole. Generated by generate_asset_cache.py.
+const GAME_BUNDLES = {
+  "2048": {
+    "files": [
+      "/KidsGames/games/2048/index.html",
+      "/KidsGames/games/2048/js/animframe_polyfill.js",
+      "/KidsGames/games/2048/js/application.js",
+      "/KidsGames/games/2048/js/bind_polyfill.js",
+      "/KidsGames/games/2048/js/classlist_polyfill.js",
+      "/KidsGames/games/2048/js/game_manager.js",
+      "/KidsGames/games/2048/js/grid.js",
+      "/KidsGames/games/2048/js/html_actuator.js",
+      "/KidsGames/games/2048/js/keyboard_input_manager.js",
+      "/KidsGames/games/2048/js/local_storage_manager.js",
+      "/KidsGames/games/2048/js/tile.js",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Bold-webfont.eot",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Bold-webfont.svg",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Bold-webfont.woff",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Light-webfont.eot",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Light-webfont.svg",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Light-webfont.woff",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Regular-webfont.eot",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Regular-webfont.svg",
+      "/KidsGames/games/2048/style/fonts/ClearSans-Regular-webfont.woff",
+      "/KidsGames/games/2048/style/fonts/clear-sans.css",
+      "/KidsGames/games/2048/style/main.css"
+    ],
+    "bytes": 463224
+  },
+  "30-seconds-challenge": {
+    "files": [
+      "/KidsGames/games/30-seconds-challenge/index.html"
+    ],
+    "bytes": 9718
+  },
+  "alphabet-adventure": {
+    "files": [
+      "/KidsGames/games/alphabet-adventure/index.html"
+    ],
+    "bytes": 206430
+  },
+  "alphabet-learning-game": {
+    "files": [
+      "/KidsGames/games/alphabet-learning-game/index.html"
+    ],
+    "bytes": 242862
+  },
+  "amazing-science-adventures": {
+    "files": [
+      "/KidsGames/games/amazing-science-adventures/index.html"
+    ],
+    "bytes": 229717
+  },
+  "animal-memory-match": {
+    "files": [
+      "/KidsGames/games/animal-memory-match/index.html"
+    ],
+    "bytes": 34290
+  },
+  "arithmetic-speed-drill": {
+    "files": [
+      "/KidsGames/games/arithmetic-speed-drill/index.html",
+      "/KidsGames/games/arithmetic-speed-drill/script.js",
+      "/KidsGames/games/arithmetic-speed-drill/style.css"
+    ],
+    "bytes": 5291
+  },
+  "baby-s-first-science-book": {
+    "files": [
+      "/KidsGames/games/baby-s-first-science-book/index.html"
+    ],
+    "bytes": 231800
+  },
+  "balloon-pop-adventure": {
+    "files": [
+      "/KidsGames/games/balloon-pop-adventure/index.html"
+    ],
+    "bytes": 182738
+  },
+  "balloon-pop-adventure-2": {
+    "files": [
+      "/KidsGames/games/balloon-pop-adventure-2/index.html"
+    ],
+    "bytes": 186531
+  },
+  "breakout-game": {
+    "files": [
+      "/KidsGames/games/breakout-game/index.html"
+    ],
+    "bytes": 55739
+  },
+  "chess": {
+    "files": [
+      "/KidsGames/games/chess/index.html",
+      "/KidsGames/games/chess/script.js",
+      "/KidsGames/games/chess/style.css"
+    ],
+    "bytes": 81126
+  },
+  "connect-4": {
+    "files": [
+      "/KidsGames/games/connect-4/index.html"
+    ],
+    "bytes": 22970
+  },
+  "english-vocabulary": {
+    "files": [
+      "/KidsGames/games/english-vocabulary/index.html"
+    ],
+    "bytes": 41194
+  },
+  "flappy-bird": {
+    "files": [
+      "/KidsGames/games/flappy-bird/index.html"
+    ],
+    "bytes": 24952
+  },
+  "follow-the-light": {
+    "files": [
+      "/KidsGames/games/follow-the-light/index.html"
+    ],
+    "bytes": 22536
+  },
+  "friendly-racing-adventure": {
+    "files": [
+      "/KidsGames/games/friendly-racing-adventure/index.html"
+    ],
+    "bytes": 203741
+  },
+  "geography-quiz": {
+    "files": [
+      "/KidsGames/games/geography-quiz/index.html"
+    ],
+    "bytes": 42979
+  },
+  "hajj-adventure-maze": {
+    "files": [
+      "/KidsGames/games/hajj-adventure-maze/index.html"
+    ],
+    "bytes": 207652
+  },
+  "hajj-adventure-maze-2": {
+    "files": [
+      "/KidsGames/games/hajj-adventure-maze-2/index.html"
+    ],
+    "bytes": 228905
+  },
+  "hextris": {
+    "files": [
+      "/KidsGames/games/hextris/images/btn_back.svg",
+      "/KidsGames/games/hextris/images/btn_help.svg",
+      "/KidsGames/games/hextris/images/btn_pause.svg",
+      "/KidsGames/games/hextris/images/btn_restart.svg",
+      "/KidsGames/games/hextris/images/btn_resume.svg",
+      "/KidsGames/games/hextris/index.html",
+      "/KidsGames/games/hextris/js/Block.js",
+      "/KidsGames/games/hextris/js/Hex.js",
+      "/KidsGames/games/hextris/js/Text.js",
+      "/KidsGames/games/hextris/js/checking.js",
+      "/KidsGames/games/hextris/js/comboTimer.js",
+      "/KidsGames/games/hextris/js/initialization.js",
+      "/KidsGames/games/hextris/js/input.js",
+      "/KidsGames/games/hextris/js/main.js",
+      "/KidsGames/games/hextris/js/math.js",
+      "/KidsGames/games/hextris/js/render.js",
+      "/KidsGames/games/hextris/js/save-state.js",
+      "/KidsGames/games/hextris/js/update.js",
+      "/KidsGames/games/hextris/js/view.js",
+      "/KidsGames/games/hextris/js/wavegen.js",
+      "/KidsGames/games/hextris/style/fa/css/font-awesome.min.css",
+      "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.eot",
+      "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.svg",
+      "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.ttf",
+      "/KidsGames/games/hextris/style/fa/fonts/fontawesome-webfont.woff",
+      "/KidsGames/games/hextris/style/fonts/Exo2-ExtraLight.otf",
+      "/KidsGames/games/hextris/style/fonts/Exo2-Regular.otf",
+      "/KidsGames/games/hextris/style/fonts/Exo2-SemiBold.otf",
+      "/KidsGames/games/hextris/style/rrssb.css",
+      "/KidsGames/games/hextris/style/style.css",
+      "/KidsGames/games/hextris/vendor/hammer.min.js",
+      "/KidsGames/games/hextris/vendor/jquery.js",
+      "/KidsGames/games/hextris/vendor/js.cookie.js",
+      "/KidsGames/games/hextris/vendor/jsonfn.min.js",
+      "/KidsGames/games/hextris/vendor/keypress.min.js",
+      "/KidsGames/games/hextris/vendor/rrssb.min.js",
+      "/KidsGames/games/hextris/vendor/sweet-alert.min.js"
+    ],
+    "bytes": 998972
+  },
+  "history-quiz": {
+    "files": [
+      "/KidsGames/games/history-quiz/index.html"
+    ],
+    "bytes": 44005
+  },
+  "interactive-surah-al-fatiha-for-kids": {
+    "files": [
+      "/KidsGames/games/interactive-surah-al-fatiha-for-kids/index.html"
+    ],
+    "bytes": 212002
+  },
+  "interactive-surah-al-fatiha-with-audio": {
+    "files": [
+      "/KidsGames/games/interactive-surah-al-fatiha-with-audio/index.html"
+    ],
+    "bytes": 222450
+  },
+  "interactive-surah-al-fil-(the-elephant)": {
+    "files": [
+      "/KidsGames/games/interactive-surah-al-fil-(the-elephant)/index.html"
+    ],
+    "bytes": 222317
+  },
+  "interactive-surah-quraish": {
+    "files": [
+      "/KidsGames/games/interactive-surah-quraish/index.html"
+    ],
+    "bytes": 222942
+  },
+  "islamic-abc-learning-book": {
+    "files": [
+      "/KidsGames/games/islamic-abc-learning-book/index.html"
+    ],
+    "bytes": 290563
+  },
+  "islamic-checkers": {
+    "files": [
+      "/KidsGames/games/islamic-checkers/index.html"
+    ],
+    "bytes": 14517
+  },
+  "islamic-fun-games-for-kids": {
+    "files": [
+      "/KidsGames/games/islamic-fun-games-for-kids/index.html"
+    ],
+    "bytes": 195810
+  },
+  "islamic-good-deeds-game": {
+    "files": [
+      "/KidsGames/games/islamic-good-deeds-game/index.html"
+    ],
+    "bytes": 168408
+  },
+  "islamic-good-deeds-game---100-levels": {
+    "files": [
+      "/KidsGames/games/islamic-good-deeds-game---100-levels/index.html"
+    ],
+    "bytes": 181382
+  },
+  "islamic-maze-adventure": {
+    "files": [
+      "/KidsGames/games/islamic-maze-adventure/index.html"
+    ],
+    "bytes": 189991
+  },
+  "islamic-maze-adventure-2": {
+    "files": [
+      "/KidsGames/games/islamic-maze-adventure-2/index.html"
+    ],
+    "bytes": 195633
+  },
+  "islamic-maze-adventure-3": {
+    "files": [
+      "/KidsGames/games/islamic-maze-adventure-3/index.html"
+    ],
+    "bytes": 197158
+  },
+  "islamic-maze-adventure-3d": {
+    "files": [
+      "/KidsGames/games/islamic-maze-adventure-3d/index.html"
+    ],
+    "bytes": 206911
+  },
+  "islamic-maze-adventure-4": {
+    "files": [
+      "/KidsGames/games/islamic-maze-adventure-4/index.html"
+    ],
+    "bytes": 199817
+  },
+  "islamic-shapes-drawing-game": {
+    "files": [
+      "/KidsGames/games/islamic-shapes-drawing-game/index.html"
+    ],
+    "bytes": 196663
+  },
+  "jannah-garden": {
+    "files": [
+      "/KidsGames/games/jannah-garden/index.html"
+    ],
+    "bytes": 85197
+  },
+  "kids-maze-adventure": {
+    "files": [
+      "/KidsGames/games/kids-maze-adventure/index.html"
+    ],
+    "bytes": 187415
+  },
+  "math-challenge": {
+    "files": [
+      "/KidsGames/games/math-challenge/index.html"
+    ],
+    "bytes": 188804
+  },
+  "name-of-allah": {
+    "files": [
+      "/KidsGames/games/name-of-allah/index.html"
+    ],
+    "bytes": 54152
+  },
+  "quran-quest": {
+    "files": [
+      "/KidsGames/games/quran-quest/index.html"
+    ],
+    "bytes": 34263
+  },
+  "ramadan-maze": {
+    "files": [
+      "/KidsGames/games/ramadan-maze/index.html"
+    ],
+    "bytes": 20559
+  },
+  "ramadan-quest": {
+    "files": [
+      "/KidsGames/games/ramadan-quest/index.html"
+    ],
+    "bytes": 92971
+  },
+  "ramadan-stars": {
+    "files": [
+      "/KidsGames/games/ramadan-stars/index.html"
+    ],
+    "bytes": 176675
+  },
+  "science-quiz": {
+    "files": [
+      "/KidsGames/games/science-quiz/index.html"
+    ],
+    "bytes": 72817
+  },
+  "sequence-memory": {
+    "files": [
+      "/KidsGames/games/sequence-memory/index.html"
+    ],
+    "bytes": 40444
+  },
+  "shape-pattern-game": {
+    "files": [
+      "/KidsGames/games/shape-pattern-game/index.html"
+    ],
+    "bytes": 197207
+  },
+  "shape-pattern-game-2": {
+    "files": [
+      "/KidsGames/games/shape-pattern-game-2/index.html"
+    ],
+    "bytes": 206251
+  },
+  "shape-pattern-game-3": {
+    "files": [
+      "/KidsGames/games/shape-pattern-game-3/index.html"
+    ],
+    "bytes": 222095
+  },
+  "solar-system": {
+    "files": [
+      "/KidsGames/games/solar-system/index.html"
+    ],
+    "bytes": 33966
+  },
+  "space-bluster": {
+    "files": [
+      "/KidsGames/games/space-bluster/index.html"
+    ],
+    "bytes": 36951
+  },
+  "space-shooter": {
+    "files": [
+      "/KidsGames/games/space-shooter/index.html"
+    ],
+    "bytes": 25565
+  },
+  "tasbeeh-counter": {
+    "files": [
+      "/KidsGames/games/tasbeeh-counter/index.html"
+    ],
+    "bytes": 33059
+  },
+  "tic-tac-toe": {
+    "files": [
+      "/KidsGames/games/tic-tac-toe/index.html",
+      "/KidsGames/games/tic-tac-toe/script.js",
+      "/KidsGames/games/tic-tac-toe/style.css"
+    ],
+    "bytes": 166775
+  },
+  "tower-blocks": {
+    "files": [
+      "/KidsGames/games/tower-blocks/index.html",
+      "/KidsGames/games/tower-blocks/script.js",
+      "/KidsGames/games/tower-blocks/style.css"
+    ],
+    "bytes": 17005
+  },
+  "tower-defence-2": {
+    "files": [
+      "/KidsGames/games/tower-defence-2/index.html"
+    ],
+    "bytes": 19014
+  }
+};
+
 // Game directories to cache on-demand
 const GAME_PATHS = [
   '/KidsGames/games/',
@@ -270,26 +684,58 @@ const GAME_PATHS = [
 // Premium games secret pattern
 const PREMIUM_SECRET_PATTERN = /secret=kahf-kids-games-premium-games-AXjKIWUY/i;
 
-// Install event - cache core assets
+// Install event - cache core assets whose revision is not cached yet
 self.addEventListener('install', (event) => {
-  console.log('[SW] Installing service worker v1.3.5');
+  console.log('[SW] Installing service worker', CACHE_VERSION);
 
   event.waitUntil(
-    caches.open(STATIC_CACHE)
-      .then((cache) => {
-        console.log('[SW] Caching core assets');
-        return cache.addAll(STATIC_ASSETS);
-      })
+    precacheChangedAssets()
       .then(() => self.skipWaiting())
   );
 });
 
+// Download only the precache entries that are new or changed since the last version
+async function precacheChangedAssets() {
+  const cache = await caches.open(STATIC_CACHE);
+  const cachedKeys = new Set((await cache.keys()).map(request => {
+    const url = new URL(request.url);
+    return url.pathname + url.search;
+  }));
+  const changed = [...PRECACHE_KEYS].filter(([url, key]) => !cachedKeys.has(key));
+
+  console.log(`[SW] Caching ${changed.length} of ${PRECACHE_KEYS.size} core assets`);
+  // Any failed download rejects the install, so the old worker (and the old revisions
+  // it serves) stays in control; entries that did download are reused on the next try
+  await Promise.all(changed.map(async ([url, key]) => {
+    // Bypass the HTTP cache so a new revision is never filled with an old response
+    const response = await fetch(url, { cache: 'reload' });
+    if (!response.ok) {
+      throw new Error(`Failed to precache ${url}: ${response.status}`);
+    }
+    await cache.put(key, response);
+  }));
+}
+
+// Remove precached entries that are no longer in the manifest (old revisions)
+async function deleteOutdatedPrecache() {
+  const cache = await caches.open(STATIC_CACHE);
+  const currentKeys = new Set(PRECACHE_KEYS.values());
+  const requests = await cache.keys();
+  await Promise.all(requests.map((request) => {
+    const url = new URL(request.url);
+    if (!currentKeys.has(url.pathname + url.search)) {
+      return cache.delete(request);
+    }
+  }));
+}
+
 // Activate event - clean up old caches
 self.addEventListener('activate', (event) => {
-  console.log('[SW] Activating service worker v1.3.5');
+  console.log('[SW] Activating service worker', CACHE_VERSION);
 
   event.waitUntil(
-    caches.keys()
+    deleteOutdatedPrecache()
+      .then(() => caches.keys())
       .then((cacheNames) => {
         return Promise.all(
           cacheNames.map((cacheName) => {
@@ -323,11 +769,11 @@ self.addEventListener('fetch', (event) => {
   }
 
   // Handle different types of requests with appropriate strategies
-  if (STATIC_ASSETS.some(asset => url.pathname === asset)) {
-    // All static assets are pre-cached, use Cache First for reliable offline access
-    event.respondWith(cacheFirst(request, STATIC_CACHE));
+  if (PRECACHE_KEYS.has(url.pathname)) {
+    // All static assets are pre-cached under their revision, use Cache First for reliable offline access
+    event.respondWith(precacheFirst(request, PRECACHE_KEYS.get(url.pathname)));
   } else if (isGameAsset(url.pathname)) {
-    // Game assets not in STATIC_ASSETS: Cache First for offline reliability
+    // Game assets not in the precache manifest: Cache First for offline reliability
     event.respondWith(cacheFirst(request, GAMES_CACHE));
   } else if (isPremiumGameAsset(url.pathname)) {
     // Premium game assets: Network First (with fallback to cache) for security
@@ -338,10 +784,10 @@ self.addEventListener('fetch', (event) => {
   }
 });
 
-// Determine if request is for game assets (not already in STATIC_ASSETS)
+// Determine if request is for game assets (not already precached)
 function isGameAsset(pathname) {
-  // Skip if already in STATIC_ASSETS
-  if (STATIC_ASSETS.some(asset => pathname === asset)) {
+  // Skip if already precached
+  if (PRECACHE_KEYS.has(pathname)) {
     return false;
   }
 
@@ -384,6 +830,27 @@ async function cacheFirst(request, cacheName) {
   }
 }
 
+// Cache First for precached assets, looked up under their current revision
+async function precacheFirst(request, cacheKey) {
+  const cache = await caches.open(STATIC_CACHE);
+  const cached = await cache.match(cacheKey);
+
+  if (cached) {
+    return cached;
+  }
+
+  try {
+    const response = await fetch(request);
+    if (response.ok) {
+      cache.put(cacheKey, response.clone());
+    }
+    return response;
+  } catch (error) {
+    console.log('[SW] Precache lookup failed, returning offline page');
+    return getOfflineResponse();
+  }
+}
+
 // Network First strategy - for dynamic content and premium games
 async function networkFirst(request, cacheName) {
   const cache = await caches.open(cacheName);
@@ -553,6 +1020,60 @@ self.addEventListener('notificationclick', (event) => {
   }
 });
 
+// Cache every file of a game, or none of them if any download fails
+async function cacheGameBundle(game) {
+  const bundle = GAME_BUNDLES[game];
+  if (!bundle) {
+    throw new Error(`Unknown game: ${game}`);
+  }
+
+  // Download the whole bundle before storing anything, so a game is never left half cached
+  const responses = await Promise.all(bundle.files.map(async (url) => {
+    const response = await fetch(url, { cache: 'reload' });
+    if (!response.ok) {
+      throw new Error(`Failed to fetch ${url}: ${response.status}`);
+    }
+    return [url, response];
+  }));
+
+  const cache = await caches.open(GAMES_CACHE);
+  await Promise.all(responses.map(([url, response]) => cache.put(url, response)));
+  console.log('[SW] Cached game', game, bundle.files.length, 'files');
+  return bundle;
+}
+
+// Remove every file of a game from the games cache
+async function evictGameBundle(game) {
+  const bundle = GAME_BUNDLES[game];
+  if (!bundle) {
+    throw new Error(`Unknown game: ${game}`);
+  }
+
+  const cache = await caches.open(GAMES_CACHE);
+  await Promise.all(bundle.files.map(url => cache.delete(url)));
+  console.log('[SW] Evicted game', game);
+  return bundle;
+}
+
+// Run a game bundle action and report the outcome to the page that asked for it
+async function handleGameBundle(event, action, replyType) {
+  const game = event.data.game;
+  let reply;
+  try {
+    const bundle = await action(game);
+    reply = { type: replyType, game, ok: true, bytes: bundle.bytes };
+  } catch (error) {
+    console.log('[SW] Game bundle request failed:', error);
+    reply = { type: replyType, game, ok: false, error: String(error) };
+  }
+
+  if (event.ports && event.ports[0]) {
+    event.ports[0].postMessage(reply);
+  } else if (event.source) {
+    event.source.postMessage(reply);
+  }
+}
+
 // Message handling for cache management
 self.addEventListener('message', (event) => {
   if (event.data && event.data.type === 'CACHE_URLS') {
@@ -560,7 +1081,11 @@ self.addEventListener('message', (event) => {
       caches.open(GAMES_CACHE)
         .then(cache => cache.addAll(event.data.urls))
     );
+  } else if (event.data && event.data.type === 'CACHE_GAME') {
+    event.waitUntil(handleGameBundle(event, cacheGameBundle, 'GAME_CACHED'));
+  } else if (event.data && event.data.type === 'EVICT_GAME') {
+    event.waitUntil(handleGameBundle(event, evictGameBundle, 'GAME_EVICTED'));
   }
 });
 
-console.log('[SW] KidsGames Service Worker v1.3.5 loaded');
+console.log('[SW] KidsGames Service Worker', CACHE_VERSION, 'loaded');
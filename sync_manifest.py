@@ -0,0 +1,149 @@
+"""
+Incremental sync manifest for the book updater
+- Records the hash of the last synced sheet CSV
+- Records per-book state keyed by Drive file ID: filename, sheet row hash,
+  ETag/Last-Modified, content hash, compression state and thumbnail hash
+- Lets a run skip everything when the sheet is unchanged, and otherwise
+  touch only rows that were added, changed or removed
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+# Bump when the manifest layout changes; older manifests are discarded
+MANIFEST_VERSION = 1
+
+
+def hash_text(text):
+    """Return the SHA-256 hex digest of a string"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_row(row):
+    """Return a stable hash of a sheet row (a dict of column → value)"""
+    return hash_text(json.dumps(row, sort_keys=True))
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_json(path, description):
+    """Load a JSON file, returning {} if it is missing or corrupt"""
+    path = Path(path)
+    if not path.exists():
+        return {}
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not read {description} {path}: {e}")
+        return {}
+
+
+def write_json_atomic(path, data):
+    """Write data to a JSON file atomically, so readers never see a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+class SyncManifest:
+    def __init__(self, manifest_file):
+        self.manifest_file = Path(manifest_file)
+        self.lock = threading.Lock()
+        data = self.load()
+        self.sheet_hash = data.get('sheet_hash')
+        self.books = data.get('books', {})
+
+    def load(self):
+        """Load the manifest from disk, starting fresh if it is missing, corrupt or outdated"""
+        data = load_json(self.manifest_file, 'sync manifest')
+        if data and data.get('version') != MANIFEST_VERSION:
+            print(f"⚠️  Sync manifest {self.manifest_file} is outdated, starting a full sync")
+            return {}
+        return data
+
+    def save(self):
+        """Write the manifest to disk atomically"""
+        with self.lock:
+            data = {
+                'version': MANIFEST_VERSION,
+                'sheet_hash': self.sheet_hash,
+                'books': dict(sorted(self.books.items()))
+            }
+        write_json_atomic(self.manifest_file, data)
+
+    def get_book(self, drive_id):
+        """Return the recorded state of a book, or None if it is not in the manifest"""
+        with self.lock:
+            return self.books.get(drive_id)
+
+    def update_book(self, drive_id, **fields):
+        """Merge fields into the recorded state of a book"""
+        with self.lock:
+            entry = self.books.setdefault(drive_id, {})
+            entry.update(fields)
+            return entry
+
+    def update_books_with_filename(self, filename, **fields):
+        """Merge fields into every book stored as filename (deduplicated books share a PDF)"""
+        with self.lock:
+            for entry in self.books.values():
+                if entry.get('filename') == filename:
+                    entry.update(fields)
+
+    def books_by_filename(self):
+        """Return a map of PDF filename (without extension) → (drive ID, entry)"""
+        with self.lock:
+            return {entry['filename']: (drive_id, entry)
+                    for drive_id, entry in self.books.items() if entry.get('filename')}
+
+    def remove_books_not_in(self, drive_ids):
+        """Forget books whose Drive IDs are no longer in the sheet, returning the removed IDs"""
+        with self.lock:
+            removed = [drive_id for drive_id in self.books if drive_id not in drive_ids]
+            for drive_id in removed:
+                del self.books[drive_id]
+            return removed
+
+    def is_up_to_date(self, sheet_hash, pdf_dir, expected_files, required_flags=()):
+        """Check whether the sheet is unchanged and every recorded book is fully synced on disk
+
+        expected_files(filename) returns the paths (thumbnails, page images) each book should have, and
+        every flag in required_flags (e.g. 'linearized') must be set on each book.
+        """
+        if not sheet_hash or sheet_hash != self.sheet_hash or not self.books:
+            return False
+
+        with self.lock:
+            entries = list(self.books.values())
+
+        for entry in entries:
+            filename = entry.get('filename')
+            if not filename:
+                return False
+            if not (Path(pdf_dir) / f"{filename}.pdf").exists():
+                return False
+            if not all(Path(path).exists() for path in expected_files(filename)):
+                return False
+            if not all(entry.get(flag) for flag in required_flags):
+                return False
+        return True
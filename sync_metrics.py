@@ -0,0 +1,90 @@
+"""
+Per-stage metrics for the book updater
+- Records duration, calls, item counts, bytes in/out and failures per stage
+- A stage can be entered many times, also from worker threads (e.g. once per
+  download); its numbers accumulate, so its seconds are busy time summed over
+  all calls, and stages nested in other stages are included in both
+- Writes a machine-readable JSON report and, optionally, cProfile stats for
+  top-level stages
+"""
+
+import json
+import time
+import cProfile
+import threading
+import contextlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Numbers recorded for every stage
+STAGE_FIELDS = ('seconds', 'calls', 'items', 'bytes_in', 'bytes_out', 'failures')
+
+
+class SyncMetrics:
+    def __init__(self, profile_dir=None):
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.lock = threading.Lock()
+        self.stages = {}  # stage name → {field: value}, in the order stages were first entered
+        self.started_at = datetime.now(timezone.utc)
+
+    def add(self, name, **counts):
+        """Add item counts, bytes or failures to a stage"""
+        with self.lock:
+            record = self.stages.setdefault(name, dict.fromkeys(STAGE_FIELDS, 0))
+            for field, value in counts.items():
+                record[field] += value
+
+    @contextlib.contextmanager
+    def stage(self, name, profile=False):
+        """Time a block as (one call of) a stage
+
+        With profile and a profile directory, the block also runs under cProfile and its
+        stats are written to {profile_dir}/{name}.prof. cProfile only sees the calling
+        thread, and profiled stages must not be nested.
+        """
+        profiler = None
+        if profile and self.profile_dir:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(self.profile_dir / f"{name}.prof")
+            self.add(name, seconds=elapsed, calls=1)
+
+    def report(self):
+        """Return the metrics as a JSON-serializable dict"""
+        with self.lock:
+            stages = {name: dict(record, seconds=round(record['seconds'], 4))
+                      for name, record in self.stages.items()}
+        return {
+            'started_at': self.started_at.isoformat(),
+            'stages': stages
+        }
+
+    def write_report(self, report_file):
+        """Write the metrics report to a JSON file"""
+        report_file = Path(report_file)
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"📄 Metrics report written to {report_file}")
+
+    def print_summary(self):
+        """Print one line per stage with its duration and counts"""
+        print("\n⏱️  Stage Metrics:")
+        for name, record in self.report()['stages'].items():
+            details = [f"{record['items']} items"]
+            if record['bytes_in']:
+                details.append(f"{record['bytes_in']:,} bytes in")
+            if record['bytes_out']:
+                details.append(f"{record['bytes_out']:,} bytes out")
+            if record['failures']:
+                details.append(f"{record['failures']} failed")
+            print(f"  {name}: {record['seconds']:.2f}s ({', '.join(details)})")
@@ -11,49 +11,402 @@ Script to update books from Google Sheets
 import os
 import re
 import csv
+import json
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
 import subprocess
 from urllib.parse import urlparse, parse_qs
 from pathlib import Path
 import shutil
 import time
 import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from dotenv import load_dotenv
-from pdf_to_thumbnail import create_thumbnails
+from pdf_to_thumbnail import create_thumbnail, thumbnail_files, thumbnail_srcsets, avif_supported, THUMBNAIL_SIZE, DEFAULT_FORMATS as DEFAULT_THUMBNAIL_FORMATS
+from pdf_to_pages import render_pages, pages_up_to_date, remove_pages, manifest_path as page_manifest_path
+from drive_metadata_cache import DriveMetadataCache, DEFAULT_TTL as DEFAULT_METADATA_TTL
+from sync_manifest import SyncManifest, hash_text, hash_row, hash_file
+from sync_metrics import SyncMetrics
+from request_throttle import ThrottledSession, DEFAULT_REQUESTS_PER_SECOND
+from book_pipeline import BookPipeline
+from book_catalog import BookCatalog, ReconciliationIndex, render_regions, add_region_markers, has_region, CATALOG_REGION, FLIPBOOK_REGION
 import unicodedata
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Default number of parallel PDF transfers from Google Drive
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# Streaming download settings
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes read from the network per chunk
+PDF_MAGIC = b'%PDF-'  # every PDF file starts with this header
+MIN_PDF_SIZE = 1000  # anything smaller is treated as a failed download
+PART_SUFFIX = '.part'  # unfinished downloads are kept as {id}.pdf.part for resuming
+MAX_HTML_PAGE_SIZE = 1024 * 1024  # cap on Drive HTML pages read into memory
+
+# Profiles tried by the adaptive compression search: (name, ghostscript preset, image DPI)
+COMPRESSION_PROFILES = (
+    ('printer-300', '/printer', 300),
+    ('ebook-200', '/ebook', 200),
+    ('ebook-150', '/ebook', 150),
+    ('screen-110', '/screen', 110),
+    ('screen-72', '/screen', 72),
+)
+DEFAULT_MIN_IMAGE_DPI = 150  # quality floor: profiles below this image resolution are not tried
+DEFAULT_BYTE_BUDGET = 0  # per-book size budget in bytes (0 = no budget)
+
+# Linearization ("fast web view") settings
+LINEARIZATION_HEADER_SIZE = 1024  # the linearization dictionary must start within this many bytes
+LINEARIZE_MAX_GROWTH = 1.05  # ghostscript may grow a PDF by this factor to linearize it
+
+# Text of the HTML pages Drive serves instead of a file when it is throttling downloads
+THROTTLING_PAGE_MARKERS = (
+    'too many users have viewed or downloaded',
+    'quota exceeded',
+    'automated queries',
+    'unusual traffic',
+    'rate limit exceeded',
+)
+
+# Google endpoints (benchmark_books.py points these at a local stand-in)
+SHEETS_BASE_URL = 'https://docs.google.com'
+DRIVE_BASE_URL = 'https://drive.google.com'
+DRIVE_USERCONTENT_BASE_URL = 'https://drive.usercontent.google.com'
+
+class IncompleteDownloadError(Exception):
+    """A download ended before the whole file was received"""
+
+def parse_content_range(content_range):
+    """Parse a 'bytes start-end/total' Content-Range header into (start, total); total may be None"""
+    match = re.match(r'bytes\s+(\d+)-\d+/(\d+|\*)', content_range or '')
+    if not match:
+        raise IncompleteDownloadError(f"invalid Content-Range: {content_range!r}")
+    total = match.group(2)
+    return int(match.group(1)), int(total) if total.isdigit() else None
+
+def is_linearized(pdf_file):
+    """Check whether a PDF is linearized ("fast web view")
+    
+    A linearized PDF starts with a linearization dictionary within its first 1024 bytes,
+    whose /L entry is the file length; a file changed afterwards no longer matches it.
+    """
+    with open(pdf_file, 'rb') as f:
+        head = f.read(LINEARIZATION_HEADER_SIZE)
+    dictionary = re.search(rb'<<[^>]*/Linearized[^>]*>>', head)
+    length = re.search(rb'/L\s+(\d+)', dictionary.group(0)) if dictionary else None
+    return bool(length) and int(length.group(1)) == os.path.getsize(pdf_file)
+
+def qpdf_available():
+    """Check whether qpdf is installed for linearizing PDFs"""
+    return shutil.which('qpdf') is not None
+
+def linearize_in_place(pdf_file):
+    """Linearize a PDF in place with qpdf, returning an error message or None"""
+    temp_output = pdf_file.parent / f"temp_{pdf_file.name}"
+    try:
+        result = subprocess.run(['qpdf', '--linearize', str(pdf_file), str(temp_output)], capture_output=True, text=True)
+        # qpdf exits with 3 when the output was written with warnings
+        if result.returncode in (0, 3) and temp_output.exists() and is_linearized(temp_output):
+            os.replace(temp_output, pdf_file)
+            return None
+        return result.stderr.strip() or "qpdf output is not linearized"
+    finally:
+        temp_output.unlink(missing_ok=True)
+
+def linearize_pdf_file(pdf_file):
+    """Linearize a single, already compressed PDF in place with qpdf (runs in a worker process)
+    
+    Returns a dict like compress_pdf_file; the status is 'kept' when the PDF was linearized.
+    """
+    pdf_file = Path(pdf_file)
+    original_size = 0
+    try:
+        original_size = pdf_file.stat().st_size
+        error = linearize_in_place(pdf_file)
+    except Exception as e:
+        error = str(e)
+    return {'status': 'failed' if error else 'kept', 'original_size': original_size,
+            'compressed_size': pdf_file.stat().st_size if pdf_file.exists() else original_size,
+            'linearized': pdf_file.exists() and is_linearized(pdf_file), 'error': error}
+
+def ghostscript_command(pdf_file, output_file, pdf_settings='/screen', image_dpi=None, fast_web_view=False):
+    """Build the ghostscript command that compresses pdf_file into output_file
+    
+    pdf_settings selects a ghostscript preset; image_dpi additionally downsamples
+    color and gray images to that resolution.
+    """
+    gs_command = [
+        'gs',
+        '-sDEVICE=pdfwrite',
+        '-dCompatibilityLevel=1.4',
+        f'-dPDFSETTINGS={pdf_settings}',
+        '-dNOPAUSE',
+        '-dQUIET',
+        '-dBATCH',
+        f'-sOutputFile={output_file}',
+        str(pdf_file)
+    ]
+    if image_dpi:
+        gs_command[4:4] = [
+            '-dDownsampleColorImages=true',
+            '-dDownsampleGrayImages=true',
+            f'-dColorImageResolution={image_dpi}',
+            f'-dGrayImageResolution={image_dpi}',
+            # Line art and scanned text stay sharp at a higher resolution
+            f'-dMonoImageResolution={max(300, image_dpi)}',
+        ]
+    if fast_web_view:
+        gs_command.insert(1, '-dFastWebView=true')
+    return gs_command
+
+def compress_candidate(pdf_file, profile, fast_web_view=False):
+    """Compress a PDF with one compression profile into a temporary file (runs in a worker process)
+    
+    Returns a dict with the profile name, the output path and its size in bytes, and an
+    error message for failures. The caller keeps or deletes the output.
+    """
+    name, pdf_settings, image_dpi = profile
+    pdf_file = Path(pdf_file)
+    output_file = pdf_file.parent / f"temp_{name}_{pdf_file.name}"
+    try:
+        result = subprocess.run(ghostscript_command(pdf_file, output_file, pdf_settings, image_dpi, fast_web_view),
+                                capture_output=True, text=True)
+        if result.returncode == 0 and output_file.exists() and output_file.stat().st_size > 0:
+            return {'profile': name, 'path': output_file, 'size': output_file.stat().st_size, 'error': None}
+        error = result.stderr.strip() or "ghostscript wrote no output"
+    except Exception as e:
+        error = str(e)
+    output_file.unlink(missing_ok=True)
+    return {'profile': name, 'path': output_file, 'size': 0, 'error': error}
+
+def compress_pdf_file(pdf_file, linearize=False):
+    """Compress a single PDF in place with ghostscript (runs in a worker process)
+    
+    Returns a dict with the status ('compressed', 'kept' or 'failed'), the original
+    and resulting sizes in bytes, whether the result is linearized, and an error
+    message for failures. With linearize, the result is linearized with qpdf, or by
+    ghostscript (-dFastWebView) when qpdf is not installed.
+    """
+    pdf_file = Path(pdf_file)
+    original_size = 0
+    temp_output = pdf_file.parent / f"temp_{pdf_file.name}"
+    use_qpdf = linearize and qpdf_available()
+    
+    try:
+        # Get original file size
+        original_size = pdf_file.stat().st_size
+        
+        # Build ghostscript command
+        gs_command = ghostscript_command(pdf_file, temp_output, fast_web_view=linearize and not use_qpdf)
+        
+        # Run ghostscript compression
+        result = subprocess.run(gs_command, capture_output=True, text=True)
+        
+        if result.returncode == 0 and temp_output.exists():
+            compressed_size = temp_output.stat().st_size
+            
+            # Replace original with compressed version if it's actually smaller, or when only
+            # ghostscript can linearize it and it grows by little
+            status = 'kept'
+            if 0 < compressed_size < original_size:
+                status = 'compressed'
+            elif (linearize and not use_qpdf and 0 < compressed_size <= original_size * LINEARIZE_MAX_GROWTH
+                    and is_linearized(temp_output) and not is_linearized(pdf_file)):
+                status = 'compressed'
+            
+            if status == 'compressed':
+                os.replace(temp_output, pdf_file)
+            else:
+                # Keep original if compressed version is larger
+                temp_output.unlink()
+            
+            error = linearize_in_place(pdf_file) if use_qpdf and not is_linearized(pdf_file) else None
+            return {'status': status, 'original_size': original_size,
+                    'compressed_size': pdf_file.stat().st_size,
+                    'linearized': is_linearized(pdf_file), 'error': error}
+        
+        # Compression failed
+        temp_output.unlink(missing_ok=True)
+        return {'status': 'failed', 'original_size': original_size,
+                'compressed_size': original_size, 'linearized': False, 'error': result.stderr.strip()}
+    
+    except Exception as e:
+        temp_output.unlink(missing_ok=True)
+        return {'status': 'failed', 'original_size': original_size,
+                'compressed_size': original_size, 'linearized': False, 'error': str(e)}
+
 class BookUpdater:
-    def __init__(self, sheet_url):
-        self.sheet_url = sheet_url
+    def __init__(self, sheet_url, max_workers=DEFAULT_DOWNLOAD_WORKERS,
+                 refresh_metadata=False, metadata_ttl=DEFAULT_METADATA_TTL, force=False,
+                 thumbnail_formats=DEFAULT_THUMBNAIL_FORMATS, profile_dir=None,
+                 requests_per_second=DEFAULT_REQUESTS_PER_SECOND, linearize=False, page_images=False,
+                 adaptive_compression=False, min_image_dpi=DEFAULT_MIN_IMAGE_DPI, byte_budget=DEFAULT_BYTE_BUDGET):
+        # One sheet URL, or a list of sheets (e.g. one per language team) merged into one catalog
+        self.sheet_urls = [sheet_url] if isinstance(sheet_url, str) else list(sheet_url)
+        self.sheet_url = self.sheet_urls[0]
         self.pdf_dir = Path('read/pdf')
         self.html_file = Path('read/index.html')
+        self.books_json_file = Path('read/books.json')
+        self.pages_dir = Path('read/pages')
         self.books_data = []
-        
-    def get_csv_url(self):
+        self.sheets_base_url = SHEETS_BASE_URL
+        self.drive_base_url = DRIVE_BASE_URL
+        self.drive_usercontent_base_url = DRIVE_USERCONTENT_BASE_URL
+        self.max_workers = max(1, int(max_workers))
+        self.requests_per_second = requests_per_second
+        self.session = self.create_session()
+        # Drive metadata cache shared by every lookup in this run
+        self.metadata_cache = DriveMetadataCache(
+            self.pdf_dir.parent / 'drive_metadata.json',
+            ttl=metadata_ttl,
+            refresh=refresh_metadata
+        )
+        # Sync manifest stored next to read/pdf; force ignores it and re-syncs everything
+        self.force = force
+        self.manifest = SyncManifest(self.pdf_dir.parent / 'sync_manifest.json')
+        self.lock = threading.Lock()
+        self.downloaded_ids = set()  # PDFs (re)downloaded during this run
+        self.failed_downloads = 0
+        # Content deduplication: hashes of PDFs as downloaded, before compression
+        self.download_hashes = {}  # Drive ID → content hash of its download in this run
+        self.content_owners = {}  # content hash → filename of the stored (canonical) PDF
+        self.owned_hashes = {}  # canonical filename → content hash
+        self.duplicate_filenames = {}  # filename of a removed duplicate → canonical filename
+        self.pdf_index = None  # PDFs in read/pdf, indexed once per run
+        # Per-book pipeline (compress → thumbnails) fed by the downloads during a sync
+        self.pipeline = None
+        self.pipeline_filenames = set()  # PDFs handed to the pipeline during this run
+        self.cpu_workers = os.cpu_count() or 1
+        # Per-stage timings and counts; profile_dir also writes cProfile stats per stage
+        self.metrics = SyncMetrics(profile_dir)
+        # Responsive thumbnail formats written next to the PNG fallback
+        self.thumbnail_formats = tuple(fmt for fmt in thumbnail_formats if fmt != 'avif' or avif_supported())
+        # Linearize PDFs after compression so the reader can show page 1 before the whole file arrives
+        self.linearize = linearize
+        # Search the compression profiles per PDF instead of always using /screen
+        self.adaptive_compression = adaptive_compression
+        self.min_image_dpi = min_image_dpi
+        self.byte_budget = byte_budget
+        # Render every page to WebP so the reader can show images instead of parsing PDFs
+        self.page_images = page_images
+        
+    def get_pdf_index(self, rebuild=False):
+        """Return the reconciliation index of read/pdf, scanning the directory only when (re)building it"""
+        if rebuild or self.pdf_index is None:
+            self.pdf_index = ReconciliationIndex(self.pdf_dir, self.generate_safe_html_id)
+        return self.pdf_index
+    
+    def create_session(self):
+        """Create a shared HTTP session with a keep-alive connection pool sized for the download workers
+        
+        Requests go through a throttled wrapper that adds timeouts, retries with backoff,
+        a rate limit and adaptive concurrency.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return ThrottledSession(session, self.max_workers, requests_per_second=self.requests_per_second)
+    
+    def get_csv_url(self, sheet_url=None):
         """Convert Google Sheets URL to CSV export URL"""
         # Extract sheet ID from URL
         pattern = r'/spreadsheets/d/([a-zA-Z0-9-_]+)'
-        match = re.search(pattern, self.sheet_url)
+        match = re.search(pattern, sheet_url or self.sheet_url)
         if not match:
             raise ValueError("Invalid Google Sheets URL")
         
         sheet_id = match.group(1)
-        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+        return f"{self.sheets_base_url}/spreadsheets/d/{sheet_id}/export?format=csv"
     
     def download_sheet_data(self):
-        """Download and parse Google Sheet data"""
-        csv_url = self.get_csv_url()
+        """Download and parse Google Sheet data, merged across all sheets"""
+        sheets = self.fetch_sheets()
+        if sheets is None:
+            return []
+        return self.merge_sheets(sheets)
+    
+    def fetch_sheets(self):
+        """Download and parse every sheet concurrently
+        
+        Returns a list of (sheet URL, CSV text, high-quality rows) in the configured order,
+        or None if any sheet failed, since syncing without it would remove its books.
+        """
+        def fetch(sheet_url):
+            csv_data = self.fetch_sheet_csv(sheet_url)
+            return sheet_url, csv_data, self.parse_sheet_data(csv_data) if csv_data is not None else []
+        
+        with ThreadPoolExecutor(max_workers=len(self.sheet_urls)) as executor:
+            sheets = list(executor.map(fetch, self.sheet_urls))
+        
+        failed = sum(1 for sheet_url, csv_data, rows in sheets if csv_data is None)
+        if failed:
+            print(f"❌ Could not download {failed} of {len(sheets)} sheets, not syncing a partial catalog")
+            return None
+        return sheets
+    
+    def sheets_hash(self, sheets):
+        """Return one hash over the CSV text of every sheet (for a single sheet, the hash of its CSV)"""
+        hashes = [hash_text(csv_data) for sheet_url, csv_data, rows in sheets]
+        return hashes[0] if len(hashes) == 1 else hash_text('\n'.join(hashes))
+    
+    def merge_sheets(self, sheets):
+        """Merge the rows of several sheets into one book list, in sheet order
+        
+        A row listed identically by several sheets is kept once. A Drive file that another
+        sheet lists with a different Price is a conflict: the rows of the first sheet that
+        lists it win, and the conflicting rows are reported and skipped.
+        """
+        if len(sheets) == 1:
+            return sheets[0][2]
+        
+        merged = []
+        seen_rows = set()
+        prices = {}  # Drive file ID → (price, URL of the first sheet that lists it)
+        conflicts = 0
+        for sheet_url, csv_data, rows in sheets:
+            for row in rows:
+                row_hash = hash_row(row)
+                if row_hash in seen_rows:
+                    continue
+                
+                drive_url = row.get('Books', '').strip()
+                drive_key = self.get_drive_file_id(drive_url) or drive_url
+                price = row.get('Price', '').strip().lower()
+                first_price, first_sheet = prices.setdefault(drive_key, (price, sheet_url))
+                if price != first_price and sheet_url != first_sheet:
+                    print(f"⚠️  Conflict: {drive_url} is '{price or 'free'}' in {sheet_url} "
+                          f"but '{first_price or 'free'}' in {first_sheet}, keeping the first sheet's row")
+                    conflicts += 1
+                    continue
+                
+                seen_rows.add(row_hash)
+                merged.append(row)
+        
+        print(f"📚 Merged {len(sheets)} sheets into {len(merged)} books ({conflicts} conflicts)")
+        return merged
+    
+    def fetch_sheet_csv(self, sheet_url=None):
+        """Download the raw CSV export of a Google Sheet (by default the first one)"""
+        csv_url = self.get_csv_url(sheet_url)
         print(f"Downloading sheet data from: {csv_url}")
         
         try:
-            response = requests.get(csv_url)
+            response = self.session.get(csv_url)
             response.raise_for_status()
+            return response.text
             
-            # Parse CSV data
-            csv_data = response.text
+        except Exception as e:
+            print(f"Error downloading sheet data: {e}")
+            return None
+    
+    def parse_sheet_data(self, csv_data):
+        """Parse sheet CSV data and keep only high-quality books"""
+        try:
             reader = csv.DictReader(csv_data.splitlines())
             
             all_books = []
@@ -65,7 +418,7 @@ class BookUpdater:
             return all_books
             
         except Exception as e:
-            print(f"Error downloading sheet data: {e}")
+            print(f"Error parsing sheet data: {e}")
             return []
     
     def get_drive_file_id(self, drive_url):
@@ -107,16 +460,34 @@ class BookUpdater:
     
     def get_pdf_filename_from_drive(self, drive_url):
         """Get the actual PDF filename from Google Drive and normalize it"""
+        metadata = self.get_drive_metadata(drive_url)
+        if not metadata:
+            return None
+        return metadata.get('filename')
+    
+    def get_drive_metadata(self, drive_url):
+        """Get cached Drive metadata (filename, size, ETag/Last-Modified) for a Drive URL"""
         file_id = self.get_drive_file_id(drive_url)
         if not file_id:
             return None
         
+        return self.metadata_cache.resolve(file_id, self.lookup_drive_metadata)
+    
+    def lookup_drive_metadata(self, file_id):
+        """Fetch Drive metadata for a cache miss, recording the lookup in the metrics"""
+        with self.metrics.stage('metadata'):
+            metadata = self.fetch_drive_metadata(file_id)
+        self.metrics.add('metadata', items=1, failures=0 if metadata else 1)
+        return metadata
+    
+    def fetch_drive_metadata(self, file_id):
+        """Look up a file's normalized filename, size and ETag/Last-Modified from Google Drive"""
         # Try to get filename from Drive API or headers
-        download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
+        download_url = f"{self.drive_base_url}/uc?export=download&id={file_id}"
         
         try:
             # Make a HEAD request to get headers without downloading
-            response = requests.head(download_url, allow_redirects=True)
+            response = self.session.head(download_url, allow_redirects=True)
             
             # Try to get filename from Content-Disposition header
             content_disposition = response.headers.get('content-disposition', '')
@@ -127,11 +498,17 @@ class BookUpdater:
                     # Remove .pdf extension and normalize
                     if filename.lower().endswith('.pdf'):
                         filename = filename[:-4]
-                    return self.normalize_filename(filename)
+                    content_length = response.headers.get('content-length')
+                    return {
+                        'filename': self.normalize_filename(filename),
+                        'size': int(content_length) if content_length and content_length.isdigit() else None,
+                        'etag': response.headers.get('etag'),
+                        'last_modified': response.headers.get('last-modified')
+                    }
             
             # Fallback: try to get filename from the file metadata via a different URL
-            metadata_url = f"https://drive.google.com/file/d/{file_id}/view"
-            response = requests.get(metadata_url)
+            metadata_url = f"{self.drive_base_url}/file/d/{file_id}/view"
+            response = self.session.get(metadata_url)
             
             # Look for filename in the page content
             title_match = re.search(r'<title>([^<]+)</title>', response.text)
@@ -142,7 +519,12 @@ class BookUpdater:
                 # Remove .pdf extension if present
                 if title.lower().endswith('.pdf'):
                     title = title[:-4]
-                return self.normalize_filename(title)
+                return {
+                    'filename': self.normalize_filename(title),
+                    'size': None,
+                    'etag': None,
+                    'last_modified': None
+                }
             
         except Exception as e:
             print(f"Could not get filename from Drive: {e}")
@@ -165,100 +547,322 @@ class BookUpdater:
         # Always normalize the filename for id
         normalized_id = self.normalize_filename(actual_filename)
         pdf_path = self.pdf_dir / f"{normalized_id}.pdf"
-        if pdf_path.exists():
-            print(f"📄 PDF already exists, skipping download: {normalized_id}.pdf")
-            return True, normalized_id
+        pdf_index = self.get_pdf_index()
+        replacing = False
+        if pdf_index.has_pdf(normalized_id):
+            if not self.is_drive_file_changed(file_id):
+                print(f"📄 PDF already exists, skipping download: {normalized_id}.pdf")
+                return True, normalized_id
+            print(f"🔄 Drive file changed since last sync, re-downloading: {normalized_id}.pdf")
+            replacing = True
         
         # Check if there's an old version with spaces and rename it
         original_filename = actual_filename.replace('_', ' ')
         if original_filename != actual_filename:
-            old_pdf_path = self.pdf_dir / f"{original_filename}.pdf"
-            if old_pdf_path.exists():
+            old_pdf_path = pdf_index.pdf_path(original_filename)
+            if old_pdf_path is not None:
                 print(f"🔄 Renaming existing PDF: {original_filename}.pdf → {normalized_id}.pdf")
                 old_pdf_path.rename(pdf_path)
+                pdf_index.discard(original_filename)
+                pdf_index.add(normalized_id)
                 
-                # Also rename corresponding thumbnail if it exists
-                old_thumbnail_path = Path(f"{original_filename}.png")
-                new_thumbnail_path = Path(f"{normalized_id}.png")
-                if old_thumbnail_path.exists():
-                    old_thumbnail_path.rename(new_thumbnail_path)
-                    print(f"🔄 Renamed thumbnail: {original_filename}.png → {normalized_id}.png")
+                # Also rename corresponding thumbnails if they exist
+                for old_thumbnail, new_thumbnail in zip(thumbnail_files(original_filename), thumbnail_files(normalized_id)):
+                    old_thumbnail_path = Path(old_thumbnail)
+                    new_thumbnail_path = Path(new_thumbnail)
+                    if old_thumbnail_path.exists():
+                        old_thumbnail_path.rename(new_thumbnail_path)
+                        print(f"🔄 Renamed thumbnail: {old_thumbnail_path.name} → {new_thumbnail_path.name}")
                 
                 return True, normalized_id
         
-        download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
+        download_url = f"{self.drive_base_url}/uc?export=download&id={file_id}"
+        response = None
+        
+        # An interrupted earlier download is resumed from its .part file
+        offset, validator = self.read_part(pdf_path)
         
         try:
-            print(f"Downloading: {normalized_id}")
-            response = requests.get(download_url)
+            if offset:
+                print(f"Resuming download: {normalized_id} from {offset:,} bytes")
+            else:
+                print(f"Downloading: {normalized_id}")
+            response, chunks, first_chunk = self.open_download(download_url, offset, validator)
             
-            # Handle Google Drive's virus scan warning
-            if 'virus scan warning' in response.text.lower() or 'download anyway' in response.text.lower():
-                print(f"  Handling virus scan warning for {normalized_id}")
-                
-                # Extract confirm token from the HTML form
-                confirm_token = None
+            # Anything that doesn't start like a PDF is a Drive HTML page
+            if not self.is_file_response(response, first_chunk):
+                page = self.read_html_page(chunks, first_chunk, response.encoding)
                 
-                # Look for confirm value in hidden input field
-                confirm_match = re.search(r'name="confirm"\s+value="([^"]+)"', response.text)
-                if confirm_match:
-                    confirm_token = confirm_match.group(1)
-                else:
-                    # Fallback: look for confirm in any context
-                    confirm_match = re.search(r'confirm["\']?\s*[:=]\s*["\']?([^"\'&\s]+)', response.text)
+                # Handle Google Drive's virus scan warning
+                if 'virus scan warning' in page.lower() or 'download anyway' in page.lower():
+                    print(f"  Handling virus scan warning for {normalized_id}")
+                    
+                    # Extract confirm token from the HTML form
+                    confirm_token = None
+                    
+                    # Look for confirm value in hidden input field
+                    confirm_match = re.search(r'name="confirm"\s+value="([^"]+)"', page)
                     if confirm_match:
                         confirm_token = confirm_match.group(1)
-                
-                # Also extract uuid if present (sometimes needed)
-                uuid_token = None
-                uuid_match = re.search(r'name="uuid"\s+value="([^"]+)"', response.text)
-                if uuid_match:
-                    uuid_token = uuid_match.group(1)
-                
-                if confirm_token:
-                    # Try the direct download URL from the form action
-                    form_action_match = re.search(r'action="([^"]+)"', response.text)
-                    if form_action_match:
-                        download_url = form_action_match.group(1)
-                        if uuid_token:
-                            download_url = f"{download_url}?id={file_id}&export=download&confirm={confirm_token}&uuid={uuid_token}"
-                        else:
-                            download_url = f"{download_url}?id={file_id}&export=download&confirm={confirm_token}"
                     else:
-                        # Fallback to standard URL
-                        download_url = f"https://drive.google.com/uc?export=download&confirm={confirm_token}&id={file_id}"
+                        # Fallback: look for confirm in any context
+                        confirm_match = re.search(r'confirm["\']?\s*[:=]\s*["\']?([^"\'&\s]+)', page)
+                        if confirm_match:
+                            confirm_token = confirm_match.group(1)
                     
-                    print(f"  Using confirm token: {confirm_token}")
-                    response = requests.get(download_url)
-                else:
-                    print(f"  Could not find confirm token for {normalized_id}")
-                    return False, None
+                    # Also extract uuid if present (sometimes needed)
+                    uuid_token = None
+                    uuid_match = re.search(r'name="uuid"\s+value="([^"]+)"', page)
+                    if uuid_match:
+                        uuid_token = uuid_match.group(1)
+                    
+                    if confirm_token:
+                        # Try the direct download URL from the form action
+                        form_action_match = re.search(r'action="([^"]+)"', page)
+                        if form_action_match:
+                            download_url = form_action_match.group(1)
+                            if uuid_token:
+                                download_url = f"{download_url}?id={file_id}&export=download&confirm={confirm_token}&uuid={uuid_token}"
+                            else:
+                                download_url = f"{download_url}?id={file_id}&export=download&confirm={confirm_token}"
+                        else:
+                            # Fallback to standard URL
+                            download_url = f"{self.drive_base_url}/uc?export=download&confirm={confirm_token}&id={file_id}"
+                        
+                        print(f"  Using confirm token: {confirm_token}")
+                        response.close()
+                        response, chunks, first_chunk = self.open_download(download_url, offset, validator)
+                    else:
+                        print(f"  Could not find confirm token for {normalized_id}")
+                        return False, None
             
             # Check if we got HTML instead of PDF content
-            if response.text.startswith('<!DOCTYPE html') or response.text.startswith('<html'):
+            if not self.is_file_response(response, first_chunk):
                 print(f"  Still getting HTML response for {normalized_id}, download may have failed")
                 # Try one more time with a different approach
-                download_url = f"https://drive.usercontent.google.com/download?id={file_id}&export=download&authuser=0&confirm=t"
-                response = requests.get(download_url)
+                download_url = f"{self.drive_usercontent_base_url}/download?id={file_id}&export=download&authuser=0&confirm=t"
+                response.close()
+                response, chunks, first_chunk = self.open_download(download_url, offset, validator)
             
             response.raise_for_status()
             
             # Verify we got binary content (PDF)
-            if len(response.content) < 1000 or response.content.startswith(b'<!DOCTYPE html'):
+            if not self.is_file_response(response, first_chunk):
                 print(f"  Warning: Downloaded content for {normalized_id} may not be a valid PDF")
                 return False, None
             
-            # Save the PDF
-            pdf_path = self.pdf_dir / f"{normalized_id}.pdf"
-            with open(pdf_path, 'wb') as f:
-                f.write(response.content)
+            # Stream the PDF to disk; interrupted transfers are resumed from the .part file
+            attempt = 0
+            while True:
+                try:
+                    size = self.stream_to_part(response, chunks, first_chunk, pdf_path, offset)
+                    break
+                except (requests.exceptions.RequestException, IncompleteDownloadError) as e:
+                    if attempt >= self.session.max_retries:
+                        raise
+                    offset, validator = self.read_part(pdf_path)
+                    print(f"  ↩️  Transfer of {normalized_id} interrupted at {offset:,} bytes ({e}), resuming")
+                    response.close()
+                    self.session.backoff(attempt)
+                    attempt += 1
+                    response, chunks, first_chunk = self.open_download(download_url, offset, validator)
+                    response.raise_for_status()
+                    if not self.is_file_response(response, first_chunk):
+                        print(f"  Warning: Resumed download of {normalized_id} did not return the file")
+                        return False, None
+            
+            if size is None:
+                print(f"  Warning: Downloaded content for {normalized_id} may not be a valid PDF")
+                return False, None
+            
+            with self.lock:
+                self.downloaded_ids.add(normalized_id)
+            self.metrics.add('download', items=1)
+            pdf_index.add(normalized_id)
+            if replacing:
+                # The old thumbnails were rendered from the previous version of the PDF
+                for thumbnail in thumbnail_files(normalized_id):
+                    Path(thumbnail).unlink(missing_ok=True)
             
-            print(f"Successfully downloaded: {normalized_id}.pdf ({len(response.content)} bytes)")
+            print(f"Successfully downloaded: {normalized_id}.pdf ({size} bytes)")
             return True, normalized_id
             
         except Exception as e:
             print(f"Error downloading {normalized_id}: {e}")
             return False, None
+        finally:
+            if response is not None:
+                response.close()
+    
+    def is_drive_file_changed(self, file_id):
+        """Check whether a Drive file's ETag/Last-Modified differs from the last synced version"""
+        entry = self.manifest.get_book(file_id)
+        metadata = self.metadata_cache.get(file_id)
+        if not entry or not metadata:
+            return False
+        
+        for key in ('etag', 'last_modified'):
+            if entry.get(key) and metadata.get(key) and entry[key] != metadata[key]:
+                return True
+        return False
+    
+    def open_download(self, url, offset=0, validator=None):
+        """Start a streaming GET and return the response, its chunk iterator and the first chunk
+        
+        With an offset, only the rest of the file is requested (Range), provided it still
+        matches validator (If-Range); otherwise the server sends the whole file.
+        Drive throttling pages served in place of the file are retried with backoff.
+        """
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            if validator:
+                headers['If-Range'] = validator
+        
+        attempt = 0
+        while True:
+            response = self.session.get(url, stream=True, headers=headers)
+            if response.status_code == 416 and headers:
+                # The partial file no longer fits the file on the server; fetch it whole
+                response.close()
+                headers = {}
+                continue
+            
+            chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            try:
+                first_chunk = next(chunks, b'')
+            except requests.exceptions.RequestException:
+                # Dropped before the first chunk arrived: nothing to keep, just ask again
+                response.close()
+                if attempt >= self.session.max_retries:
+                    raise
+                self.session.backoff(attempt)
+                attempt += 1
+                continue
+            
+            if (attempt >= self.session.max_retries or response.status_code == 206
+                    or not self.is_throttling_page(first_chunk)):
+                return response, chunks, first_chunk
+            
+            print("  ⏳ Drive is throttling downloads, backing off before retrying")
+            response.close()
+            self.session.backoff(attempt)
+            attempt += 1
+    
+    def is_throttling_page(self, chunk):
+        """Check whether the first bytes of a download are a Drive throttling page instead of the file"""
+        if self.is_pdf_chunk(chunk):
+            return False
+        text = chunk[:MAX_HTML_PAGE_SIZE].decode('utf-8', 'ignore').lower()
+        return any(marker in text for marker in THROTTLING_PAGE_MARKERS)
+    
+    def is_pdf_chunk(self, chunk):
+        """Check whether the first bytes of a download look like a PDF file"""
+        # The PDF header may be preceded by a few junk bytes, so look within the first 1 KB
+        return PDF_MAGIC in chunk[:1024]
+    
+    def is_file_response(self, response, first_chunk):
+        """Check whether a download response carries the file: a PDF, or the rest of one (206)"""
+        if response.status_code == 206:
+            return 'text/html' not in response.headers.get('content-type', '')
+        return self.is_pdf_chunk(first_chunk)
+    
+    def read_html_page(self, chunks, first_chunk, encoding=None):
+        """Read the rest of a (small) HTML response, capped at MAX_HTML_PAGE_SIZE bytes"""
+        body = bytearray(first_chunk)
+        for chunk in chunks:
+            body.extend(chunk)
+            if len(body) >= MAX_HTML_PAGE_SIZE:
+                break
+        return body.decode(encoding or 'utf-8', errors='replace')
+    
+    def part_paths(self, pdf_path):
+        """Return the .part file of an unfinished download and the file holding its validator"""
+        part_path = pdf_path.with_name(pdf_path.name + PART_SUFFIX)
+        return part_path, part_path.with_name(part_path.name + '.json')
+    
+    def read_part(self, pdf_path):
+        """Return (bytes already downloaded, If-Range validator) for an unfinished download
+        
+        A partial file without a validator cannot be resumed safely and is discarded.
+        """
+        part_path, validator_path = self.part_paths(pdf_path)
+        try:
+            offset = part_path.stat().st_size
+            with open(validator_path, 'r', encoding='utf-8') as f:
+                validator = json.load(f).get('validator')
+        except (OSError, ValueError):
+            offset, validator = 0, None
+        
+        if offset and validator:
+            return offset, validator
+        self.discard_part(pdf_path)
+        return 0, None
+    
+    def discard_part(self, pdf_path):
+        """Remove the partial download of a PDF, if any"""
+        for path in self.part_paths(pdf_path):
+            path.unlink(missing_ok=True)
+    
+    def stream_to_part(self, response, chunks, first_chunk, pdf_path, offset=0):
+        """Stream a download into {id}.pdf.part and move it to pdf_path once it is complete.
+        
+        A 206 response is appended to the bytes already in the .part file; anything else
+        starts it over. Returns the final size, or None if the file is too small or not a
+        PDF. Raises IncompleteDownloadError (or the network error) if the transfer stops
+        early; the .part file is kept so the download can be resumed.
+        """
+        self.pdf_dir.mkdir(parents=True, exist_ok=True)
+        part_path, validator_path = self.part_paths(pdf_path)
+        
+        if response.status_code == 206:
+            start, total = parse_content_range(response.headers.get('content-range'))
+            if start != offset:
+                self.discard_part(pdf_path)
+                raise IncompleteDownloadError(f"server resumed at byte {start}, expected {offset}")
+            mode = 'ab'
+        else:
+            offset = 0
+            total = None
+            content_length = response.headers.get('content-length', '')
+            if content_length.isdigit() and not response.headers.get('content-encoding'):
+                total = int(content_length)
+            mode = 'wb'
+            
+            # Remember which version of the file the .part holds, so only that version is resumed
+            validator = response.headers.get('etag', '')
+            if not validator or validator.startswith('W/'):
+                validator = response.headers.get('last-modified')
+            if validator:
+                with open(validator_path, 'w', encoding='utf-8') as f:
+                    json.dump({'validator': validator}, f)
+            else:
+                validator_path.unlink(missing_ok=True)
+        
+        size = offset
+        try:
+            with open(part_path, mode) as f:
+                f.write(first_chunk)
+                size += len(first_chunk)
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        size += len(chunk)
+        finally:
+            self.metrics.add('download', bytes_in=size - offset)
+        
+        if total is not None and size != total:
+            raise IncompleteDownloadError(f"got {size:,} of {total:,} bytes")
+        
+        with open(part_path, 'rb') as f:
+            head = f.read(1024)
+        if size < MIN_PDF_SIZE or not self.is_pdf_chunk(head):
+            self.discard_part(pdf_path)
+            return None
+        
+        os.replace(part_path, pdf_path)
+        validator_path.unlink(missing_ok=True)
+        return size
     
     def clean_pdf_directory(self):
         """Remove all existing PDF files"""
@@ -324,26 +928,32 @@ class BookUpdater:
         
         return safe_id
     
-    def remove_pdfs_not_in_sheet(self, valid_drive_urls):
-        """Remove PDFs, thumbnails and HTML references for files not in current sheet based on original PDF names"""
+    def remove_pdfs_not_in_sheet(self, valid_drive_urls, known_filenames=None):
+        """Remove PDFs and thumbnails for files not in current sheet based on original PDF names
+        
+        known_filenames maps Drive URLs of already-synced rows to their filenames, so they need no Drive lookup.
+        """
+        pdf_index = self.get_pdf_index()
         if not self.pdf_dir.exists():
             return
         
         # Get all current PDF files
-        existing_pdfs = list(self.pdf_dir.glob('*.pdf'))
+        existing_pdfs = pdf_index.filenames()
         
         # Get original PDF filenames that should exist based on current sheet
         should_exist_filenames = set()
         
+        known_filenames = known_filenames or {}
+        
         print("📋 Getting original PDF names from Google Drive URLs...")
         for drive_url in valid_drive_urls:
-            actual_filename = self.get_pdf_filename_from_drive(drive_url)
+            actual_filename = known_filenames.get(drive_url) or self.get_pdf_filename_from_drive(drive_url)
             if actual_filename:
                 normalized_filename = self.normalize_filename(actual_filename)
-                should_exist_filenames.add(f"{normalized_filename}.pdf")
+                should_exist_filenames.add(normalized_filename)
                 # Also add the original with spaces version for backward compatibility
                 if normalized_filename != actual_filename:
-                    should_exist_filenames.add(f"{actual_filename}.pdf")
+                    should_exist_filenames.add(actual_filename)
                 print(f"  ✓ Should exist: {normalized_filename}.pdf")
             else:
                 print(f"  ⚠️  Could not get filename from: {drive_url}")
@@ -352,85 +962,48 @@ class BookUpdater:
         print(f"📁 Found {len(existing_pdfs)} existing PDFs in directory")
         
         removed_count = 0
-        removed_filenames = []
         
         # Remove PDFs whose names don't match any current sheet PDF names
-        for pdf_file in existing_pdfs:
-            if pdf_file.name not in should_exist_filenames:
-                print(f"🗑️  Removing PDF not in sheet: {pdf_file.name}")
-                pdf_file.unlink()
-                
-                # Track removed filename for HTML cleanup
-                removed_filenames.append(pdf_file.stem)
+        for filename in existing_pdfs:
+            if filename not in should_exist_filenames:
+                print(f"🗑️  Removing PDF not in sheet: {filename}.pdf")
+                pdf_index.pdf_path(filename).unlink(missing_ok=True)
+                pdf_index.discard(filename)
                 
-                # Also remove corresponding thumbnail
-                thumbnail_path = Path(f"{pdf_file.stem}.png")
-                if thumbnail_path.exists():
-                    thumbnail_path.unlink()
-                    print(f"🗑️  Removed thumbnail: {thumbnail_path.name}")
+                # Also remove corresponding thumbnails
+                for thumbnail in thumbnail_files(filename):
+                    thumbnail_path = Path(thumbnail)
+                    if thumbnail_path.exists():
+                        thumbnail_path.unlink()
+                        print(f"🗑️  Removed thumbnail: {thumbnail_path.name}")
+                remove_pages(filename, self.pages_dir)
                 
                 removed_count += 1
             else:
-                print(f"✓ Keeping existing PDF: {pdf_file.name}")
+                print(f"✓ Keeping existing PDF: {filename}.pdf")
         
-        # Clean up HTML references for removed PDFs
-        if removed_filenames:
-            self.cleanup_html_for_removed_pdfs(removed_filenames)
+        # Unfinished downloads of books that left the sheet will never be resumed
+        for filename in pdf_index.part_filenames():
+            if filename not in should_exist_filenames:
+                print(f"🗑️  Removing partial download not in sheet: {filename}.pdf{PART_SUFFIX}")
+                self.discard_part(self.pdf_dir / f"{filename}.pdf")
         
         if removed_count > 0:
             print(f"✅ Removed {removed_count} PDFs not in current sheet")
         else:
             print("📋 All existing PDFs match current sheet")
     
-    def cleanup_html_for_removed_pdfs(self, removed_filenames):
-        """Remove HTML references and JavaScript for removed PDF files"""
-        if not self.html_file.exists():
-            return
-        
-        print(f"🧹 Cleaning HTML references for {len(removed_filenames)} removed PDFs...")
-        
-        # Read current HTML
-        with open(self.html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        cleaned_content = html_content
-        total_cleaned = 0
-        
-        for filename in removed_filenames:
-            # Generate safe HTML IDs for both regular and premium versions
-            regular_html_id = self.generate_safe_html_id(filename, False)
-            premium_html_id = self.generate_safe_html_id(filename, True)
-            
-            for safe_html_id in [regular_html_id, premium_html_id]:
-                # Remove direct initFlipbook calls for this PDF (using safe ID)
-                js_pattern = rf"initFlipbook\('{re.escape(safe_html_id)}', 'pdf/[^']*\.pdf'\);?\s*"
-                js_matches = len(re.findall(js_pattern, cleaned_content, re.MULTILINE))
-                cleaned_content = re.sub(js_pattern, '', cleaned_content, flags=re.MULTILINE)
-                
-                # Remove HTML elements for this PDF (using safe ID)
-                html_pattern = rf'<a class="game-link[^"]*" id="{re.escape(safe_html_id)}"[^>]*>.*?</a>\s*'
-                html_matches = len(re.findall(html_pattern, cleaned_content, re.DOTALL))
-                cleaned_content = re.sub(html_pattern, '', cleaned_content, flags=re.DOTALL)
-                
-                if js_matches > 0 or html_matches > 0:
-                    print(f"  🗑️  Cleaned {filename} ({safe_html_id}): {js_matches} JS + {html_matches} HTML references")
-                    total_cleaned += js_matches + html_matches
-        
-        # Write updated HTML if changes were made
-        if total_cleaned > 0:
-            with open(self.html_file, 'w', encoding='utf-8') as f:
-                f.write(cleaned_content)
-            print(f"✅ Cleaned {total_cleaned} HTML/JS references from {self.html_file}")
-        else:
-            print("📄 No HTML cleanup needed")
-    
-    def process_books(self):
+    def process_books(self, books_data=None):
         """Download all high-quality books"""
-        books_data = self.download_sheet_data()
+        if books_data is None:
+            books_data = self.download_sheet_data()
         if not books_data:
             print("No books to process")
             return []
         
+        # Index read/pdf once; every reconciliation step below looks PDFs up in it
+        pdf_index = self.get_pdf_index(rebuild=True)
+        
         # First pass: Generate unique IDs and collect valid drive URLs for all books that will be processed
         pdf_ids_to_replace = set()
         valid_books = []
@@ -450,9 +1023,33 @@ class BookUpdater:
             valid_books.append((book, safe_id, drive_url, title, languages))
             valid_drive_urls.append(drive_url)
         
+        # Rows already synced by a previous run need no Drive lookup or download
+        known_filenames = {}
+        sheet_drive_ids = set()
+        for book, safe_id, drive_url, title, languages in valid_books:
+            drive_id = self.get_drive_file_id(drive_url)
+            if drive_id:
+                sheet_drive_ids.add(drive_id)
+            synced_filename = self.get_synced_filename(book, drive_url)
+            if synced_filename:
+                known_filenames[drive_url] = synced_filename
+        print(f"♻️  {len(known_filenames)} of {len(valid_books)} books unchanged since last sync")
+        
+        # Forget manifest entries for rows that were removed from the sheet
+        removed_ids = self.manifest.remove_books_not_in(sheet_drive_ids)
+        if removed_ids:
+            print(f"🗑️  {len(removed_ids)} books removed from the sheet since last sync")
+        
         # Remove PDFs that are no longer in the sheet (based on original PDF names)
         print("🔍 Checking for PDFs to remove...")
-        self.remove_pdfs_not_in_sheet(valid_drive_urls)
+        self.remove_pdfs_not_in_sheet(valid_drive_urls, known_filenames)
+        
+        # PDFs kept from earlier syncs, by the content hash they were downloaded with. Collected
+        # only after the removal above, so a new download is never mapped onto a deleted PDF.
+        for filename, (drive_id, entry) in self.manifest.books_by_filename().items():
+            if entry.get('download_hash') and pdf_index.has_pdf(filename):
+                self.content_owners.setdefault(entry['download_hash'], filename)
+                self.owned_hashes[filename] = entry['download_hash']
         
         # We'll clean thumbnails after processing to only clean ones for files we actually downloaded
         
@@ -460,9 +1057,13 @@ class BookUpdater:
         successful_downloads = 0
         failed_downloads = 0
         
-        for book, safe_id, drive_url, title, languages in valid_books:
-            # Download PDF
-            success, actual_filename = self.download_pdf(drive_url, safe_id)
+        # Download PDFs in parallel; results come back in sheet order
+        download_results = self.download_books(valid_books, known_filenames)
+        synced_rows = {}
+        
+        for (book, safe_id, drive_url, title, languages), (success, actual_filename) in zip(valid_books, download_results):
+            # Rows whose PDF turned out to be a copy of another one reference the stored copy
+            actual_filename = self.duplicate_filenames.get(actual_filename, actual_filename)
             if success and actual_filename:
                 # Always normalize the filename for id
                 normalized_id = self.normalize_filename(actual_filename)
@@ -481,8 +1082,11 @@ class BookUpdater:
                 # Check if book is premium based on Price column
                 price = book.get('Price', '').strip()
                 is_premium = price.lower() == 'premium'
+                drive_id = self.get_drive_file_id(drive_url)
+                synced_rows.setdefault(drive_id, (normalized_id, []))[1].append(hash_row(book))
                 processed_books.append({
                     'id': normalized_id,  # Always use normalized filename for id
+                    'drive_id': drive_id,
                     'title': title,
                     'languages': parsed_languages,
                     'category': book.get('Category', '').strip(),
@@ -497,6 +1101,11 @@ class BookUpdater:
         
         # Note: Thumbnail cleanup for removed PDFs is handled in remove_pdfs_not_in_sheet()
         
+        # Record the synced state of every book in the manifest
+        for drive_id, (normalized_id, row_hashes) in synced_rows.items():
+            self.record_synced_book(drive_id, normalized_id, row_hashes)
+        self.failed_downloads = failed_downloads
+        
         print(f"\n📊 Download Summary:")
         print(f"  ✅ Successfully downloaded: {successful_downloads}")
         print(f"  ❌ Failed downloads: {failed_downloads}")
@@ -505,117 +1114,243 @@ class BookUpdater:
         
         return processed_books
     
-    def cleanup_missing_pdfs(self, html_content):
-        """Remove initFlipbook calls for PDFs that don't exist"""
-        # Pattern to match direct initFlipbook calls
-        patterns = [
-            # Direct initFlipbook calls: initFlipbook('id', 'pdf/file.pdf');
-            r"initFlipbook\(['\"]([^'\"]+)['\"],\s*['\"]pdf/([^'\"]+\.pdf)['\"][^;]*\);?\n?"
-        ]
+    def download_books(self, valid_books, known_filenames=None):
+        """Download PDFs for all books with a bounded worker pool, returning results in sheet order
         
-        cleaned_content = html_content
-        removed_count = 0
+        Books whose Drive URL is in known_filenames were synced by a previous run and are not downloaded.
+        """
+        if not valid_books:
+            return []
+        known_filenames = known_filenames or {}
+        
+        # Rows that list the same Drive file are downloaded once and share the result
+        unique_books = {}
+        for entry in valid_books:
+            unique_books.setdefault(self.get_drive_file_id(entry[2]) or entry[2], entry)
+        shared_rows = len(valid_books) - len(unique_books)
+        if shared_rows:
+            print(f"🔗 {shared_rows} sheet rows list a Drive file that another row already lists")
+        
+        pending = sum(1 for entry in unique_books.values() if entry[2] not in known_filenames)
+        workers = max(1, min(self.max_workers, pending))
+        print(f"⬇️  Downloading {pending} PDFs with {workers} parallel transfers...")
+        
+        def download(entry):
+            book, safe_id, drive_url, title, languages = entry
+            if drive_url in known_filenames:
+                self.enqueue_pdf(known_filenames[drive_url])
+                return True, known_filenames[drive_url]
+            # The number of transfers in flight adapts to throttling (up to the pool size)
+            with self.session.concurrency.slot(), self.metrics.stage('download'):
+                success, filename = self.download_pdf(drive_url, safe_id)
+            if success:
+                filename = self.deduplicate_pdf(drive_url, filename)
+                # Compression and thumbnails start while the other downloads continue
+                self.enqueue_pdf(filename)
+            else:
+                self.metrics.add('download', failures=1)
+            return success, filename
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, cleaned_content, re.MULTILINE)
-            for match in reversed(list(matches)):  # Process in reverse to maintain positions
-                if len(match.groups()) >= 2:
-                    # Extract PDF filename (last group is always the PDF filename)
-                    pdf_filename = match.groups()[-1]
-                    pdf_path = self.pdf_dir / pdf_filename
-                    
-                    # Also check normalized version (with underscores)
-                    pdf_name_without_ext = pdf_filename[:-4] if pdf_filename.endswith('.pdf') else pdf_filename
-                    normalized_pdf_path = self.pdf_dir / f"{self.normalize_filename(pdf_name_without_ext)}.pdf"
-                    
-                    if not pdf_path.exists() and not normalized_pdf_path.exists():
-                        print(f"🗑️  Removing reference to missing PDF: {pdf_filename}")
-                        # Remove the entire match
-                        start, end = match.span()
-                        cleaned_content = cleaned_content[:start] + cleaned_content[end:]
-                        removed_count += 1
-        
-        # Also remove HTML elements that reference missing PDFs
-        html_pattern = r'<a class="game-link" id="([^"]+)"[^>]*>.*?</a>'
-        html_matches = re.finditer(html_pattern, cleaned_content, re.DOTALL)
-        
-        for match in reversed(list(html_matches)):
-            safe_html_id = match.group(1)
-            # Need to find the corresponding PDF file - this is more complex now
-            # since we need to reverse-engineer the original filename from the safe ID
-            # Check if any PDF file exists that would generate this safe ID (regular or premium)
-            found_pdf = False
-            for pdf_file in self.pdf_dir.glob('*.pdf'):
-                regular_id = self.generate_safe_html_id(pdf_file.stem, False)
-                premium_id = self.generate_safe_html_id(pdf_file.stem, True)
-                if safe_html_id in [regular_id, premium_id]:
-                    found_pdf = True
-                    break
+        # executor.map yields results in submission order, independent of completion order
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(unique_books, executor.map(download, unique_books.values())))
+        return [results[self.get_drive_file_id(entry[2]) or entry[2]] for entry in valid_books]
+    
+    def deduplicate_pdf(self, drive_url, filename):
+        """Map a PDF downloaded in this run to a byte-identical PDF that is already stored
+        
+        The copy and its thumbnails are removed, and the filename of the stored (canonical)
+        PDF is returned. PDFs are compared by their hash as downloaded, since compression
+        changes the stored bytes; the first copy of each PDF (from an earlier sync, or the
+        first to finish downloading) is kept.
+        """
+        pdf_path = self.pdf_dir / f"{filename}.pdf"
+        with self.lock:
+            if filename not in self.downloaded_ids:
+                return filename
+        download_hash = hash_file(pdf_path)
+        
+        with self.lock:
+            self.download_hashes[self.get_drive_file_id(drive_url)] = download_hash
+            # A re-downloaded PDF whose content changed no longer stands for its old content
+            old_hash = self.owned_hashes.pop(filename, None)
+            if old_hash and self.content_owners.get(old_hash) == filename:
+                del self.content_owners[old_hash]
             
-            if not found_pdf:
-                # Check if this might be a premium ID by checking both regular and premium versions
-                found_any_version = False
-                for pdf_file in self.pdf_dir.glob('*.pdf'):
-                    regular_id = self.generate_safe_html_id(pdf_file.stem, False)
-                    premium_id = self.generate_safe_html_id(pdf_file.stem, True)
-                    if safe_html_id in [regular_id, premium_id]:
-                        found_any_version = True
-                        break
-                
-                if not found_any_version:
-                    print(f"🗑️  Removing HTML element for missing PDF: {safe_html_id}")
-                    start, end = match.span()
-                    cleaned_content = cleaned_content[:start] + cleaned_content[end:]
-                    removed_count += 1
+            canonical = self.content_owners.setdefault(download_hash, filename)
+            # Never give up this copy for a stored PDF that is gone
+            if canonical != filename and not self.get_pdf_index().has_pdf(canonical):
+                self.owned_hashes.pop(canonical, None)
+                self.content_owners[download_hash] = canonical = filename
+            if canonical == filename:
+                self.owned_hashes[filename] = download_hash
+                return filename
+            self.downloaded_ids.discard(filename)
+            self.duplicate_filenames[filename] = canonical
+        
+        size = pdf_path.stat().st_size
+        pdf_path.unlink(missing_ok=True)
+        self.get_pdf_index().discard(filename)
+        for thumbnail in thumbnail_files(filename):
+            Path(thumbnail).unlink(missing_ok=True)
+        self.metrics.add('dedupe', items=1, bytes_in=size)
+        print(f"🔗 {filename}.pdf is identical to {canonical}.pdf, keeping one copy")
+        return canonical
+    
+    def get_synced_filename(self, book, drive_url):
+        """Return the PDF filename of a sheet row that is unchanged since the last sync, or None"""
+        if self.force:
+            return None
         
-        if removed_count > 0:
-            print(f"✅ Cleaned up {removed_count} total references to missing PDFs")
-        
-        return cleaned_content
-    
-    def cleanup_all_javascript(self, html_content):
-        """Remove ALL existing JavaScript content from the script tag to start fresh"""
-        print("🧹 Cleaning up existing JavaScript content...")
-        
-        # Find the script tag containing $(document).ready
-        script_start = html_content.find('<script type="text/javascript">')
-        if script_start != -1:
-            # Find the closing </script> tag
-            script_end = html_content.find('</script>', script_start)
-            if script_end != -1:
-                # Extract the content before and after the script tag
-                before_script = html_content[:script_start]
-                after_script = html_content[script_end + 9:]  # +9 for '</script>'
-                
-                # Create empty script tag structure
-                empty_script = '  <script type="text/javascript">\n'
-                empty_script += '    $(document).ready(function () {\n'
-                empty_script += '      \n'  # Empty content
-                empty_script += '    });\n'
-                empty_script += '  </script>'
-                
-                # Combine everything with empty script
-                cleaned_content = before_script + empty_script + after_script
-                print("✅ Cleaned up existing JavaScript content")
-                return cleaned_content
-            else:
-                print("❌ Could not find closing script tag")
-        else:
-            print("❌ Could not find JavaScript script tag")
+        drive_id = self.get_drive_file_id(drive_url)
+        entry = self.manifest.get_book(drive_id) if drive_id else None
+        if not entry or hash_row(book) not in entry.get('row_hashes', []):
+            return None
         
-        return html_content
+        filename = entry.get('filename')
+        if filename and self.get_pdf_index().has_pdf(filename):
+            return filename
+        return None
+    
+    def record_synced_book(self, drive_id, normalized_id, row_hashes):
+        """Record a book's Drive ID, ETag, content hash and sheet rows in the sync manifest"""
+        entry = self.manifest.get_book(drive_id) or {}
+        fields = {'filename': normalized_id, 'row_hashes': sorted(set(row_hashes))}
+        
+        metadata = self.metadata_cache.get(drive_id)
+        if metadata:
+            fields['etag'] = metadata.get('etag')
+            fields['last_modified'] = metadata.get('last_modified')
+        
+        if drive_id in self.download_hashes:
+            fields['download_hash'] = self.download_hashes[drive_id]
+        
+        pdf_changed = (normalized_id in self.downloaded_ids
+                       or entry.get('filename') != normalized_id
+                       or not entry.get('content_hash'))
+        if pdf_changed:
+            pdf_path = self.pdf_dir / f"{normalized_id}.pdf"
+            fields['content_hash'] = hash_file(pdf_path) if pdf_path.exists() else None
+            fields['compressed'] = False
+            fields['linearized'] = False
+            fields['thumbnail_hash'] = None
+        
+        self.manifest.update_book(drive_id, **fields)
+    
+    def process_books_pipelined(self, books_data=None):
+        """Download all books, compressing and thumbnailing each PDF as soon as it is on disk
+        
+        Returns the processed books and the pipeline results (one per PDF), so the total
+        time approaches that of the slowest stage instead of the sum of all stages.
+        """
+        with self.create_process_pool() as executor:
+            self.pipeline = self.create_pipeline(executor)
+            try:
+                books = self.process_books(books_data)
+                # PDFs on disk that no download handed over are compressed and thumbnailed too
+                for filename in self.get_pdf_index().filenames():
+                    self.enqueue_pdf(filename)
+            finally:
+                results = self.pipeline.close()
+                self.pipeline = None
+        return books, results
+    
+    def create_process_pool(self):
+        """Create the worker processes for compression and thumbnails, one per CPU
+        
+        Workers are spawned rather than forked, because forking while pipeline or
+        download threads hold locks can deadlock the children.
+        """
+        return ProcessPoolExecutor(max_workers=self.cpu_workers, mp_context=multiprocessing.get_context('spawn'))
+    
+    def create_pipeline(self, executor, stages=None):
+        """Create the per-book pipeline; every stage runs its work in the given process pool
+        
+        The stages are compress → thumbnails, preceded by pages in page image mode so
+        pages are rendered from the PDF as downloaded, before compression downsamples
+        its images. Each stage
+        gets one thread per worker process, so any stage alone can keep every CPU busy
+        while the others wait for books.
+        """
+        if stages is None:
+            stages = ('pages', 'compress', 'thumbnails') if self.page_images else ('compress', 'thumbnails')
+        # Compression state as of the last sync, keyed by filename
+        synced_books = self.manifest.books_by_filename()
+        functions = {
+            'compress': lambda book: self.compress_book(executor, synced_books, book),
+            'thumbnails': lambda book: self.thumbnail_book(executor, book),
+            'pages': lambda book: self.pages_book(executor, book),
+        }
+        self.pipeline_filenames = set()
+        return BookPipeline([(name, functions[name], self.cpu_workers) for name in stages])
+    
+    def enqueue_pdf(self, filename):
+        """Hand a PDF to the running pipeline, once per run; waits while the pipeline is backed up"""
+        if self.pipeline is None or not self.get_pdf_index().has_pdf(filename):
+            return
+        with self.lock:
+            if filename in self.pipeline_filenames:
+                return
+            self.pipeline_filenames.add(filename)
+        self.pipeline.put({'filename': filename, 'pdf_file': self.pdf_dir / f"{filename}.pdf"})
+    
+    def thumbnail_book(self, executor, book):
+        """Pipeline stage: render a PDF's missing thumbnails in a worker process"""
+        book['thumbnails'] = False
+        if all(os.path.exists(path) for path in self.expected_thumbnail_files(book['filename'])):
+            return book
+        
+        with self.metrics.stage('thumbnails'):
+            created = executor.submit(create_thumbnail, str(book['pdf_file']), '.', THUMBNAIL_SIZE,
+                                      False, self.thumbnail_formats).result()
+        book['thumbnails'] = created
+        # Thumbnails were missing, so a render that created nothing failed
+        self.metrics.add('thumbnails', items=int(created), failures=int(not created))
+        return book
+    
+    def pages_book(self, executor, book):
+        """Pipeline stage: render a PDF's page images and page manifest in a worker process
+        
+        Pages are keyed on the PDF's hash as downloaded, so compressing it afterwards does
+        not make them look out of date. A PDF compressed by an earlier run without page
+        images has no such hash and is rendered from its compressed copy.
+        """
+        book['pages'] = False
+        with self.lock:
+            source = self.owned_hashes.get(book['filename'])
+        if pages_up_to_date(str(book['pdf_file']), str(self.pages_dir), source=source):
+            return book
+        
+        with self.metrics.stage('pages'):
+            rendered = executor.submit(render_pages, str(book['pdf_file']), str(self.pages_dir),
+                                       source=source).result()
+        book['pages'] = rendered
+        self.metrics.add('pages', items=int(rendered), failures=int(not rendered))
+        return book
+    
+    def record_thumbnails(self, books):
+        """Record the hash of each book's thumbnail in the sync manifest"""
+        for book in books:
+            drive_id = book.get('drive_id')
+            entry = self.manifest.get_book(drive_id) if drive_id else None
+            if entry is None or entry.get('thumbnail_hash'):
+                continue
+            
+            thumbnail_path = Path(f"{book['id']}.png")
+            if thumbnail_path.exists():
+                self.manifest.update_book(drive_id, thumbnail_hash=hash_file(thumbnail_path))
     
     def update_html_file(self, books):
-        """Update the HTML file with new books"""
+        """Render the book catalog into the marked regions of the HTML file"""
         if not self.html_file.exists():
             print(f"HTML file not found: {self.html_file}")
             return
         
         # Filter books to only include those with actual PDF files
+        pdf_index = self.get_pdf_index()
         books_with_pdfs = []
         for book in books:
-            pdf_path = self.pdf_dir / f"{book['id']}.pdf"
-            if pdf_path.exists():
+            if pdf_index.has_pdf(book['id']):
                 books_with_pdfs.append(book)
             else:
                 print(f"⚠️  Skipping {book['id']} - PDF file not found")
@@ -630,161 +1365,90 @@ class BookUpdater:
         with open(self.html_file, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
-        # Clean up existing initFlipbook calls for non-existent PDFs
-        html_content = self.cleanup_missing_pdfs(html_content)
-        
-        # Clean up ALL existing JavaScript content before adding new ones
-        html_content = self.cleanup_all_javascript(html_content)
+        # Pages from before the catalog markers existed are migrated once
+        if not has_region(html_content, CATALOG_REGION) or not has_region(html_content, FLIPBOOK_REGION):
+            print("🔖 Adding catalog markers to HTML file...")
+            try:
+                html_content = add_region_markers(html_content)
+            except ValueError as e:
+                print(f"❌ {e}")
+                return
         
         # Group books by language -> category (for regular books) and premium (separate)
-        books_by_language = {}
-        for book in books_with_pdfs:
-            print(f"📖 Processing {book['id']} with languages: {book['languages']}")
-            category = book.get('category', '').strip() or 'General'
-            is_premium = book.get('is_premium', False)
-            
-            for lang in book['languages']:
-                if lang not in books_by_language:
-                    books_by_language[lang] = {'categories': {}, 'premium': []}
-                    print(f"  🆕 Created new language section: {lang}")
-                
-                if is_premium:
-                    # Premium books go to separate premium section (no category)
-                    books_by_language[lang]['premium'].append(book)
-                    print(f"  ➕ Added {book['id']} to {lang} > Premium")
-                else:
-                    # Regular books go to categories
-                    if category not in books_by_language[lang]['categories']:
-                        books_by_language[lang]['categories'][category] = []
-                        print(f"    🆕 Created category: {category}")
-                    
-                    books_by_language[lang]['categories'][category].append(book)
-                    print(f"  ➕ Added {book['id']} to {lang} > {category}")
+        catalog = BookCatalog(books_with_pdfs)
         
         print(f"\n📊 Book Organization by Language:")
-        for lang, structure in books_by_language.items():
-            total_books = 0
-            for category, books in structure['categories'].items():
-                total_books += len(books)
-                print(f"  {lang} > {category}: {len(books)} books")
+        for lang, structure in catalog.sections():
+            total_regular = 0
+            for category, category_books in structure['categories'].items():
+                total_regular += len(category_books)
+                print(f"  {lang} > {category}: {len(category_books)} books")
             premium_count = len(structure['premium'])
-            total_books += premium_count
             if premium_count > 0:
                 print(f"  {lang} > Premium: {premium_count} books")
-            print(f"  📚 Total for {lang}: {total_books} books")
-        
-        # Generate direct initFlipbook calls for books with PDFs
-        js_calls = []
-        premium_click_handlers = []
-        processed_ids = set()
-        premium_ids = []
-        
-        # Flatten the nested structure to process all books
-        all_books_flattened = []
-        for lang, structure in books_by_language.items():
-            # Add regular books from categories
-            for category, books in structure['categories'].items():
-                all_books_flattened.extend(books)
-            # Add premium books
-            all_books_flattened.extend(structure['premium'])
-        
-        for book in all_books_flattened:
-            is_premium = book.get('is_premium', False)
-            safe_html_id = self.generate_safe_html_id(book['id'], is_premium)
-            normalized_id = self.normalize_filename(book['id'])  # Still use for file paths
-            
-            if safe_html_id not in processed_ids:
-                # ALL books get the global initFlipbook call
-                js_calls.append(f"        initFlipbook('{safe_html_id}', 'pdf/{normalized_id}.pdf');")
-                
-                if is_premium:
-                    # Premium books ALSO get click handler for when premium is not purchased
-                    premium_click_handlers.append(f"""        $(`#{safe_html_id}`).click(function () {{
-          const isPremiumPurchased = getQueryParam("isPremiumPurchased") || "false";
-          if (isPremiumPurchased === "false") {{
-            initFlipbook('{safe_html_id}', 'pdf/{normalized_id}.pdf', {{}}, true);
-          }}
-        }});""")
-                    premium_ids.append(safe_html_id)
-                
-                processed_ids.add(safe_html_id)
-        
-        print(f"🔧 Generated {len(js_calls)} total initFlipbook calls and {len(premium_click_handlers)} additional premium click handlers")
-        
-        # Completely clear and replace JavaScript section
-        print("🔧 Replacing JavaScript section...")
-        
-        # Find the script tag containing $(document).ready
-        script_start = html_content.find('<script type="text/javascript">')
-        if script_start != -1:
-            # Find the closing </script> tag
-            script_end = html_content.find('</script>', script_start)
-            if script_end != -1:
-                # Extract the content before and after the script tag
-                before_script = html_content[:script_start]
-                after_script = html_content[script_end + 9:]  # +9 for '</script>'
-                
-                # Build the new script content
-                new_script_content = '  <script type="text/javascript">\n'
-                new_script_content += '    $(document).ready(function () {\n'
-                
-                # Add regular initFlipbook calls
-                if js_calls:
-                    new_script_content += '\n'.join(js_calls) + '\n'
-                
-                # Add premium click handlers
-                if premium_click_handlers:
-                    if js_calls:  # Add extra newline if there were regular calls
-                        new_script_content += '\n'
-                    new_script_content += '\n'.join(premium_click_handlers) + '\n'
-                
-                new_script_content += '    });\n'
-                new_script_content += '  </script>'
-                
-                # Combine everything
-                html_content = before_script + new_script_content + after_script
-                total_js_items = len(js_calls) + len(premium_click_handlers)
-                print(f"✅ Successfully replaced JavaScript section with {len(js_calls)} initFlipbook calls + {len(premium_click_handlers)} premium click handlers = {total_js_items} total")
-            else:
-                print("❌ Could not find closing script tag")
-        else:
-            print("❌ Could not find JavaScript script tag")
-        
-        # Remove all existing language sections except the structure
-        # Find the content container and remove all existing language sections
-        content_start = html_content.find('<div class="content-container">')
-        content_end = html_content.find('</div>\n    </div>')
-        
-        if content_start != -1 and content_end != -1:
-            # Keep the opening div and add new language sections
-            before_content = html_content[:content_start]
-            after_content = html_content[content_end:]
-            
-            # Build new content with language sections (only for languages with books)
-            new_sections = []
-            for language, structure in books_by_language.items():
-                if structure['categories'] or structure['premium']:  # Only add sections that have books
-                    section_html = self.generate_language_section(language, structure)
-                    new_sections.append(section_html)
-                    
-                    # Count books for logging
-                    total_regular = sum(len(books) for books in structure['categories'].values())
-                    total_premium = len(structure['premium'])
-                    
-                    print(f"  📂 {language}: {total_regular} free + {total_premium} premium books")
-            
-            new_content = f'''<div class="content-container">
-{chr(10).join(new_sections)}
-      </div>'''
-            
-            html_content = before_content + new_content + after_content
+            print(f"  📚 Total for {lang}: {total_regular + premium_count} books ({total_regular} free + {premium_count} premium)")
+        
+        # Flipbooks are listed in books.json and created on demand by the reader
+        books_json = self.generate_books_json(catalog)
+        with open(self.books_json_file, 'w', encoding='utf-8') as f:
+            f.write(books_json)
+        
+        # Both regions are rendered from the catalog and written in a single pass
+        html_content = render_regions(html_content, {
+            FLIPBOOK_REGION: self.generate_flipbook_script(books_json),
+            CATALOG_REGION: '\n'.join(self.generate_language_section(language, structure)
+                                      for language, structure in catalog.sections()),
+        })
         
         # Write updated HTML
         with open(self.html_file, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        self.metrics.add('html', items=len(books_with_pdfs),
+                         bytes_out=len(html_content.encode('utf-8')) + len(books_json.encode('utf-8')))
         
         print(f"✅ Updated HTML file with {len(books_with_pdfs)} books that have PDF files")
-        print(f"📊 Language sections: {list(books_by_language.keys())}")
+        print(f"📊 Language sections: {list(catalog.languages.keys())}")
+    
+    def generate_books_json(self, catalog):
+        """Generate the books.json catalog the reader uses to initialize flipbooks lazily"""
+        pdf_index = self.get_pdf_index()
+        entries = {}
+        
+        for book in catalog.books():
+            is_premium = book.get('is_premium', False)
+            safe_html_id = pdf_index.html_id_for(book['id'], is_premium)
+            
+            if safe_html_id in entries:
+                # Several sheet rows can share a PDF; the card lists every language
+                languages = entries[safe_html_id]['languages']
+                languages.extend(lang for lang in book['languages'] if lang not in languages)
+                continue
+            
+            filename = self.normalize_filename(book['id'])
+            entries[safe_html_id] = {
+                'id': safe_html_id,
+                'pdf': f"pdf/{filename}.pdf",
+                'premium': is_premium,
+                'languages': list(book['languages']),
+                'category': book.get('category', '').strip() or 'General'
+            }
+            if self.page_images:
+                # The flipbook shows the page images instead of the PDF when a page manifest exists
+                pages_manifest = Path(page_manifest_path(filename, str(self.pages_dir)))
+                if pages_manifest.exists():
+                    entries[safe_html_id]['pages'] = (f"{self.pages_dir.name}/{filename}/{pages_manifest.name}"
+                                                      f"?v={hash_file(pages_manifest)[:12]}")
+        
+        premium_count = sum(1 for entry in entries.values() if entry['premium'])
+        print(f"🔧 Generated books.json with {len(entries)} flipbooks ({premium_count} premium)")
+        
+        return json.dumps({'books': list(entries.values())}, ensure_ascii=False, separators=(',', ':'))
+    
+    def generate_flipbook_script(self, books_json):
+        """Generate the script that loads books.json and initializes flipbooks on demand"""
+        # The revision makes the page and its catalog change together past any HTTP or service worker cache
+        revision = hash_text(books_json)[:12]
+        return f"        initLazyFlipbooks('{self.books_json_file.name}?v={revision}');"
     
     def generate_language_section(self, language, structure):
         """Generate HTML for a language section with categories and premium books"""
@@ -799,16 +1463,12 @@ class BookUpdater:
             if books:
                 regular_games_html = []
                 for book in books:
-                    safe_html_id = self.generate_safe_html_id(book['id'], False)
+                    safe_html_id = self.get_pdf_index().html_id_for(book['id'], False)
                     normalized_id = self.normalize_filename(book['id'])
                     
                     game_html = f'''            <a class="game-link" id="{safe_html_id}">
               <div class="game-card">
-                <img
-                  src="../{normalized_id}.png"
-                  alt="{book['title']}"
-                  class="game-thumbnail"
-                />
+{self.generate_thumbnail_html(normalized_id, book['title'])}
               </div>
             </a>'''
                     regular_games_html.append(game_html)
@@ -831,16 +1491,12 @@ class BookUpdater:
         if structure['premium']:
             premium_games_html = []
             for book in structure['premium']:
-                safe_html_id = self.generate_safe_html_id(book['id'], True)
+                safe_html_id = self.get_pdf_index().html_id_for(book['id'], True)
                 normalized_id = self.normalize_filename(book['id'])
                 
                 game_html = f'''            <a class="game-link premium-game" id="{safe_html_id}">
               <div class="game-card">
-                <img
-                  src="../{normalized_id}.png"
-                  alt="{book['title']}"
-                  class="game-thumbnail"
-                />
+{self.generate_thumbnail_html(normalized_id, book['title'])}
               </div>
             </a>'''
                 premium_games_html.append(game_html)
@@ -861,93 +1517,181 @@ class BookUpdater:
         
         return complete_section
     
-    def compress_all_pdfs(self):
-        """Compress all PDF files using ghostscript for smaller file sizes"""
+    def expected_thumbnail_files(self, normalized_id):
+        """Return the thumbnail files a synced book should have for the configured formats"""
+        return thumbnail_files(normalized_id, formats=self.thumbnail_formats)
+    
+    def expected_files(self, normalized_id):
+        """Return the files a synced book should have: its thumbnails, plus its page manifest in page image mode"""
+        files = self.expected_thumbnail_files(normalized_id)
+        if self.page_images:
+            files.append(page_manifest_path(normalized_id, str(self.pages_dir)))
+        return files
+    
+    def generate_thumbnail_html(self, normalized_id, title):
+        """Generate responsive <picture> markup for a book thumbnail with a PNG fallback"""
+        sources = []
+        for mime_type, srcset in thumbnail_srcsets(normalized_id, url_prefix='../'):
+            sources.append(f'''                  <source type="{mime_type}" srcset="{srcset}" />''')
+        
+        img_html = f'''                  <img
+                    src="../{normalized_id}.png"
+                    alt="{title}"
+                    class="game-thumbnail"
+                    loading="lazy"
+                    width="{THUMBNAIL_SIZE}"
+                    height="{THUMBNAIL_SIZE}"
+                  />'''
+        
+        return '\n'.join(['                <picture>'] + sources + [img_html, '                </picture>'])
+    
+    def compress_all_pdfs(self, pdf_files=None):
+        """Compress PDF files using ghostscript for smaller file sizes
+        
+        Compresses every PDF in the PDF directory unless a list of files is given.
+        PDFs whose content hash matches the compressed version recorded in the sync
+        manifest are skipped; the rest are compressed in parallel, one process per CPU.
+        A sync compresses each PDF in its pipeline instead (see process_books_pipelined).
+        """
         if not self.pdf_dir.exists():
             print("📁 No PDF directory found, skipping compression")
             return
         
-        pdf_files = list(self.pdf_dir.glob('*.pdf'))
+        if pdf_files is None:
+            pdf_files = sorted(self.pdf_dir.glob('*.pdf'))
         if not pdf_files:
-            print("📄 No PDF files found for compression")
+            print("📄 No PDF files need compression")
             return
         
-        print(f"🗜️  Starting PDF compression for {len(pdf_files)} files...")
-        
-        compressed_count = 0
-        failed_count = 0
+        print(f"🗜️  Starting PDF compression for {len(pdf_files)} files with {self.cpu_workers} processes...")
+        with self.create_process_pool() as executor:
+            with self.create_pipeline(executor, stages=('compress',)) as pipeline:
+                for pdf_file in pdf_files:
+                    pipeline.put({'filename': pdf_file.stem, 'pdf_file': pdf_file})
+            results = pipeline.close()
+        self.report_compression(results)
+    
+    def compress_book(self, executor, synced_books, book):
+        """Pipeline stage: compress a PDF in a worker process unless it is already compressed"""
+        pdf_file = book['pdf_file']
+        synced = synced_books.get(book['filename'])
+        entry = synced[1] if synced else {}
+        job = (compress_pdf_file, pdf_file, self.linearize)
+        if entry.get('compressed') and entry.get('content_hash') == hash_file(pdf_file):
+            if not self.linearize or entry.get('linearized'):
+                size = pdf_file.stat().st_size
+                book['compression'] = {'status': 'skipped', 'original_size': size, 'compressed_size': size,
+                                       'linearized': entry.get('linearized', False), 'error': None}
+                self.metrics.add('compress', bytes_in=size, bytes_out=size)
+                return book
+            if qpdf_available():
+                # Already compressed, so qpdf only has to linearize it
+                job = (linearize_pdf_file, pdf_file)
+        
+        with self.metrics.stage('compress'):
+            if job[0] is compress_pdf_file and self.adaptive_compression:
+                result = self.search_compression(executor, pdf_file, entry.get('compression_profile'))
+            else:
+                result = executor.submit(*job).result()
+        book['compression'] = result
+        self.metrics.add('compress', items=int(result['status'] == 'compressed'), failures=int(result['status'] == 'failed'),
+                         bytes_in=result['original_size'], bytes_out=result['compressed_size'])
+        
+        if result['status'] == 'compressed':
+            compression_ratio = ((result['original_size'] - result['compressed_size']) / result['original_size']) * 100
+            profile = f" with {result['profile']}" if result.get('profile') else ""
+            print(f"    ✅ {pdf_file.name}: {result['original_size']:,} → {result['compressed_size']:,} bytes ({compression_ratio:.1f}% reduction){profile}")
+        elif result['status'] == 'kept' and job[0] is linearize_pdf_file:
+            print(f"    🚀 {pdf_file.name}: Linearized for fast web view")
+        elif result['status'] == 'kept':
+            print(f"    ℹ️  {pdf_file.name}: Keeping original (no size reduction)")
+        else:
+            print(f"    ❌ Failed to compress: {pdf_file.name}")
+            if result['error']:
+                print(f"       Error: {result['error']}")
+        if result.get('over_budget'):
+            print(f"    ⚠️  {pdf_file.name}: {result['compressed_size']:,} bytes is over the budget of {self.byte_budget:,} bytes at {self.min_image_dpi} DPI")
+        if self.linearize and result['status'] != 'failed' and not result['linearized']:
+            print(f"    ⚠️  {pdf_file.name}: Not linearized{' (' + result['error'] + ')' if result['error'] else ''}")
+        return book
+    
+    def search_compression(self, executor, pdf_file, recorded_profile=None):
+        """Compress a PDF with every profile that meets the quality floor, in parallel, and keep the best fit
+        
+        Profiles whose image resolution is below min_image_dpi are not tried. With a byte
+        budget, the highest-quality output within it wins; if none fits (or there is no
+        budget), the smallest output is used, flagged as over budget if there is one. The
+        original is kept unless the chosen output is smaller. A profile recorded by an
+        earlier run is reused without a search. Returns a result dict like compress_pdf_file,
+        plus the profile that replaced the file (None if the original was kept).
+        """
+        profiles = [profile for profile in COMPRESSION_PROFILES if profile[2] >= self.min_image_dpi]
+        if recorded_profile in [profile[0] for profile in profiles]:
+            profiles = [profile for profile in profiles if profile[0] == recorded_profile]
+        
+        original_size = pdf_file.stat().st_size
+        result = {'status': 'kept', 'original_size': original_size, 'compressed_size': original_size,
+                  'linearized': is_linearized(pdf_file), 'profile': None, 'over_budget': False, 'error': None}
+        if not profiles:
+            return result
+        
+        use_qpdf = self.linearize and qpdf_available()
+        futures = [executor.submit(compress_candidate, pdf_file, profile, self.linearize and not use_qpdf)
+                   for profile in profiles]
+        candidates = [future.result() for future in futures]
+        outputs = [candidate for candidate in candidates if not candidate['error']]
+        try:
+            if not outputs:
+                return dict(result, status='failed', error=candidates[0]['error'])
+            
+            # Profiles run from highest to lowest quality, so the first output that fits the budget is the best one
+            within_budget = [candidate for candidate in outputs if self.byte_budget and candidate['size'] <= self.byte_budget]
+            if within_budget:
+                chosen = within_budget[0]
+            else:
+                chosen = min(outputs, key=lambda candidate: candidate['size'])
+            # Only a profile that replaced the file is recorded, so a kept original is searched again next time
+            if chosen['size'] < original_size:
+                os.replace(chosen['path'], pdf_file)
+                result.update(status='compressed', compressed_size=chosen['size'], profile=chosen['profile'])
+            result['over_budget'] = bool(self.byte_budget) and result['compressed_size'] > self.byte_budget
+        finally:
+            for candidate in candidates:
+                candidate['path'].unlink(missing_ok=True)
+        
+        if use_qpdf and not is_linearized(pdf_file):
+            linearized = executor.submit(linearize_pdf_file, pdf_file).result()
+            result.update(compressed_size=linearized['compressed_size'], error=linearized['error'])
+        result['linearized'] = is_linearized(pdf_file)
+        return result
+    
+    def report_compression(self, books):
+        """Record the PDFs compressed by the pipeline in the sync manifest and print a summary"""
+        synced_books = self.manifest.books_by_filename()
+        counts = dict.fromkeys(('compressed', 'kept', 'skipped', 'failed'), 0)
+        linearized_count = 0
         total_original_size = 0
         total_compressed_size = 0
         
-        for pdf_file in pdf_files:
-            try:
-                # Get original file size
-                original_size = pdf_file.stat().st_size
-                total_original_size += original_size
-                
-                # Create temporary output file
-                temp_output = pdf_file.parent / f"temp_{pdf_file.name}"
-                
-                # Build ghostscript command
-                gs_command = [
-                    'gs',
-                    '-sDEVICE=pdfwrite',
-                    '-dCompatibilityLevel=1.4',
-                    '-dPDFSETTINGS=/screen',
-                    '-dNOPAUSE',
-                    '-dQUIET',
-                    '-dBATCH',
-                    f'-sOutputFile={temp_output}',
-                    str(pdf_file)
-                ]
-                
-                print(f"  🗜️  Compressing: {pdf_file.name}")
-                
-                # Run ghostscript compression
-                result = subprocess.run(gs_command, capture_output=True, text=True)
-                
-                if result.returncode == 0 and temp_output.exists():
-                    # Get compressed file size
-                    compressed_size = temp_output.stat().st_size
-                    total_compressed_size += compressed_size
-                    
-                    # Calculate compression ratio
-                    if original_size > 0:
-                        compression_ratio = ((original_size - compressed_size) / original_size) * 100
-                    else:
-                        compression_ratio = 0
-                    
-                    # Replace original with compressed version if it's actually smaller
-                    if compressed_size < original_size:
-                        pdf_file.unlink()  # Remove original
-                        temp_output.rename(pdf_file)  # Rename compressed to original name
-                        print(f"    ✅ {pdf_file.name}: {original_size:,} → {compressed_size:,} bytes ({compression_ratio:.1f}% reduction)")
-                        compressed_count += 1
-                    else:
-                        # Keep original if compressed version is larger
-                        temp_output.unlink()  # Remove temp file
-                        print(f"    ℹ️  {pdf_file.name}: Keeping original (no size reduction)")
-                        total_compressed_size = total_compressed_size - compressed_size + original_size
-                else:
-                    # Compression failed
-                    if temp_output.exists():
-                        temp_output.unlink()
-                    print(f"    ❌ Failed to compress: {pdf_file.name}")
-                    if result.stderr:
-                        print(f"       Error: {result.stderr.strip()}")
-                    failed_count += 1
-                    total_compressed_size += original_size  # Keep original size in totals
-                    
-            except Exception as e:
-                print(f"    ❌ Error compressing {pdf_file.name}: {e}")
-                failed_count += 1
-                total_compressed_size += original_size  # Keep original size in totals
+        for book in books:
+            result = book.get('compression')
+            if result is None:
+                continue
+            counts[result['status']] += 1
+            total_original_size += result['original_size']
+            total_compressed_size += result['compressed_size']
+            linearized_count += int(result.get('linearized', False))
+            if result['status'] in ('compressed', 'kept'):
+                self.record_compressed(synced_books, book['pdf_file'], result['linearized'], result.get('profile'))
         
         # Print summary
         print(f"\n📊 PDF Compression Summary:")
-        print(f"  ✅ Successfully compressed: {compressed_count}")
-        print(f"  ❌ Failed compressions: {failed_count}")
-        print(f"  📁 Total files processed: {len(pdf_files)}")
+        print(f"  ✅ Successfully compressed: {counts['compressed']}")
+        print(f"  ⏭️  Already compressed: {counts['skipped']}")
+        print(f"  ❌ Failed compressions: {counts['failed']}")
+        print(f"  📁 Total files processed: {sum(counts.values())}")
+        if self.linearize:
+            print(f"  🚀 Linearized for fast web view: {linearized_count}")
         
         if total_original_size > 0:
             total_reduction = ((total_original_size - total_compressed_size) / total_original_size) * 100
@@ -955,45 +1699,165 @@ class BookUpdater:
             print(f"  📏 Compressed total size: {total_compressed_size:,} bytes")
             print(f"  📉 Overall size reduction: {total_reduction:.1f}%")
     
+    def record_compressed(self, synced_books, pdf_file, linearized=False, profile=None):
+        """Record in the sync manifest that a PDF is compressed, whether it is linearized, and its new content hash
+        
+        The profile chosen by an adaptive compression search is recorded too, so a new
+        version of the PDF is compressed with it directly.
+        """
+        if pdf_file.stem in synced_books:
+            fields = {'compressed': True, 'linearized': linearized, 'content_hash': hash_file(pdf_file)}
+            if profile:
+                fields['compression_profile'] = profile
+            self.manifest.update_books_with_filename(pdf_file.stem, **fields)
+    
     def run(self):
+        """Run the complete update process and report per-stage metrics"""
+        with self.metrics.stage('total'):
+            self.sync()
+        # Failures of the request stage are retried requests (throttling or connection errors)
+        self.metrics.add('requests', items=self.session.request_count, failures=self.session.retry_count)
+        self.metrics.print_summary()
+    
+    def sync(self):
         """Run the complete update process"""
         print("Starting book update process...")
         
-        # Process books
-        books = self.process_books()
+        # Download the sheets and compare them with the last synced version
+        with self.metrics.stage('sheet', profile=True):
+            sheets = self.fetch_sheets()
+        if sheets is None:
+            self.metrics.add('sheet', failures=1)
+            print("No books were processed successfully")
+            return
+        
+        self.metrics.add('sheet', items=len(sheets),
+                         bytes_in=sum(len(csv_data.encode('utf-8')) for sheet_url, csv_data, rows in sheets))
+        sheet_hash = self.sheets_hash(sheets)
+        required_flags = ('linearized',) if self.linearize else ()
+        if not self.force and self.manifest.is_up_to_date(sheet_hash, self.pdf_dir, self.expected_files, required_flags):
+            print("✅ Sheet unchanged since last sync and all books are present, nothing to do")
+            return
+        
+        # Download the books; each PDF is compressed and thumbnailed as soon as it is on disk
+        # (already compressed PDFs and existing thumbnails are skipped)
+        with self.metrics.stage('books', profile=True):
+            books, pipeline_results = self.process_books_pipelined(self.merge_sheets(sheets))
+        self.metrics.add('books', items=len(books), failures=self.failed_downloads)
+        
+        # Persist Drive metadata so the next run can skip lookups
+        self.metadata_cache.save()
+        self.report_compression(pipeline_results)
         
         if not books:
+            self.manifest.save()
             print("No books were processed successfully")
             return
+        self.record_thumbnails(books)
         
-        # Generate thumbnails
-        print("Generating thumbnails...")
-        create_thumbnails()
-        
-        # Update HTML file
+        # Update HTML file once, from the collected results
         print("Updating HTML file...")
-        self.update_html_file(books)
+        with self.metrics.stage('html', profile=True):
+            self.update_html_file(books)
         
-        # Compress all PDFs for smaller file sizes
-        print("Compressing PDF files...")
-        self.compress_all_pdfs()
+        # Only mark the sheet as synced when every book made it, so failures are retried next run
+        self.manifest.sheet_hash = sheet_hash if self.failed_downloads == 0 else None
+        self.manifest.save()
         
         print(f"Process completed successfully! Added {len(books)} books.")
 
-def main():
-    # Get Google Sheets URL from environment variable
-    sheet_url = os.getenv('GOOGLE_SHEET_URL')
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Update books from Google Sheets")
+    parser.add_argument(
+        '--refresh-metadata',
+        action='store_true',
+        help="ignore cached Drive metadata and look up every file again"
+    )
+    parser.add_argument(
+        '--avif',
+        action='store_true',
+        help="also generate AVIF thumbnails next to the WebP and PNG ones"
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="ignore the sync manifest and re-sync every book"
+    )
+    parser.add_argument(
+        '--linearize',
+        action='store_true',
+        help="linearize compressed PDFs (fast web view) with qpdf, or ghostscript if qpdf is missing"
+    )
+    parser.add_argument(
+        '--adaptive-compression',
+        action='store_true',
+        help="try several ghostscript profiles per PDF and keep the smallest that meets COMPRESSION_MIN_DPI and COMPRESSION_BYTE_BUDGET"
+    )
+    parser.add_argument(
+        '--page-images',
+        action='store_true',
+        help="render every page to WebP images in read/pages for the flipbook instead of the PDF"
+    )
+    parser.add_argument(
+        '--metrics-report',
+        metavar='FILE',
+        help="write per-stage timings and counts as JSON to FILE"
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='DIR',
+        help="write cProfile stats for each stage to DIR/<stage>.prof"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # Get Google Sheets URL from environment variable; several sheets are separated by commas or spaces
+    sheet_urls = re.split(r'[\s,]+', os.getenv('GOOGLE_SHEET_URL', '').strip())
+    sheet_urls = [sheet_url for sheet_url in sheet_urls if sheet_url]
     
-    if not sheet_url:
+    if not sheet_urls:
         print("❌ Error: GOOGLE_SHEET_URL environment variable not set!")
         print("Please create a .env file with your Google Sheets URL.")
         print("Example .env file content:")
         print("GOOGLE_SHEET_URL=https://docs.google.com/spreadsheets/d/YOUR_SHEET_ID/edit")
         return
     
-    print(f"📋 Using Google Sheet from environment variable")
-    updater = BookUpdater(sheet_url)
+    # Number of parallel PDF downloads (optional)
+    max_workers = int(os.getenv('DOWNLOAD_WORKERS', DEFAULT_DOWNLOAD_WORKERS))
+    
+    # How long cached Drive metadata stays valid, in seconds (optional)
+    metadata_ttl = int(os.getenv('DRIVE_METADATA_TTL', DEFAULT_METADATA_TTL))
+    
+    # Ceiling on Google requests per second (optional)
+    requests_per_second = float(os.getenv('DRIVE_REQUESTS_PER_SECOND', DEFAULT_REQUESTS_PER_SECOND))
+    
+    # Quality floor and per-book size budget of the adaptive compression search (optional)
+    min_image_dpi = int(os.getenv('COMPRESSION_MIN_DPI', DEFAULT_MIN_IMAGE_DPI))
+    byte_budget = int(os.getenv('COMPRESSION_BYTE_BUDGET', DEFAULT_BYTE_BUDGET))
+    
+    print(f"📋 Using {len(sheet_urls)} Google Sheet{'s' if len(sheet_urls) > 1 else ''} from environment variable")
+    updater = BookUpdater(
+        sheet_urls,
+        max_workers=max_workers,
+        refresh_metadata=args.refresh_metadata,
+        metadata_ttl=metadata_ttl,
+        force=args.force,
+        thumbnail_formats=DEFAULT_THUMBNAIL_FORMATS + (('avif',) if args.avif else ()),
+        profile_dir=args.profile,
+        requests_per_second=requests_per_second,
+        linearize=args.linearize,
+        page_images=args.page_images,
+        adaptive_compression=args.adaptive_compression,
+        min_image_dpi=min_image_dpi,
+        byte_budget=byte_budget
+    )
     updater.run()
+    
+    if args.metrics_report:
+        updater.metrics.write_report(args.metrics_report)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file